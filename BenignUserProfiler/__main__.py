@@ -6,34 +6,74 @@ from .benign_user_profiler import BenignUserProfiler
 
 def args_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog='BenignUserProfiler')
-    parser.add_argument('-c', '--config-file', action='store', help='Json config file address.')
+    parser.add_argument('-c', '--config-file', action='store', help='JSON or YAML config file address.')
+    parser.add_argument('--no-config-cache', action='store_true', help='Parse and validate the config even if a compiled cache is up to date.')
     parser.add_argument('-p', '--parallel', action='store_true', help='Run tasks in parallel.')
+    parser.add_argument('-a', '--asyncio', action='store_true', help='Run tasks from a single asyncio event loop instead of one process per worker.')
     parser.add_argument('-w', '--work-hours', nargs='?', const=True, help='Set work hours (e.g. "09:00-17:00") or use default 9am-5pm if no value provided.')
     parser.add_argument('-r', '--randomize', action='store_true', help='Randomize task execution.')
     parser.add_argument('-t', '--threads', action='store', help='Number of threads. default=CPU count')
+    parser.add_argument('--max-threads', action='store', help='Upper bound the worker pool may grow to when tasks fall behind schedule. default=max(threads, CPU count)')
+    parser.add_argument('--idle-timeout', action='store', default=300, help='Seconds a worker may stay idle before it exits. default=300')
     parser.add_argument('-d', '--headless', action='store_true', help='Run browsers in headless mode.')
+    parser.add_argument('--webdriver', action='store_true', help='Drive pooled, long-lived Firefox sessions over WebDriver instead of launching a browser per page.')
+    parser.add_argument('--http-only', action='store_true', help='Browse with the browser-less HTTP engine instead of Firefox.')
+    parser.add_argument('--http-pool-size', action='store', help='Keep-alive connections kept per host by the shared HTTP client. default=10')
+    parser.add_argument('--http-host-limit', action='store', help='Concurrent requests to one host allowed per process. default=6')
+    parser.add_argument('-e', '--event-log', action='store', help='Append a JSON Lines record of every task and action to this file.')
+    parser.add_argument('--metrics-port', action='store', help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics.')
+    parser.add_argument('--metrics-file', action='store', help='Rewrite this Prometheus textfile with the current metrics every 15 seconds.')
+    parser.add_argument('--lookahead', action='store', default=3600, help='Seconds ahead recurring tasks are expanded into the schedule. default=3600')
     parser.add_argument('-s', '--skip-actions', action='store_true', help='Skip performing actual actions.')
+    parser.add_argument('-x', '--time-scale', action='store', default=1, help='Run on a virtual clock this many times faster than real time (e.g. 60). default=1')
     return parser
 
 
 def main():
     parsed_arguments = args_parser().parse_args()
     config_file_address = "./BenignUserProfiler/config.json" if parsed_arguments.config_file is None else parsed_arguments.config_file
+    config_cache = not parsed_arguments.no_config_cache
     parallel = parsed_arguments.parallel
+    use_asyncio = parsed_arguments.asyncio
     work_hours = parsed_arguments.work_hours
     randomize = parsed_arguments.randomize
     headless = parsed_arguments.headless
+    webdriver = parsed_arguments.webdriver
+    http_only = parsed_arguments.http_only
+    event_log = parsed_arguments.event_log
+    metrics_port = None if parsed_arguments.metrics_port is None else int(parsed_arguments.metrics_port)
+    metrics_file = parsed_arguments.metrics_file
+    http_pool_size = None if parsed_arguments.http_pool_size is None else int(parsed_arguments.http_pool_size)
+    http_host_limit = None if parsed_arguments.http_host_limit is None else int(parsed_arguments.http_host_limit)
     simulate = parsed_arguments.skip_actions
     number_of_threads = cpu_count() if parsed_arguments.threads is None else int(parsed_arguments.threads)
+    max_threads = None if parsed_arguments.max_threads is None else int(parsed_arguments.max_threads)
+    idle_timeout = float(parsed_arguments.idle_timeout)
+    lookahead = float(parsed_arguments.lookahead)
+    time_scale = float(parsed_arguments.time_scale)
     
     # Create profiler instance with new parameters
     benign_user_profiler = BenignUserProfiler(
         config_file=config_file_address,
+        config_cache=config_cache,
         parallel=parallel,
+        use_asyncio=use_asyncio,
         work_hours=work_hours,
         randomize=randomize,
         headless=headless,
-        simulate=simulate
+        webdriver=webdriver,
+        http_only=http_only,
+        event_log=event_log,
+        metrics_port=metrics_port,
+        metrics_file=metrics_file,
+        http_pool_size=http_pool_size,
+        http_host_limit=http_host_limit,
+        simulate=simulate,
+        threads=number_of_threads,
+        max_threads=max_threads,
+        idle_timeout=idle_timeout,
+        lookahead=lookahead,
+        time_scale=time_scale
     )
     benign_user_profiler.run()
 
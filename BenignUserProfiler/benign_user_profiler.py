@@ -6,20 +6,49 @@ import sys
 import os
 import platform
 import tempfile
+from . import clock
 from .config_loader import ConfigLoader
+from .event_log import configure_event_log
+from .metrics import TextfileExporter, serve_metrics, setup_metrics
 from .traffic_models.model_factory import ModelFactory
 from .scheduler import Scheduler
 from .traffic_generator import TrafficGenerator
 
 
 class BenignUserProfiler(object):
-    def __init__(self, config_file, parallel=False, work_hours=None, randomize=False, headless=False, simulate=False):
+    def __init__(self, config_file, parallel=False, work_hours=None, randomize=False, headless=False, simulate=False,
+                 use_asyncio=False, threads=None, max_threads=None, idle_timeout=300, time_scale=1, webdriver=False,
+                 http_only=False, http_pool_size=None, http_host_limit=None, event_log=None,
+                 metrics_port=None, metrics_file=None, lookahead=3600, config_cache=True):
         self.config_file = config_file
+        self.config_cache = config_cache
+        self.threads = threads
+        self.max_threads = max_threads
+        self.idle_timeout = idle_timeout
         self.parallel = parallel
+        self.use_asyncio = use_asyncio
         self.randomize = randomize
         self.headless = headless
+        self.webdriver = webdriver
+        self.http_only = http_only
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file
+        self.lookahead = lookahead
         self.simulate = simulate
         self.temp_dir = tempfile.mkdtemp()
+
+        if time_scale != 1:
+            print(f">>> Running on a virtual clock {time_scale:g}x faster than real time")
+        clock.set_time_scale(time_scale)
+
+        if event_log:
+            print(f">>> Writing the event log to {event_log}")
+            configure_event_log(event_log)
+
+        if http_pool_size is not None or http_host_limit is not None:
+            # Imported here so profiles without HTTP traffic never load requests
+            from .http_client import configure_http_client
+            configure_http_client(pool_size=http_pool_size, max_per_host=http_host_limit)
         
         if work_hours:
             start_time = "09:00"
@@ -43,35 +72,55 @@ class BenignUserProfiler(object):
 
     def run(self) -> None:
         try:
-            config = ConfigLoader().load(self.config_file)
-            if not config:
+            modules = ConfigLoader(use_cache=self.config_cache).load_modules(self.config_file)
+            if not modules:
                 return
-                
+
+            # Command line options override every module's settings
+            overrides = {}
             if self.work_hours:
-                for model_config in config.values():
-                    model_config["work_hours"] = self.work_hours
-                    
+                overrides["work_hours"] = self.work_hours
             if self.randomize:
-                for model_config in config.values():
-                    model_config["randomize"] = True
-            
+                overrides["randomize"] = True
             if self.simulate:
-                for model_config in config.values():
-                    model_config["simulate"] = True
+                overrides["simulate"] = True
+            for index, module in enumerate(modules):
+                changes = dict(overrides)
+                if self.http_only and module.type in ("HTTP", "HTTPS"):
+                    changes["engine"] = "http"
+                if changes:
+                    modules[index] = module.replace(**changes)
                     
-            model_factory = ModelFactory(headless=self.headless)
-            scheduler = Scheduler()
+            model_factory = ModelFactory(headless=self.headless, webdriver=self.webdriver)
+            scheduler = Scheduler(lookahead=self.lookahead)
             generator = TrafficGenerator()
 
-            for name, model_config in config.items():
-                model = model_factory.create_model(model_config)
+            for module in modules:
+                model = model_factory.create_model(module)
                 if model:
                     scheduler.add_model(model)
 
-            if self.parallel:
-                generator.generate_parallel(scheduler)
-            else:
-                generator.generate_sequential(scheduler)
+            exporter = None
+            if self.metrics_port is not None or self.metrics_file:
+                # Allocated before any worker starts so all of them share it
+                registry = setup_metrics(str(model) for model in scheduler.get_models())
+                if self.metrics_port is not None:
+                    serve_metrics(self.metrics_port)
+                    print(f">>> Serving metrics on http://127.0.0.1:{self.metrics_port}/metrics")
+                if self.metrics_file:
+                    exporter = TextfileExporter(registry, self.metrics_file)
+                    exporter.start()
+
+            try:
+                if self.use_asyncio:
+                    generator.generate_async(scheduler, self.threads)
+                elif self.parallel:
+                    generator.generate_parallel(scheduler, self.threads, self.max_threads, self.idle_timeout)
+                else:
+                    generator.generate_sequential(scheduler)
+            finally:
+                if exporter is not None:
+                    exporter.stop()
         except Exception as e:
             print(f">>> Error in BenignUserProfiler. {e}")
 
@@ -92,21 +141,49 @@ def main():
     """)
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("--config", "-c", help="Config file path", default=os.path.join(os.path.dirname(__file__), "config.json"))
+    parser.add_argument("--config", "-c", help="Config file path (JSON or YAML)", default=os.path.join(os.path.dirname(__file__), "config.json"))
+    parser.add_argument("--no-config-cache", help="Parse and validate the config even if a compiled cache is up to date", action="store_true")
     parser.add_argument("--parallel", "-p", help="Run tasks in parallel", action="store_true")
+    parser.add_argument("--asyncio", "-a", help="Run tasks from a single asyncio event loop", action="store_true")
     parser.add_argument("--work-hours", "-w", help="Set work hours (e.g. '09:00-17:00') or use default 9am-5pm if no value provided", nargs="?", const=True)
     parser.add_argument("--randomize", "-r", help="Randomize task execution", action="store_true")
+    parser.add_argument("--threads", "-t", help="Number of worker threads", type=int)
+    parser.add_argument("--max-threads", help="Upper bound the worker pool may grow to", type=int)
+    parser.add_argument("--idle-timeout", help="Seconds a worker may stay idle before it exits", type=float, default=300)
     parser.add_argument("--headless", "-d", help="Run browsers in headless mode", action="store_true")
+    parser.add_argument("--webdriver", help="Drive pooled Firefox sessions over WebDriver", action="store_true")
+    parser.add_argument("--http-only", help="Browse with the browser-less HTTP engine", action="store_true")
+    parser.add_argument("--http-pool-size", help="Keep-alive connections kept per host by the shared HTTP client", type=int)
+    parser.add_argument("--http-host-limit", help="Concurrent requests to one host allowed per process", type=int)
+    parser.add_argument("--event-log", "-e", help="Append a JSON Lines record of every task and action to this file")
+    parser.add_argument("--metrics-port", help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics", type=int)
+    parser.add_argument("--metrics-file", help="Rewrite this Prometheus textfile with the current metrics every 15 seconds")
+    parser.add_argument("--lookahead", help="Seconds ahead recurring tasks are expanded into the schedule", type=float, default=3600)
     parser.add_argument("--skip-actions", "-s", help="Skip performing actual actions", action="store_true")
+    parser.add_argument("--time-scale", "-x", help="Run on a virtual clock this many times faster than real time", type=float, default=1)
     args = parser.parse_args()
 
     profiler = BenignUserProfiler(
         config_file=args.config, 
+        config_cache=not args.no_config_cache,
         parallel=args.parallel, 
+        use_asyncio=args.asyncio,
         work_hours=args.work_hours, 
         randomize=args.randomize,
         headless=args.headless,
-        simulate=args.skip_actions
+        webdriver=args.webdriver,
+        http_only=args.http_only,
+        event_log=args.event_log,
+        metrics_port=args.metrics_port,
+        metrics_file=args.metrics_file,
+        http_pool_size=args.http_pool_size,
+        http_host_limit=args.http_host_limit,
+        simulate=args.skip_actions,
+        threads=args.threads,
+        max_threads=args.max_threads,
+        idle_timeout=args.idle_timeout,
+        lookahead=args.lookahead,
+        time_scale=args.time_scale
     )
     profiler.run()
 
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import os
+import time as _time
+from datetime import datetime
+
+# Read by child processes so spawned workers share the parent's timeline
+TIME_SCALE_ENV = "BUP_TIME_SCALE"
+EPOCH_ENV = "BUP_CLOCK_EPOCH"
+
+
+class Clock(object):
+    """Wall clock used by models, the scheduler and the traffic generator"""
+
+    factor = 1.0
+
+    def time(self) -> float:
+        return _time.time()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            _time.sleep(seconds)
+
+    def to_real_seconds(self, seconds: float) -> float:
+        """Convert a duration on this clock to wall clock seconds"""
+        return seconds
+
+
+class CompressedClock(Clock):
+    """Virtual clock that runs `factor` times faster than the wall clock.
+
+    Virtual time equals wall time at `epoch` and then advances `factor`
+    seconds per real second, so every think time and start time offset is
+    compressed by the same ratio.
+    """
+
+    def __init__(self, factor: float, epoch: float = None):
+        if factor <= 0:
+            raise ValueError("time scale factor must be positive")
+        self.factor = float(factor)
+        self.epoch = _time.time() if epoch is None else epoch
+
+    def time(self) -> float:
+        return self.epoch + (_time.time() - self.epoch) * self.factor
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            _time.sleep(seconds / self.factor)
+
+    def to_real_seconds(self, seconds: float) -> float:
+        return seconds / self.factor
+
+
+def _clock_from_environment() -> Clock:
+    factor = float(os.environ.get(TIME_SCALE_ENV, "1") or 1)
+    if factor == 1:
+        return Clock()
+    epoch = os.environ.get(EPOCH_ENV)
+    return CompressedClock(factor, float(epoch) if epoch else None)
+
+
+_clock = _clock_from_environment()
+
+
+def set_time_scale(factor: float) -> Clock:
+    """Install a clock running `factor` times faster than real time (1 restores the wall clock)"""
+    global _clock
+    if factor == 1:
+        _clock = Clock()
+        os.environ.pop(TIME_SCALE_ENV, None)
+        os.environ.pop(EPOCH_ENV, None)
+    else:
+        _clock = CompressedClock(factor)
+        os.environ[TIME_SCALE_ENV] = str(factor)
+        os.environ[EPOCH_ENV] = repr(_clock.epoch)
+    return _clock
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def time() -> float:
+    return _clock.time()
+
+
+def now() -> datetime:
+    return _clock.now()
+
+
+def sleep(seconds: float) -> None:
+    _clock.sleep(seconds)
+
+
+def to_real_seconds(seconds: float) -> float:
+    return _clock.to_real_seconds(seconds)
@@ -1,20 +1,151 @@
 #!/usr/bin/env python3
 
+import hashlib
 import json
 import os
+import pickle
+from .config_model import compile_config
+
+# Bump when ModuleConfig or the validation rules change, so old caches are rebuilt
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                 "BenignUserProfiler")
+
+
+def _merge(base, override):
+    """Merge `override` into `base`: objects are merged key by key, anything else is replaced"""
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return override
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = _merge(merged[key], value) if key in merged else value
+    return merged
+
 
 class ConfigLoader:
-    def __init__(self):
+    def __init__(self, cache_dir: str = None, use_cache: bool = True):
         self.traffics_configs = {}
+        # (path, mtime_ns, size, sha256) of every file read by the last load()
+        self.sources = []
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.use_cache = use_cache
 
     def load(self, config_file_address: str) -> dict:
-        """Load configuration from the specified file path"""
+        """Load configuration from the specified JSON or YAML file, following its includes"""
         self.config_file_address = config_file_address
+        self.sources = []
         try:
-            with open(self.config_file_address) as config_file:
-                self.traffics_configs = json.loads(config_file.read())
+            config = self.__read(os.path.abspath(self.config_file_address), ())
+            if not isinstance(config, dict):
+                raise ValueError("the top level of the config must be an object")
+            self.traffics_configs = config
             return self.traffics_configs
         except Exception as error:
             print(f">>> Error in config file!: {error}")
             print(f">>> Config file path: {os.path.abspath(self.config_file_address)}")
-            return None
\ No newline at end of file
+            return None
+
+    def load_modules(self, config_file_address: str):
+        """Load and compile the config, reusing the compiled cache while none of its files changed"""
+        cache_path = self.__cache_path(config_file_address) if self.use_cache else None
+        if cache_path is not None:
+            cached = self.__read_cache(cache_path)
+            if cached is not None:
+                print(f">>> Using the compiled config cache {cache_path}")
+                # Modules left out when the cache was built are reported on every launch
+                for warning in cached["warnings"]:
+                    print(warning)
+                return cached["modules"]
+
+        config = self.load(config_file_address)
+        if not config:
+            return None
+        modules, warnings = compile_config(config)
+        for warning in warnings:
+            print(warning)
+        if cache_path is not None:
+            self.__write_cache(cache_path, {"sources": self.sources, "modules": modules, "warnings": warnings})
+        return modules
+
+    def __read(self, path: str, stack):
+        if path in stack:
+            raise ValueError(f"{path} includes itself")
+        with open(path, "rb") as config_file:
+            data = config_file.read()
+            stat = os.fstat(config_file.fileno())
+        self.sources.append((path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest()))
+
+        stack = stack + (path,)
+        if path.endswith((".yaml", ".yml")):
+            config = self.__parse_yaml(data, path, stack)
+        else:
+            config = json.loads(data)
+
+        # "include" lists files whose settings this file builds on
+        if not isinstance(config, dict) or "include" not in config:
+            return config
+        includes = config.pop("include")
+        merged = {}
+        for include in [includes] if isinstance(includes, str) else includes:
+            merged = _merge(merged, self.__read(os.path.join(os.path.dirname(path), include), stack))
+        return _merge(merged, config)
+
+    def __parse_yaml(self, data: bytes, path: str, stack):
+        # Imported here so JSON configs work without pyyaml
+        import yaml
+
+        class IncludeLoader(yaml.SafeLoader):
+            pass
+
+        def include(loader, node):
+            # "!include fragment.yaml" inserts the fragment in place
+            return self.__read(os.path.join(os.path.dirname(path), loader.construct_scalar(node)), stack)
+
+        IncludeLoader.add_constructor("!include", include)
+        return yaml.load(data, Loader=IncludeLoader)
+
+    def __cache_path(self, config_file_address: str) -> str:
+        key = hashlib.sha1(os.path.abspath(config_file_address).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def __read_cache(self, cache_path: str):
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cached = pickle.load(cache_file)
+        except Exception:
+            # A missing, stale or corrupt cache is simply rebuilt
+            return None
+        if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+            return None
+
+        sources = []
+        for path, mtime_ns, size, digest in cached["sources"]:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            if stat.st_size != size:
+                return None
+            # A touched file is only hashed when its modification time changed
+            if stat.st_mtime_ns != mtime_ns:
+                with open(path, "rb") as source_file:
+                    if hashlib.sha256(source_file.read()).hexdigest() != digest:
+                        return None
+            sources.append((path, stat.st_mtime_ns, size, digest))
+
+        if sources != cached["sources"]:
+            # Record the new modification times so the files are not hashed again next launch
+            cached["sources"] = sources
+            self.__write_cache(cache_path, cached)
+        return cached
+
+    def __write_cache(self, cache_path: str, cached: dict) -> None:
+        cached = dict(cached, version=CACHE_VERSION)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(temp_path, "wb") as cache_file:
+                pickle.dump(cached, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError as error:
+            print(f">>> Could not write the compiled config cache: {error}")
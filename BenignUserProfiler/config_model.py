@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+from collections.abc import Mapping
+from datetime import datetime
+from .traffic_models.model_factory import MODEL_REGISTRY
+from .work_calendar import get_calendar
+
+# Types sample configs use for a registered model
+TYPE_ALIASES = {
+    "FTPS": "SFTP",
+}
+
+# Expected types of the settings any module may have
+COMMON_FIELDS = {
+    "frequency": int,
+    "time_interval": (int, float, list),
+    "start_time": str,
+    "start_time_format": str,
+    "work_hours": dict,
+    "calendar": dict,
+    "recurring": (bool, dict),
+    "randomize": bool,
+    "simulate": bool,
+    "max_concurrent": int,
+    "engine": str,
+}
+
+# Model type -> expected types of its own settings
+MODEL_FIELDS = {
+    "HTTP": {"website": str, "websites": list, "link": str, "visit_sublinks": dict, "timeout": (int, float)},
+    "SMTP": {"receivers": list, "emails": list, "email_templates": list, "attachments": list,
+             "timeout": (int, float)},
+    "IMAP": {"check_folders": list, "max_emails": int},
+    "SSH": {"commands": list},
+    "FTP": {"downloads": list, "uploads": list, "browse": list},
+    "CMD": {"commands": list, "applications": list, "linux_apps": list, "windows_apps": list,
+            "linux_commands": list, "windows_commands": list},
+}
+MODEL_FIELDS["HTTPS"] = MODEL_FIELDS["HTTP"]
+MODEL_FIELDS["SFTP"] = MODEL_FIELDS["FTP"]
+
+
+class ConfigError(Exception):
+    pass
+
+
+class ModuleConfig(Mapping):
+    """Validated, read-only settings of one module, shared by every task of its model.
+
+    Settings are read like a dict. The type and scheduling fields are
+    checked and parsed once, when the config is compiled, and kept as
+    attributes; replace() returns a new config with some settings changed.
+    """
+
+    __slots__ = ("name", "profile", "type", "frequency", "time_interval", "start_time", "__settings")
+
+    def __init__(self, name: str, settings, profile: str = None):
+        if not isinstance(settings, Mapping):
+            raise ConfigError("module settings must be an object")
+        if not isinstance(settings.get("type"), str):
+            raise ConfigError("no 'type' specified")
+        model_type = TYPE_ALIASES.get(settings["type"].upper(), settings["type"].upper())
+        if model_type not in MODEL_REGISTRY:
+            raise ConfigError(f"unknown type '{settings['type']}'")
+
+        for key, expected in {**COMMON_FIELDS, **MODEL_FIELDS.get(model_type, {})}.items():
+            if key in settings and not isinstance(settings[key], expected):
+                names = " or ".join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+                raise ConfigError(f"'{key}' must be of type {names}")
+
+        time_interval = settings.get("time_interval", 0)
+        if isinstance(time_interval, list) and (len(time_interval) != 2 or time_interval[0] > time_interval[1]):
+            raise ConfigError("'time_interval' must be a number or a [min, max] pair")
+        start_time = None
+        if "start_time" in settings:
+            try:
+                start_time = datetime.strptime(settings["start_time"], settings.get("start_time_format", "%H:%M"))
+            except ValueError as e:
+                raise ConfigError(f"invalid 'start_time': {e}")
+        try:
+            get_calendar(settings)
+        except (KeyError, ValueError) as e:
+            raise ConfigError(f"invalid calendar: {e}")
+
+        self.name = name
+        self.profile = profile
+        self.type = model_type
+        self.frequency = settings.get("frequency", 1)
+        self.time_interval = time_interval
+        self.start_time = start_time
+        self.__settings = dict(settings)
+
+    def replace(self, **changes):
+        """A copy of this config with `changes` applied, validated again"""
+        return ModuleConfig(self.name, {**self.__settings, **changes}, self.profile)
+
+    def __getitem__(self, key):
+        return self.__settings[key]
+
+    def __iter__(self):
+        return iter(self.__settings)
+
+    def __len__(self) -> int:
+        return len(self.__settings)
+
+    def __repr__(self) -> str:
+        return f"ModuleConfig({self.name!r}, {self.__settings!r})"
+
+
+def iter_modules(config: dict, warnings: list):
+    """Yield (name, profile, settings) for each module of a flat or a profiles/modules config.
+
+    In the nested layout only the profiles listed in general.profiles are
+    used, and general.scheduler.arguments supply defaults every module can
+    override. In the flat layout each top-level entry is one module.
+    Problems with the layout are appended to `warnings`.
+    """
+    if not isinstance(config.get("profiles"), dict):
+        for name, settings in config.items():
+            yield name, None, settings
+        return
+
+    general = config.get("general", {})
+    scheduler = general.get("scheduler", {})
+    if scheduler.get("type", "time_interval") != "time_interval":
+        warnings.append(f">>> Unsupported scheduler type '{scheduler['type']}' in config, using time_interval")
+    defaults = scheduler.get("arguments", {})
+
+    for profile in general.get("profiles", list(config["profiles"])):
+        if profile not in config["profiles"]:
+            warnings.append(f">>> Error in config: profile '{profile}' is not defined!")
+            continue
+        for index, module in enumerate(config["profiles"][profile].get("modules", [])):
+            name = module.get("name", index) if isinstance(module, dict) else index
+            yield f"{profile}.{name}", profile, {**defaults, **module} if isinstance(module, dict) else module
+
+
+def compile_config(config: dict):
+    """Validate every module of a loaded config.
+
+    Returns a ModuleConfig for each valid module and the warnings about the
+    modules that were left out, for the caller to print.
+    """
+    modules = []
+    warnings = []
+    for name, profile, settings in iter_modules(config, warnings):
+        try:
+            modules.append(ModuleConfig(name, settings, profile))
+        except ConfigError as e:
+            warnings.append(f">>> Error in config module '{name}': {e}. Ignoring this module.")
+    return modules, warnings
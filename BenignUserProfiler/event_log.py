@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import atexit
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from . import clock, metrics
+
+# Read by child processes so spawned workers append to the parent's log
+EVENT_LOG_ENV = "BUP_EVENT_LOG"
+
+
+class EventLog(object):
+    """Append-only JSON Lines log of every action BUP performs.
+
+    emit() only timestamps the event and puts it on a queue; a daemon thread
+    serialises queued events and appends them to the file in batches, so
+    logging never waits on disk I/O. Each batch is written with a single
+    O_APPEND write, which keeps lines from several worker processes intact.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5, batch_size: int = 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.host = socket.gethostname()
+        self.__pid = None
+        self.__start()
+
+    def emit(self, action: str, **fields) -> None:
+        if self.__pid != os.getpid():
+            self.__start()
+        fields["action"] = action
+        # "wall" is on the run's clock, like "scheduled"; under a time scale it
+        # is virtual, and "real_wall" and "mono" keep the real time
+        fields["wall"] = clock.time()
+        fields["real_wall"] = time.time()
+        fields["mono"] = time.monotonic()
+        self.__queue.put(fields)
+
+    def close(self) -> None:
+        """Write every queued event and stop the writer thread"""
+        if self.__pid != os.getpid() or not self.__writer.is_alive():
+            return
+        self.__queue.put(None)
+        self.__writer.join()
+
+    def __start(self) -> None:
+        # Threads do not survive a fork, so each process runs its own writer
+        self.__pid = os.getpid()
+        self.__queue = queue.SimpleQueue()
+        self.__fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.__writer = threading.Thread(target=self.__write_loop, daemon=True)
+        self.__writer.start()
+        atexit.register(self.close)
+
+    def __write_loop(self) -> None:
+        pid = self.__pid
+        running = True
+        while running:
+            lines = []
+            try:
+                event = self.__queue.get(timeout=self.flush_interval)
+                while True:
+                    if event is None:
+                        running = False
+                        break
+                    event["pid"] = pid
+                    event["hostname"] = self.host
+                    lines.append(json.dumps(event, separators=(",", ":"), default=str))
+                    if len(lines) >= self.batch_size:
+                        break
+                    event = self.__queue.get_nowait()
+            except queue.Empty:
+                pass
+            if lines:
+                os.write(self.__fd, ("\n".join(lines) + "\n").encode("utf-8"))
+        os.close(self.__fd)
+
+
+_event_log = None
+_context = threading.local()
+
+
+def configure_event_log(path: str) -> None:
+    """Log events to `path` in this process and in workers started after this call"""
+    global _event_log
+    os.environ[EVENT_LOG_ENV] = os.path.abspath(path)
+    _event_log = None
+
+
+def get_event_log():
+    """This process' EventLog, or None when event logging is off"""
+    global _event_log
+    if _event_log is None and os.environ.get(EVENT_LOG_ENV):
+        _event_log = EventLog(os.environ[EVENT_LOG_ENV])
+    return _event_log
+
+
+@contextmanager
+def task_context(task_id, model: str):
+    """Tag events emitted by this thread with the task being executed"""
+    previous = getattr(_context, "task", None)
+    _context.task = (task_id, model)
+    try:
+        yield
+    finally:
+        _context.task = previous
+
+
+def current_task():
+    """(task_id, model) of the task this thread is executing, or None"""
+    return getattr(_context, "task", None)
+
+
+def emit(action: str, **fields) -> None:
+    """Record an event; fields such as host, port, bytes and outcome are free-form"""
+    task = getattr(_context, "task", None)
+    if task is not None:
+        fields.setdefault("task_id", task[0])
+        fields.setdefault("model", task[1])
+    registry = metrics.get_metrics()
+    # Task start and end are counted by the task runner itself
+    if registry is not None and "model" in fields and not action.startswith("task_"):
+        registry.action(fields["model"], fields.get("bytes"), fields.get("outcome") == "error")
+
+    event_log = get_event_log()
+    if event_log is not None:
+        event_log.emit(action, **fields)
+
+
+def close_event_log() -> None:
+    if _event_log is not None:
+        _event_log.close()
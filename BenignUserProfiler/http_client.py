@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Read by child processes so spawned workers use the parent's settings
+POOL_SIZE_ENV = "BUP_HTTP_POOL_SIZE"
+HOST_LIMIT_ENV = "BUP_HTTP_HOST_LIMIT"
+
+DEFAULT_TIMEOUT = (10, 60)
+
+
+class HTTPClient(object):
+    """Process-wide HTTP client shared by all models and browser modules.
+
+    Requests go through one requests.Session, so connections to a host are
+    kept alive between calls instead of paying a TCP and TLS handshake each
+    time. Every request gets a default (connect, read) timeout, idempotent
+    requests are retried with exponential backoff, and at most
+    `max_per_host` requests to the same host run at once.
+    """
+
+    def __init__(self, pool_size: int = 10, max_per_host: int = 6, timeout=DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.5):
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.__pid = os.getpid()
+        self.__reset()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request; a streamed response holds its host slot until it is closed"""
+        self.__check_fork()
+        kwargs.setdefault("timeout", self.timeout)
+        slot = self.__host_slot(url)
+        slot.acquire()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except BaseException:
+            slot.release()
+            raise
+
+        if not kwargs.get("stream"):
+            slot.release()
+            return response
+
+        close = response.close
+        released = [False]
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released[0]:
+                    released[0] = True
+                    slot.release()
+
+        response.close = close_and_release
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self.__lock:
+            slot = self.__host_slots.get(host)
+            if slot is None:
+                slot = self.__host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def __reset(self) -> None:
+        retry = Retry(total=self.retries, backoff_factor=self.backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.__host_slots = {}
+        self.__lock = threading.Lock()
+
+    def __check_fork(self) -> None:
+        # Sockets inherited from the parent must not be shared with it
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__reset()
+
+
+_http_client = None
+
+
+def configure_http_client(pool_size: int = None, max_per_host: int = None) -> None:
+    """Set the pool size and per-host concurrency for this process and its workers"""
+    global _http_client
+    if pool_size is not None:
+        os.environ[POOL_SIZE_ENV] = str(pool_size)
+    if max_per_host is not None:
+        os.environ[HOST_LIMIT_ENV] = str(max_per_host)
+    _http_client = None
+
+
+def get_http_client() -> HTTPClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = HTTPClient(pool_size=int(os.environ.get(POOL_SIZE_ENV, 10)),
+                                  max_per_host=int(os.environ.get(HOST_LIMIT_ENV, 6)))
+    return _http_client
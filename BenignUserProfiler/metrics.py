@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Lock
+from multiprocessing.sharedctypes import RawArray
+
+# Upper bounds in seconds: 1-2-5 steps per decade from 1 ms to 1 hour, so
+# relative error stays bounded across the whole range as in an HDR histogram
+BUCKETS = tuple(m * 10.0 ** e for e in range(-3, 4) for m in (1, 2, 5)) + (3600.0,)
+
+COUNTERS = (
+    ("tasks_started_total", "Tasks handed to a model"),
+    ("tasks_failed_total", "Tasks whose generate() raised"),
+    ("actions_total", "Actions recorded by models"),
+    ("action_failures_total", "Actions recorded with an error outcome"),
+    ("bytes_total", "Bytes transferred by recorded actions"),
+)
+GAUGES = (
+    ("tasks_running", "Tasks currently executing"),
+    ("dispatch_lag_last_seconds", "How late the most recent task started, on the run's clock"),
+)
+HISTOGRAMS = (
+    ("dispatch_lag_seconds", "How late tasks start relative to their scheduled time, on the run's clock"),
+    ("task_duration_seconds", "Wall clock time spent in generate()"),
+)
+GLOBAL_GAUGES = (
+    ("workers", "Live worker processes"),
+    ("pending_tasks", "Tasks waiting in the dispatch queue"),
+)
+
+_HISTOGRAM_WIDTH = len(BUCKETS) + 3  # buckets, +Inf, sum, count
+
+
+class Metrics(object):
+    """Counters, gauges and latency histograms per model type in shared memory.
+
+    The registry is allocated before worker processes start, so every worker
+    updates the same values and the exporter in the parent sees all of them.
+    """
+
+    def __init__(self, model_types):
+        self.model_types = sorted(set(model_types))
+        self.__index = {model: i for i, model in enumerate(self.model_types)}
+        self.__model_width = len(COUNTERS) + len(GAUGES) + len(HISTOGRAMS) * _HISTOGRAM_WIDTH
+        self.__values = RawArray('d', len(GLOBAL_GAUGES) + self.__model_width * len(self.model_types))
+        self.__lock = Lock()
+
+    def task_started(self, model: str, lag: float) -> None:
+        with self.__lock:
+            self.__add(model, "tasks_started_total", 1)
+            self.__add(model, "tasks_running", 1)
+            self.__set(model, "dispatch_lag_last_seconds", lag)
+            self.__observe(model, "dispatch_lag_seconds", max(0.0, lag))
+
+    def task_finished(self, model: str, duration: float, failed: bool) -> None:
+        with self.__lock:
+            self.__add(model, "tasks_running", -1)
+            self.__observe(model, "task_duration_seconds", duration)
+            if failed:
+                self.__add(model, "tasks_failed_total", 1)
+
+    def action(self, model: str, nbytes=None, failed: bool = False) -> None:
+        with self.__lock:
+            self.__add(model, "actions_total", 1)
+            if failed:
+                self.__add(model, "action_failures_total", 1)
+            if nbytes:
+                self.__add(model, "bytes_total", nbytes)
+
+    def set_global(self, name: str, value: float) -> None:
+        self.__values[[gauge for gauge, _ in GLOBAL_GAUGES].index(name)] = value
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        with self.__lock:
+            values = list(self.__values)
+        lines = []
+        for i, (name, help_text) in enumerate(GLOBAL_GAUGES):
+            lines += [f"# HELP bup_{name} {help_text}", f"# TYPE bup_{name} gauge", f"bup_{name} {values[i]:g}"]
+
+        offset = len(COUNTERS) + len(GAUGES)
+        for kind, metrics in (("counter", COUNTERS), ("gauge", GAUGES)):
+            for name, help_text in metrics:
+                lines += [f"# HELP bup_{name} {help_text}", f"# TYPE bup_{name} {kind}"]
+                for model in self.model_types:
+                    lines.append(f'bup_{name}{{model="{model}"}} {values[self.__slot(model, name)]:g}')
+        for h, (name, help_text) in enumerate(HISTOGRAMS):
+            lines += [f"# HELP bup_{name} {help_text}", f"# TYPE bup_{name} histogram"]
+            for model in self.model_types:
+                base = self.__slot(model, None) + offset + h * _HISTOGRAM_WIDTH
+                cumulative = 0
+                for b, bound in enumerate(BUCKETS + (float("inf"),)):
+                    cumulative += values[base + b]
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'bup_{name}_bucket{{model="{model}",le="{le}"}} {cumulative:g}')
+                lines.append(f'bup_{name}_sum{{model="{model}"}} {values[base + len(BUCKETS) + 1]:g}')
+                lines.append(f'bup_{name}_count{{model="{model}"}} {values[base + len(BUCKETS) + 2]:g}')
+        return "\n".join(lines) + "\n"
+
+    def __slot(self, model: str, name):
+        index = self.__index.get(model)
+        if index is None:
+            return None
+        base = len(GLOBAL_GAUGES) + index * self.__model_width
+        if name is None:
+            return base
+        names = [metric for metric, _ in COUNTERS + GAUGES]
+        return base + names.index(name)
+
+    def __add(self, model: str, name: str, amount: float) -> None:
+        slot = self.__slot(model, name)
+        if slot is not None:
+            self.__values[slot] += amount
+
+    def __set(self, model: str, name: str, value: float) -> None:
+        slot = self.__slot(model, name)
+        if slot is not None:
+            self.__values[slot] = value
+
+    def __observe(self, model: str, name: str, value: float) -> None:
+        base = self.__slot(model, None)
+        if base is None:
+            return
+        h = [metric for metric, _ in HISTOGRAMS].index(name)
+        base += len(COUNTERS) + len(GAUGES) + h * _HISTOGRAM_WIDTH
+        self.__values[base + bisect_left(BUCKETS, value)] += 1
+        self.__values[base + len(BUCKETS) + 1] += value
+        self.__values[base + len(BUCKETS) + 2] += 1
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics = None
+
+
+def setup_metrics(model_types) -> Metrics:
+    """Allocate the shared registry; call before worker processes are started"""
+    global _metrics
+    _metrics = Metrics(model_types)
+    return _metrics
+
+
+def set_metrics(metrics: Metrics) -> None:
+    """Install a registry received from the parent process"""
+    global _metrics
+    _metrics = metrics
+
+
+def get_metrics():
+    """The registry, or None when metrics are off"""
+    return _metrics
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Expose /metrics over HTTP from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TextfileExporter(object):
+    """Rewrite a .prom file with the current metrics every `interval` seconds"""
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 15):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__loop, daemon=True)
+
+    def start(self) -> None:
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop the exporter after writing the final values"""
+        self.__stopped.set()
+        self.__thread.join()
+
+    def write(self) -> None:
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.metrics.render())
+        # Readers such as the node_exporter textfile collector never see a partial file
+        os.replace(temp_path, self.path)
+
+    def __loop(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            self.write()
+        self.write()
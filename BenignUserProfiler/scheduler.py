@@ -1,47 +1,258 @@
 #!/usr/bin/env python3
 
 import copy
+import heapq
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from . import clock
+from .work_calendar import get_calendar
+
+
+class TaskRecord(object):
+    """One scheduled run of a model, kept small so large schedules stay cheap.
+
+    The record only points at the shared model prototype; the executable
+    model is built by create_task() when the task is dispatched.
+    """
+
+    __slots__ = ("task_id", "model", "start_time", "overrides")
+
+    def __init__(self, task_id: int, model, start_time: datetime, overrides=None):
+        self.task_id = task_id
+        self.model = model
+        self.start_time = start_time
+        # Per-instance model_config entries layered over the prototype's config
+        self.overrides = overrides
+
+    def get_start_time(self) -> datetime:
+        return self.start_time
+
+    def get_module_name(self) -> str:
+        """Name of the config module this task belongs to"""
+        return self.model.model_config.name
+
+    def create_task(self):
+        """A model instance for this run, sharing the prototype's read-only config"""
+        task = copy.copy(self.model)
+        if self.overrides:
+            task.model_config = self.model.model_config.replace(**self.overrides)
+        task.start_time = self.start_time
+        task.task_id = self.task_id
+        return task
+
+    def __str__(self) -> str:
+        return str(self.model)
+
+
+def iter_recurrence(model, first_day, calendar=None):
+    """Yield the start times of a recurring model one day at a time, beginning on `first_day`.
+
+    Each working day starts at the model's start_time of day and repeats
+    every time_interval until the day's work hours end or the daily run
+    count is reached; a slot falling in a break moves to the end of the
+    break. time_interval must be positive. "days" limits
+    how many calendar days are covered; without it the recurrence never ends.
+    """
+    config = model.model_config.get("recurring")
+    config = config if isinstance(config, dict) else {}
+    days = config.get("days")
+    per_day = config.get("per_day")
+
+    day_start = model.start_time.time() if "start_time" in model.model_config else time.min
+    windows = calendar.windows if calendar is not None else ((time.min, time.max),)
+    if not windows or (calendar is not None and not calendar.weekdays):
+        return
+
+    day = first_day
+    while days is None or (day - first_day).days < days:
+        if calendar is None or calendar.is_working_day(day):
+            start_time = datetime.combine(day, max(day_start, windows[0][0]))
+            end_time = datetime.combine(day, windows[-1][1])
+            count = 0
+            while start_time <= end_time and (per_day is None or count < per_day):
+                slot = start_time.time()
+                window_start = next(start for start, end in windows if slot <= end)
+                if slot < window_start:
+                    # Outside every window: continue where the next one opens
+                    start_time = datetime.combine(day, window_start)
+                    continue
+                yield calendar.to_local(day, slot) if calendar is not None else start_time
+                count += 1
+                # Every slot moves the day forward, even if the interval drew 0
+                start_time += timedelta(seconds=max(model.get_interval(), 1))
+        day += timedelta(days=1)
+
+
+class TaskTable(object):
+    """The part of a schedule a worker process needs to run queued task descriptors.
+
+    It holds the eagerly scheduled records and the model prototypes, but no
+    recurrence generators, so it can be pickled for spawned workers.
+    """
+
+    __slots__ = ("tasks", "models")
+
+    def __init__(self, tasks: dict, models: list):
+        self.tasks = tasks
+        self.models = models
+
+    def get_task(self, task_id: int, start_timestamp: float, model_index: int) -> TaskRecord:
+        """The record of a queued descriptor, rebuilding recurring tasks from their model"""
+        task = self.tasks.get(task_id)
+        if task is None:
+            task = TaskRecord(task_id, self.models[model_index], datetime.fromtimestamp(start_timestamp))
+        return task
+
 
 class Scheduler(object):
-    def __init__(self):
-        self.__tasks = []
-        self.__tasks_ids = []
+    def __init__(self, lookahead: float = 3600):
+        # Task id -> TaskRecord, for O(1) lookups at dispatch time
+        self.__tasks = {}
+        # Min-heap of (start_time, task_id) entries ordered by start time
+        self.__queue = []
         self.__models = []
+        self.__next_task_id = 0
+        # Recurring models are expanded lazily: only tasks starting within
+        # `lookahead` seconds are materialised, in their own heap and dict
+        self.lookahead = lookahead
+        self.__streams = []
+        self.__window = []
+        self.__window_tasks = {}
 
     def add_model(self, model):
-        self.__models.append(model)
-        self.__schedule_model(model)
+        if model.model_config.get("recurring"):
+            self.__add_recurring_model(model)
+        else:
+            self.__models.append(model)
+            self.__schedule_model(model)
 
     def __schedule_model(self, model):
-        task_id = len(self.__tasks)
-        
+        calendar = get_calendar(model.model_config)
+        now = clock.now()
+        skipped = 0
         for frequency_index in range(model.frequency):
-            task = copy.copy(model)
-            task.set_start_time(frequency=frequency_index)
-            self.__tasks.append((task_id, task))
-            self.__tasks_ids.append((task_id, task.get_start_time()))
-            task_id += 1
+            start_time = model.get_start_time_for(frequency_index)
+            # Tasks whose start time has passed run as soon as dispatch begins
+            if calendar is not None and not calendar.is_open(max(start_time, now)):
+                skipped += 1
+                continue
+            self.add_task(model, start_time)
+        if skipped:
+            print(f">>> {skipped} {model} tasks fall outside work hours and were not scheduled")
+
+    def __add_recurring_model(self, model):
+        interval = model.time_interval
+        if isinstance(interval, list):
+            interval = min(interval)
+        if interval <= 0:
+            print(f">>> Recurring {model} model needs a positive time_interval. Ignoring this model.")
+            return
+        self.__models.append(model)
+        now = clock.now()
+        calendar = get_calendar(model.model_config)
+        first_day = calendar.today(now) if calendar is not None else now.date()
+        stream = iter_recurrence(model, first_day, calendar)
+        # Slots already over today are never scheduled
+        for start_time in stream:
+            if start_time >= now:
+                self.__push_stream(start_time, model, stream)
+                return
+
+    def __push_stream(self, start_time, model, stream):
+        # The model index breaks ties, so heapq never compares generators
+        heapq.heappush(self.__streams, (start_time, self.__models.index(model), stream))
 
-        self.__tasks_ids.sort(key=lambda task: task[1], reverse=True)
+    def __expand(self, until=None):
+        """Materialise recurring tasks starting before the end of the look-ahead window"""
+        horizon = clock.now() + timedelta(seconds=self.lookahead)
+        if until is not None:
+            horizon = max(horizon, until)
+        while self.__streams and self.__streams[0][0] <= horizon:
+            start_time, model_index, stream = heapq.heappop(self.__streams)
+            model = self.__models[model_index]
+            task_id = self.__next_task_id
+            self.__next_task_id += 1
+            self.__window_tasks[task_id] = TaskRecord(task_id, model, start_time)
+            heapq.heappush(self.__window, (start_time, task_id))
+            next_start = next(stream, None)
+            if next_start is not None:
+                self.__push_stream(next_start, model, stream)
+
+    def add_task(self, model, start_time: datetime, overrides=None) -> int:
+        """Schedule one run of `model` at `start_time`, returning its task id"""
+        task_id = self.__next_task_id
+        self.__tasks[task_id] = TaskRecord(task_id, model, start_time, overrides)
+        heapq.heappush(self.__queue, (start_time, task_id))
+        self.__next_task_id += 1
+        return task_id
 
     def get_tasks_ids(self):
-        tasks = [task[0] for task in self.__tasks_ids]
-        
-        should_randomize = any(getattr(model, 'model_config', {}).get('randomize', False) for model in self.__models)
-        
-        if should_randomize:
+        """Ids of the eagerly scheduled tasks; recurring tasks are only reachable through pop_next_task()"""
+        # Latest start time first, so callers can pop() the next due task from the end
+        tasks = [task_id for _, task_id in sorted(self.__queue, reverse=True)]
+
+        if self.should_randomize():
             print(">>> Randomizing task execution order")
             random.shuffle(tasks)
-            
+
         return tasks
 
+    def should_randomize(self):
+        return any(getattr(model, 'model_config', {}).get('randomize', False) for model in self.__models)
+
+    def get_models(self):
+        return list(self.__models)
+
+    def get_model_index(self, model) -> int:
+        return self.__models.index(model)
+
     def get_task_by_id(self, task_id: int):
-        for task in self.__tasks:
-            if task[0] == task_id:
-                return task[1]
-        return None
-        
+        task = self.__tasks.get(task_id)
+        if task is None:
+            task = self.__window_tasks.get(task_id)
+        return task
+
+    def get_task_table(self) -> TaskTable:
+        """What worker processes need to run this schedule's queued tasks"""
+        return TaskTable(dict(self.__tasks), list(self.__models))
+
+    def peek_next_task(self):
+        """Get the (task_id, task) that is due next without removing it"""
+        self.__expand()
+        heads = [queue[0] for queue in (self.__queue, self.__window) if queue]
+        if not heads:
+            return None
+        task_id = min(heads)[1]
+        return task_id, self.get_task_by_id(task_id)
+
+    def pop_next_task(self, until: datetime = None, recurring_only: bool = False):
+        """Remove and return the (task_id, task) that is due next.
+
+        With `until`, only a task starting no later than that is returned.
+        An empty window is refilled up to the next recurring start time, so
+        a quiet night does not end an open-ended schedule.
+        """
+        self.__expand()
+        if not self.__window and self.__streams:
+            self.__expand(self.__streams[0][0])
+
+        queue = self.__window
+        if not recurring_only and self.__queue and (not self.__window or self.__queue[0] < self.__window[0]):
+            queue = self.__queue
+        if not queue or (until is not None and queue[0][0] > until):
+            return None
+        _, task_id = heapq.heappop(queue)
+        if queue is self.__window:
+            # Dispatched recurring tasks are forgotten so memory stays bounded by the window
+            return task_id, self.__window_tasks.pop(task_id)
+        return task_id, self.__tasks[task_id]
+
+    def has_recurring_tasks(self) -> bool:
+        """Whether recurring models may still produce tasks"""
+        return bool(self.__streams or self.__window)
+
+    def get_pending_count(self):
+        return len(self.__queue) + len(self.__window)
+
     def get_tasks_count(self):
-        return len(self.__tasks)
\ No newline at end of file
+        return len(self.__tasks)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from multiprocessing import Lock
+from multiprocessing.sharedctypes import RawArray, RawValue
+
+
+class SharedTaskQueue(object):
+    """Fixed-capacity ring buffer of compact task descriptors living in shared memory.
+
+    A descriptor is a (task_id, start_timestamp, model_index) triple; the
+    model index lets a worker rebuild recurring tasks, which only the parent
+    expands (-1 when the task is known up front). Workers only hold the
+    queue's semaphore lock for the few instructions needed to move the head
+    cursor, so claiming a task never goes through a manager process.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.__task_ids = RawArray('q', self.capacity)
+        self.__start_times = RawArray('d', self.capacity)
+        self.__model_indexes = RawArray('i', self.capacity)
+        # Monotonic cursors; the slot index is cursor % capacity
+        self.__head = RawValue('q', 0)
+        self.__tail = RawValue('q', 0)
+        self.__lock = Lock()
+
+    def put(self, task_id: int, start_timestamp: float, model_index: int = -1) -> bool:
+        """Append a descriptor, returning False if the buffer is full"""
+        with self.__lock:
+            tail = self.__tail.value
+            if tail - self.__head.value >= self.capacity:
+                return False
+            slot = tail % self.capacity
+            self.__task_ids[slot] = task_id
+            self.__start_times[slot] = start_timestamp
+            self.__model_indexes[slot] = model_index
+            self.__tail.value = tail + 1
+            return True
+
+    def claim(self):
+        """Take the descriptor at the head of the queue, or None if it is empty"""
+        with self.__lock:
+            head = self.__head.value
+            if head >= self.__tail.value:
+                return None
+            slot = head % self.capacity
+            self.__head.value = head + 1
+            return self.__task_ids[slot], self.__start_times[slot], self.__model_indexes[slot]
+
+    def claim_due(self, now: float):
+        """Take the head descriptor only if its start time has been reached"""
+        with self.__lock:
+            head = self.__head.value
+            if head >= self.__tail.value:
+                return None
+            slot = head % self.capacity
+            if self.__start_times[slot] > now:
+                return None
+            self.__head.value = head + 1
+            return self.__task_ids[slot], self.__start_times[slot], self.__model_indexes[slot]
+
+    def peek(self):
+        """Get the head descriptor without claiming it, or None if the queue is empty"""
+        with self.__lock:
+            head = self.__head.value
+            if head >= self.__tail.value:
+                return None
+            slot = head % self.capacity
+            return self.__task_ids[slot], self.__start_times[slot], self.__model_indexes[slot]
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__tail.value - self.__head.value
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import time
+from . import clock, event_log, metrics
+
+
+def run_task(task_id, record, prefix: str = "") -> bool:
+    """Run one scheduled task, recording its start and outcome in the event log and metrics.
+
+    Every dispatch mode calls this, so a task behaves the same whether it
+    runs sequentially, on the asyncio executor or in a worker process. The
+    executable model is only created here, from the scheduler's TaskRecord.
+    """
+    task = record.create_task()
+    model = str(task)
+    scheduled = record.get_start_time().timestamp()
+    registry = metrics.get_metrics()
+    if registry is not None:
+        registry.task_started(model, clock.time() - scheduled)
+
+    with event_log.task_context(task_id, model):
+        event_log.emit("task_start", scheduled=scheduled)
+        started = time.monotonic()
+        error = None
+        try:
+            task.generate()
+        except Exception as e:
+            error = e
+            print(f">>> {prefix}Error executing task {model}: {e}")
+        duration = time.monotonic() - started
+
+        if registry is not None:
+            registry.task_finished(model, duration, error is not None)
+        if error is not None:
+            event_log.emit("task_end", outcome="error", error=str(error), duration=duration)
+            return False
+        event_log.emit("task_end", outcome="ok", duration=duration)
+        return True
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import mmap
+import os
+import random
+import re
+import threading
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus.txt")
+
+# Overrides the bundled corpus for every model that does not set "corpus_file"
+CORPUS_ENV = "BUP_TEXT_CORPUS"
+
+SENTENCE_END = (".", "!", "?")
+
+# Words a subject line should not end on
+TRAILING_WORDS = {"a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or", "the", "to", "with"}
+
+
+class TextGenerator(object):
+    """Second-order Markov text generator built from a local plain-text corpus.
+
+    The chain is built once per process and corpus, after which subjects,
+    sentences and paragraphs are produced without any network access.
+    """
+
+    def __init__(self, corpus_path: str = DEFAULT_CORPUS):
+        self.corpus_path = corpus_path
+        self.chain = {}
+        self.starts = []
+        self.__build(self.__read_corpus(corpus_path))
+
+    def sentence(self, min_words: int = 8, max_words: int = 30) -> str:
+        first, second = random.choice(self.starts)
+        words = [first, second]
+        while len(words) < max_words:
+            if words[-1].endswith(SENTENCE_END):
+                if len(words) >= min_words:
+                    break
+                # Too short, continue with a fresh sentence
+                words.extend(random.choice(self.starts))
+                continue
+            successors = self.chain.get((words[-2], words[-1]))
+            if not successors:
+                break
+            words.append(random.choice(successors))
+
+        text = " ".join(words).rstrip(",;:")
+        if not text.endswith(SENTENCE_END):
+            text += "."
+        return text
+
+    def paragraph(self, min_sentences: int = 3, max_sentences: int = 6) -> str:
+        return " ".join(self.sentence() for _ in range(random.randint(min_sentences, max_sentences)))
+
+    def paragraphs(self, count: int) -> str:
+        return "\n\n".join(self.paragraph() for _ in range(count))
+
+    def subject(self, min_words: int = 3, max_words: int = 7) -> str:
+        """A short title-like phrase taken from the start of a generated sentence"""
+        words = self.sentence(min_words, max_words).split()[:random.randint(min_words, max_words)]
+        words = [word.strip(",;:.!?") for word in words]
+        while len(words) > 1 and words[-1].lower() in TRAILING_WORDS:
+            words.pop()
+        subject = " ".join(words)
+        return subject[0].upper() + subject[1:]
+
+    def __read_corpus(self, corpus_path: str) -> str:
+        with open(corpus_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return data[:].decode("utf-8", errors="ignore")
+
+    def __build(self, text: str) -> None:
+        for block in re.split(r"\n\s*\n", text):
+            words = block.split()
+            for index in range(len(words) - 2):
+                self.chain.setdefault((words[index], words[index + 1]), []).append(words[index + 2])
+            for index in range(len(words) - 1):
+                if (index == 0 or words[index - 1].endswith(SENTENCE_END)) and words[index][:1].isupper():
+                    self.starts.append((words[index], words[index + 1]))
+        if not self.starts:
+            raise ValueError(f"corpus {self.corpus_path} has no sentences to learn from")
+
+
+_generators = {}
+_generators_lock = threading.Lock()
+
+
+def get_text_generator(corpus_path: str = None) -> TextGenerator:
+    corpus_path = corpus_path or os.environ.get(CORPUS_ENV) or DEFAULT_CORPUS
+    with _generators_lock:
+        generator = _generators.get(corpus_path)
+        if generator is None:
+            generator = _generators[corpus_path] = TextGenerator(corpus_path)
+        return generator
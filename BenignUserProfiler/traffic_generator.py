@@ -1,83 +1,163 @@
 #!/usr/bin/env python3
 
-import datetime
-import time
+import asyncio
 import os
-from multiprocessing import Process, Manager, Pool, cpu_count
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+from . import clock
 from .scheduler import Scheduler
+from .task_runner import run_task
+from .task_queue import SharedTaskQueue
+from .traffic_models import close_http_engines
+from .worker_pool import WorkerPool
+
+# Queue slots kept for recurring tasks on top of the eagerly scheduled ones
+WINDOW_CAPACITY = 4096
 
 
 class TrafficGenerator(object):
     def __init__(self) -> None:
         pass
 
-    def generate_parallel(self, scheduler: Scheduler, num_threads=None) -> None:
-        """Execute tasks in parallel using multiple processes"""
+    def generate_parallel(self, scheduler: Scheduler, num_threads=None, max_threads=None, idle_timeout=300) -> None:
+        """Execute tasks in parallel using an adaptive pool of worker processes"""
         if num_threads is None:
             num_threads = cpu_count()
-            
-        processes = []
-        print(f">>> Starting parallel execution with {num_threads} threads")
-        
-        with Manager() as manager:
-            task_ids = manager.list()
-            task_ids.extend(scheduler.get_tasks_ids())
-            get_task_lock = manager.Lock()
-            
-            for i in range(num_threads):
-                processes.append(Process(
-                    target=self._worker_process, 
-                    args=(i, task_ids, get_task_lock, scheduler)
-                ))
-
-            for i in range(num_threads):
-                processes[i].start()
-
-            for i in range(num_threads):
-                processes[i].join()
-
-    def _worker_process(self, thread_number: int, task_ids, get_task_lock, scheduler) -> None:
-        """Worker process that executes tasks"""
-        while True:
-            task = None
-            with get_task_lock:
-                if len(task_ids) == 0:
-                    return
-                task_id = task_ids.pop()
-                task = scheduler.get_task_by_id(task_id)
-                print(f">>> Thread {thread_number}: Processing task: {str(task)}")
-                
-            # Wait until scheduled start time
-            current_time = datetime.datetime.now()
-            if current_time < task.get_start_time():
-                waiting_time = task.get_start_time() - current_time
-                print(f">>> Thread {thread_number}: Waiting for {waiting_time}")
-                time.sleep(waiting_time.total_seconds())
-                
-            # Execute task
-            try:
-                task.generate()
-            except Exception as e:
-                print(f">>> Thread {thread_number}: Error executing task {str(task)}: {e}")
+
+        pool = WorkerPool(num_threads, max_workers=max_threads, idle_timeout=idle_timeout)
+        print(f">>> Starting parallel execution with {pool.initial_workers} threads (up to {pool.max_workers})")
+
+        for model in scheduler.get_models():
+            if "max_concurrent" in model.model_config:
+                pool.set_concurrency_cap(model.model_config.name, model.model_config["max_concurrent"])
+
+        # Workers get the eager task records and the models once, when they
+        # start, and then only receive task descriptors through the shared queue
+        task_table = scheduler.get_task_table()
+        if not scheduler.has_recurring_tasks():
+            task_queue = SharedTaskQueue(scheduler.get_tasks_count())
+            for task_id in reversed(scheduler.get_tasks_ids()):
+                task_queue.put(task_id, scheduler.get_task_by_id(task_id).get_start_time().timestamp())
+            pool.run(task_queue, task_table)
+            return
+
+        task_queue = SharedTaskQueue(scheduler.get_tasks_count() + WINDOW_CAPACITY)
+        randomize = scheduler.should_randomize()
+        if randomize:
+            # Shuffled tasks go first; recurring ones follow in start time order
+            for task_id in reversed(scheduler.get_tasks_ids()):
+                task_queue.put(task_id, scheduler.get_task_by_id(task_id).get_start_time().timestamp())
+        pending = []
+
+        def feed() -> bool:
+            """Queue the tasks starting within the look-ahead window, in start time order"""
+            horizon = clock.now() + timedelta(seconds=scheduler.lookahead)
+            while True:
+                if not pending:
+                    # With the queue empty the next task is queued however far off it is, so
+                    # workers sleep until it rather than polling through the off hours
+                    until = horizon if len(task_queue) else None
+                    next_task = scheduler.pop_next_task(until=until, recurring_only=randomize)
+                    if next_task is None:
+                        break
+                    pending.append(next_task)
+                task_id, task = pending[0]
+                if not task_queue.put(task_id, task.get_start_time().timestamp(), scheduler.get_model_index(task.model)):
+                    break
+                pending.pop()
+            if pending or scheduler.has_recurring_tasks():
+                return True
+            # Eagerly scheduled tasks are fed alongside unless they were queued up front
+            return not randomize and scheduler.get_pending_count() > 0
+
+        pool.run(task_queue, task_table, feed)
 
     def generate_sequential(self, scheduler: Scheduler) -> None:
         """Execute tasks sequentially in a single process"""
-        task_ids = scheduler.get_tasks_ids()
-        print(f">>> Starting sequential execution with {len(task_ids)} tasks")
-        
-        for task_id in task_ids:
-            task = scheduler.get_task_by_id(task_id)
-            print(f">>> Processing task: {str(task)}")
-            
-            # Wait until scheduled start time
-            current_time = datetime.datetime.now()
-            if current_time < task.get_start_time():
-                waiting_time = task.get_start_time() - current_time
-                print(f">>> Waiting for {waiting_time}")
-                time.sleep(waiting_time.total_seconds())
-                
-            # Execute task
-            try:
-                task.generate()
-            except Exception as e:
-                print(f">>> Error executing task {str(task)}: {e}")
\ No newline at end of file
+        print(f">>> Starting sequential execution with {scheduler.get_tasks_count()} tasks")
+
+        try:
+            for task_id, task in self._iter_tasks(scheduler):
+                print(f">>> Processing task: {str(task)}")
+
+                # Wait until scheduled start time
+                current_time = clock.now()
+                if current_time < task.get_start_time():
+                    waiting_time = task.get_start_time() - current_time
+                    print(f">>> Waiting for {waiting_time}")
+                    clock.sleep(waiting_time.total_seconds())
+
+                # Execute task
+                run_task(task_id, task)
+        finally:
+            close_http_engines()
+
+    def generate_async(self, scheduler: Scheduler, num_threads=None) -> None:
+        """Execute tasks from a single asyncio event loop with a bounded executor"""
+        if num_threads is None:
+            num_threads = cpu_count()
+
+        print(f">>> Starting asyncio execution with {scheduler.get_tasks_count()} tasks and {num_threads} executor threads")
+        try:
+            asyncio.run(self._dispatch_async(scheduler, num_threads))
+        finally:
+            close_http_engines()
+
+    async def _dispatch_async(self, scheduler: Scheduler, num_threads: int) -> None:
+        """Await each task's start time and hand its generate() call to the executor"""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(num_threads)
+        running = set()
+        # Config module name -> semaphore enforcing its max_concurrent
+        caps = {model.model_config.name: asyncio.Semaphore(max(1, int(model.model_config["max_concurrent"])))
+                for model in scheduler.get_models() if "max_concurrent" in model.model_config}
+        for model in scheduler.get_models():
+            if "max_concurrent" in model.model_config:
+                print(f">>> At most {model.model_config['max_concurrent']} concurrent {model.model_config.name} tasks")
+
+        with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="bup-task") as executor:
+            for task_id, task in self._iter_tasks(scheduler):
+                # Wait until scheduled start time without holding an executor thread
+                current_time = clock.now()
+                if current_time < task.get_start_time():
+                    waiting_time = task.get_start_time() - current_time
+                    print(f">>> Waiting for {waiting_time}")
+                    await asyncio.sleep(clock.to_real_seconds(waiting_time.total_seconds()))
+
+                cap = caps.get(task.get_module_name())
+                if cap is not None:
+                    # A capped task waits for its module's slot on its own, so it
+                    # never holds up the tasks of other modules
+                    future = asyncio.ensure_future(self._run_capped(loop, executor, slots, cap, task_id, task))
+                else:
+                    # Back-pressure: never queue more blocking calls than executor threads
+                    await slots.acquire()
+                    print(f">>> Processing task: {str(task)}")
+                    future = asyncio.ensure_future(loop.run_in_executor(executor, run_task, task_id, task))
+                    future.add_done_callback(lambda _: slots.release())
+                running.add(future)
+                future.add_done_callback(running.discard)
+
+            if running:
+                await asyncio.gather(*running)
+
+    async def _run_capped(self, loop, executor, slots, cap, task_id, task) -> None:
+        async with cap:
+            async with slots:
+                print(f">>> Processing task: {str(task)}")
+                await loop.run_in_executor(executor, run_task, task_id, task)
+
+    def _iter_tasks(self, scheduler: Scheduler):
+        """Yield (task_id, task) in start time order, or in shuffled order if randomization is enabled"""
+        randomize = scheduler.should_randomize()
+        if randomize:
+            for task_id in scheduler.get_tasks_ids():
+                yield task_id, scheduler.get_task_by_id(task_id)
+
+        # Recurring tasks are expanded as the run goes on and always come in start time order
+        while True:
+            next_task = scheduler.pop_next_task(recurring_only=randomize)
+            if next_task is None:
+                return
+            yield next_task
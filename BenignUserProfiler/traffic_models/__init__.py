@@ -1,9 +1,28 @@
 #!/usr/bin/python3
 
-from .model_factory import ModelFactory
+import sys
+from .model_factory import ModelFactory, MODEL_REGISTRY, get_model_class
 from .traffic_model import TrafficModel
-from .http_model import HTTPModel
-from .ssh_model import SSHModel
-from .cmd_model import CMDModel
-from .email_model import SMTPModel, IMAPModel
-from .ftp_model import FTPModel
+
+_LAZY_CLASSES = {
+    "HTTPModel": "HTTP",
+    "SSHModel": "SSH",
+    "CMDModel": "CMD",
+    "SMTPModel": "SMTP",
+    "IMAPModel": "IMAP",
+    "FTPModel": "FTP",
+}
+
+
+def close_http_engines() -> None:
+    """Close the connection pools of this process' browser-less HTTP engines, if an HTTP model ran here"""
+    http_model = sys.modules.get(f"{__name__}.http_model")
+    if http_model is not None:
+        http_model.close_adapters()
+
+
+def __getattr__(name):
+    # Model classes are imported on first access to keep package import cheap
+    if name in _LAZY_CLASSES:
+        return get_model_class(_LAZY_CLASSES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
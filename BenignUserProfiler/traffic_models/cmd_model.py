@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
 import os
-import time
 import random
 import platform
 import subprocess
 import string
 from datetime import datetime
 from .traffic_model import TrafficModel
+from .. import clock
+from ..text_generator import get_text_generator
 
 
 class CMDModel(TrafficModel):
@@ -115,25 +116,28 @@ class CMDModel(TrafficModel):
                         print(result.stderr[:500] + ("..." if len(result.stderr) > 500 else ""))
                 else:
                     # Run command without capturing output
-                    subprocess.run(
+                    result = subprocess.run(
                         command,
                         shell=shell,
                         stdout=subprocess.DEVNULL,
                         stderr=subprocess.DEVNULL
                     )
+                self.log_event("cmd_run", command=command, exit_status=result.returncode,
+                               outcome="ok" if result.returncode == 0 else "error")
                 
             except Exception as e:
                 print(f">>> Error executing command '{command}':")
                 print(e)
+                self.log_event("cmd_run", command=command, outcome="error", error=str(e))
                 continue
                 
             # Delay after command if specified
             if wait_after > 0:
                 print(f">>> Waiting for {wait_after:.1f} seconds")
-                time.sleep(wait_after)
+                clock.sleep(wait_after)
             else:
                 # Small random delay between commands
-                time.sleep(random.uniform(0.5, 2))
+                clock.sleep(random.uniform(0.5, 2))
 
     def _open_applications(self):
         """Open applications on the system"""
@@ -194,10 +198,12 @@ class CMDModel(TrafficModel):
                 print(e)
                 continue
                 
+            self.log_event("app_open", app=app_name, outcome="ok")
+
             # Application interaction if specified
             if "interactions" in app_config:
                 # Wait for app to open
-                time.sleep(app_config.get("startup_delay", 3))
+                clock.sleep(app_config.get("startup_delay", 3))
                 
                 # Perform each interaction
                 for interaction in app_config["interactions"]:
@@ -211,7 +217,7 @@ class CMDModel(TrafficModel):
                             # Wait for specified duration
                             duration = interaction.get("duration", 2)
                             print(f">>> Waiting for {duration} seconds")
-                            time.sleep(duration)
+                            clock.sleep(duration)
                             
                     except Exception as e:
                         print(f">>> Error during app interaction: {e}")
@@ -269,7 +275,7 @@ class CMDModel(TrafficModel):
                 
                 print(f">>> Cleanup complete for {app_name}")
             # Wait a moment for the app to close
-            time.sleep(1)
+            clock.sleep(1)
         except Exception as e:
             print(f">>> Error closing application {app_name}: {e}")
     
@@ -361,7 +367,7 @@ class CMDModel(TrafficModel):
                             print(f">>> Failed to open {app_name}: {e2}")
                 
                 # Wait a moment for app to launch
-                time.sleep(random.uniform(2, 5))
+                clock.sleep(random.uniform(2, 5))
                 
                 # Random interaction - simulate keystrokes (platform-specific)
                 if random.random() < 0.7:  # 70% chance of interaction
@@ -379,11 +385,11 @@ class CMDModel(TrafficModel):
                         time_left = runtime - total_time
                         if time_left <= countdown_interval:
                             print(f">>> Closing {app_name} in {time_left:.1f} seconds...")
-                            time.sleep(time_left)
+                            clock.sleep(time_left)
                             total_time += time_left
                         else:
                             print(f">>> Keeping {app_name} open - {time_left:.1f} seconds remaining")
-                            time.sleep(countdown_interval)
+                            clock.sleep(countdown_interval)
                             total_time += countdown_interval
                 # For Windows, always use a countdown approach
                 elif system == "windows":
@@ -394,16 +400,16 @@ class CMDModel(TrafficModel):
                         time_left = runtime - total_time
                         if time_left <= countdown_interval:
                             print(f">>> Closing {app_name} in {time_left:.1f} seconds...")
-                            time.sleep(time_left)
+                            clock.sleep(time_left)
                             total_time += time_left
                         else:
                             print(f">>> Keeping {app_name} open - {time_left:.1f} seconds remaining")
-                            time.sleep(countdown_interval)
+                            clock.sleep(countdown_interval)
                             total_time += countdown_interval
                 else:
                     # For other apps, just use a simple wait
                     print(f">>> Keeping {app_name} open for {runtime:.1f} seconds")
-                    time.sleep(runtime)
+                    clock.sleep(runtime)
                 
                 # Close the app
                 self._close_application(app_name, system)
@@ -414,7 +420,7 @@ class CMDModel(TrafficModel):
                 continue
             
             # Delay between apps
-            time.sleep(random.uniform(5, 15))
+            clock.sleep(random.uniform(5, 15))
     
     def _simulate_keyboard_input(self, system):
         """Simulate random keyboard input based on platform"""
@@ -460,7 +466,7 @@ class CMDModel(TrafficModel):
                 )
             
             # Wait after typing
-            time.sleep(random.uniform(1, 3))
+            clock.sleep(random.uniform(1, 3))
             
         except Exception as e:
             print(f">>> Error simulating keyboard input: {e}")
@@ -504,9 +510,8 @@ class CMDModel(TrafficModel):
         file_path = os.path.join(output_dir, filename)
         
         # Generate random content
-        lorem_text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat. Duis aute irure dolor in reprehenderit in voluptate velit esse cillum dolore eu fugiat nulla pariatur."
         paragraphs = random.randint(3, 7)
-        content = "\n\n".join([lorem_text for _ in range(paragraphs)])
+        content = self._get_lorem_ipsum(paragraphs)
         
         print(f">>> Creating Word document: {filename}")
         
@@ -642,7 +647,7 @@ class CMDModel(TrafficModel):
             # Create a temporary content file for LibreOffice
             temp_content_file = os.path.join(output_dir, f"temp_content_{timestamp}.txt")
             
-            # Generate random content - simulate using a Lorem Ipsum API
+            # Generate random content from the local text corpus
             paragraphs = random.randint(3, 7)
             lorem_text = self._get_lorem_ipsum(paragraphs)
             
@@ -676,7 +681,7 @@ class CMDModel(TrafficModel):
                             if process.poll() is None:  # If process is still running
                                 print(f">>> LibreOffice process taking too long, terminating...")
                                 process.terminate()
-                                time.sleep(1)
+                                clock.sleep(1)
                                 # Force kill if it's still running
                                 if process.poll() is None:
                                     process.kill()
@@ -744,7 +749,7 @@ class CMDModel(TrafficModel):
                             if process.poll() is None:  # If process is still running
                                 print(f">>> LibreOffice process taking too long, terminating...")
                                 process.terminate()
-                                time.sleep(1)
+                                clock.sleep(1)
                                 # Force kill if it's still running
                                 if process.poll() is None:
                                     process.kill()
@@ -814,7 +819,7 @@ class CMDModel(TrafficModel):
                             if process.poll() is None:  # If process is still running
                                 print(f">>> LibreOffice process taking too long, terminating...")
                                 process.terminate()
-                                time.sleep(1)
+                                clock.sleep(1)
                                 # Force kill if it's still running
                                 if process.poll() is None:
                                     process.kill()
@@ -860,20 +865,5 @@ class CMDModel(TrafficModel):
             print(f">>> Error creating LibreOffice document: {e}")
             
     def _get_lorem_ipsum(self, paragraphs):
-        """Generate Lorem Ipsum text for document content"""
-        # Static Lorem Ipsum content (fallback)
-        static_lorem = [
-            "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.",
-            "Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.",
-            "Duis aute irure dolor in reprehenderit in voluptate velit esse cillum dolore eu fugiat nulla pariatur.",
-            "Excepteur sint occaecat cupidatat non proident, sunt in culpa qui officia deserunt mollit anim id est laborum.",
-            "Sed ut perspiciatis unde omnis iste natus error sit voluptatem accusantium doloremque laudantium.",
-            "Nemo enim ipsam voluptatem quia voluptas sit aspernatur aut odit aut fugit, sed quia consequuntur.",
-            "Neque porro quisquam est, qui dolorem ipsum quia dolor sit amet, consectetur, adipisci velit.",
-        ]
-        
-        # Get random paragraphs
-        selected_paragraphs = random.sample(static_lorem, min(paragraphs, len(static_lorem)))
-        
-        # Return paragraphs with blank lines between them
-        return "\n\n".join(selected_paragraphs)
\ No newline at end of file
+        """Generate document content from the local text corpus"""
+        return get_text_generator(self.model_config.get("corpus_file")).paragraphs(paragraphs)
\ No newline at end of file
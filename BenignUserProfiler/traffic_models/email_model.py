@@ -4,15 +4,15 @@ import email
 import time
 import imaplib
 import os
-import smtplib
 import platform
 import random
-import requests
 import tempfile
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from .traffic_model import TrafficModel
+from . import imap_fetch
+from . import mime_stream
+from .smtp_pool import SMTP_SERVERS, get_smtp_pool
+from .. import clock
+from ..text_generator import get_text_generator
 
 
 class SMTPModel(TrafficModel):
@@ -52,9 +52,8 @@ class SMTPModel(TrafficModel):
         service = self._determine_email_service()
         print(f">>> Using email service: {service}")
         
-        # Connect to appropriate SMTP server based on service
-        server = None
-        port = None
+        # Borrow a logged-in connection for this service and sender from the process-wide pool
+        connection = None
         
         # Simulate mode doesn't actually connect to servers
         simulate_mode = self.model_config.get("simulate", False)
@@ -62,30 +61,11 @@ class SMTPModel(TrafficModel):
             print(">>> Running in simulation mode - no actual emails will be sent")
             
         try:
-            if not simulate_mode:
-                if service == "gmail":
-                    server = smtplib.SMTP_SSL('smtp.gmail.com')
-                    port = 465
-                    server.connect("smtp.gmail.com", port)
-                elif service == "outlook" or service == "hotmail":
-                    server = smtplib.SMTP('smtp-mail.outlook.com')
-                    port = 587
-                    server.connect("smtp-mail.outlook.com", port)
-                    server.starttls()
-                elif service == "yahoo":
-                    server = smtplib.SMTP_SSL('smtp.mail.yahoo.com')
-                    port = 465
-                    server.connect("smtp.mail.yahoo.com", port)
-                else:
-                    # Default to Gmail
-                    server = smtplib.SMTP_SSL('smtp.gmail.com')
-                    port = 465
-                    server.connect("smtp.gmail.com", port)
-                    
-                print(f">>> Connected to {service} SMTP server on port {port}")
-            
             sender = self.model_config["sender"]
             password = self.model_config["password"]
+
+            if not simulate_mode:
+                connection = get_smtp_pool().acquire(service, sender, password, self.model_config.get("timeout"))
             
             # Get receivers from config
             if isinstance(self.model_config["receivers"], list):
@@ -101,40 +81,37 @@ class SMTPModel(TrafficModel):
             for i in range(num_emails):
                 # Handle different email content generation methods
                 if "generate_content" in self.model_config and self.model_config["generate_content"]:
-                    # Generate email content with Lorem Ipsum API
+                    # Generate email content from the local text corpus
                     email_data = self._generate_email_content()
-                    self._send_email(server, sender, password, receivers, email_data, simulate=simulate_mode)
+                    self._send_email(connection, sender, receivers, email_data, simulate=simulate_mode)
                     
                 elif "email_templates" in self.model_config:
                     # Use a random template from the provided templates
                     templates = self.model_config["email_templates"]
                     email_data = random.choice(templates)
-                    self._send_email(server, sender, password, receivers, email_data, simulate=simulate_mode)
+                    self._send_email(connection, sender, receivers, email_data, simulate=simulate_mode)
                     
                 elif "emails" in self.model_config:
                     # Use explicitly configured emails
                     for email_data in self.model_config["emails"]:
-                        self._send_email(server, sender, password, receivers, email_data, simulate=simulate_mode)
+                        self._send_email(connection, sender, receivers, email_data, simulate=simulate_mode)
                         if "wait_after" in email_data:
-                            time.sleep(email_data["wait_after"])
+                            clock.sleep(email_data["wait_after"])
                 
                 # Add delay between multiple emails
                 if num_emails > 1 and i < num_emails - 1:
                     delay = random.uniform(5, 15)
                     print(f">>> Waiting {delay:.1f} seconds before sending next email...")
-                    time.sleep(delay)
+                    clock.sleep(delay)
 
-            # Quit the server connection
-            if server and not simulate_mode:
-                server.quit()
+            # Keep the session open for the next task instead of quitting
+            if connection:
+                connection.release()
                 
         except Exception as e:
             print(f">>> Error in SMTP model: {e}")
-            if server and not simulate_mode:
-                try:
-                    server.quit()
-                except:
-                    pass
+            if connection:
+                connection.discard()
         
     def _determine_email_service(self):
         """Determine which email service to use based on config or email address"""
@@ -159,50 +136,28 @@ class SMTPModel(TrafficModel):
         return "gmail"
         
     def _generate_email_content(self):
-        """Generate email content using Lorem Ipsum API"""
-        print(">>> Generating email content with Lorem Ipsum API")
+        """Generate email content from the local text corpus"""
+        print(">>> Generating email content from the local text corpus")
+        text = get_text_generator(self.model_config.get("corpus_file"))
         
-        # Generate a random subject
+        # Mix stock subjects with phrases from the corpus
         subject_types = [
             "Meeting Update", "Project Status", "Important Announcement", 
             "Weekly Report", "Upcoming Event", "Action Required",
             "New Opportunity", "Follow-up", "Policy Update",
             "Team Update", "Budget Review", "System Notification"
         ]
-        subject = random.choice(subject_types)
+        if random.random() < 0.5:
+            subject = random.choice(subject_types)
+        else:
+            subject = text.subject()
         
         # Add a random identifier to make it more realistic
         if random.random() < 0.7:  # 70% chance to add identifier
             subject += f" - {random.choice(['Q1', 'Q2', 'Q3', 'Q4', '2024', 'Urgent', 'FYI', 'For Review'])}"
         
-        # Generate the email body using Lorem Ipsum API
         try:
-            # Try different APIs until one works
-            apis = [
-                "https://loripsum.net/api/3/medium/plaintext",
-                "https://baconipsum.com/api/?type=all-meat&paras=3&format=text",
-                "https://hipsum.co/api/?type=hipster-centric&paras=3"
-            ]
-            
-            body_text = None
-            for api_url in apis:
-                try:
-                    response = requests.get(api_url, timeout=5)
-                    if response.status_code == 200:
-                        body_text = response.text
-                        break
-                except:
-                    continue
-                    
-            # If no API worked, generate fallback text
-            if not body_text:
-                print(">>> All Lorem Ipsum APIs failed, using fallback text")
-                paragraphs = [
-                    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.",
-                    "Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.",
-                    "Duis aute irure dolor in reprehenderit in voluptate velit esse cillum dolore eu fugiat nulla pariatur."
-                ]
-                body_text = "\n\n".join(paragraphs)
+            body_text = text.paragraphs(random.randint(1, 4))
             
             # Add a signature
             signatures = [
@@ -242,18 +197,14 @@ class SMTPModel(TrafficModel):
         text_file = os.path.join(self.temp_dir, f"document_{int(time.time())}.txt")
         with open(text_file, 'w') as f:
             f.write(f"Document created on {time.ctime()}\n\n")
-            f.write("This is a sample document for email attachment testing.")
+            f.write(get_text_generator(self.model_config.get("corpus_file")).paragraphs(random.randint(2, 6)))
         attachments.append(text_file)
         
         return attachments
         
-    def _send_email(self, server, sender, password, receivers, email_data, simulate=False):
-        """Send a single email using the provided server connection"""
+    def _send_email(self, connection, sender, receivers, email_data, simulate=False):
+        """Send a single email over an already authenticated pooled connection"""
         try:
-            message = MIMEMultipart()
-            message['Subject'] = email_data["subject"]
-            message['From'] = sender
-            
             # Choose receivers - either all or a random subset
             if "random_receivers" in email_data and email_data["random_receivers"]:
                 num_receivers = min(
@@ -263,22 +214,15 @@ class SMTPModel(TrafficModel):
                 selected_receivers = random.sample(receivers, num_receivers)
             else:
                 selected_receivers = receivers
-                
-            message['To'] = ", ".join(selected_receivers)
-            message.attach(MIMEText(email_data["text"]))
 
-            # Add attachments if specified
-            if "attachments" in email_data and email_data["attachments"]:
-                for attachment in email_data["attachments"]:
-                    try:
-                        with open(attachment, "rb") as attached_file:
-                            part = MIMEApplication(attached_file.read(), 
-                                                 Name=os.path.basename(attachment))
-                        part['Content-Disposition'] = f'attachment; filename="{os.path.basename(attachment)}"'
-                        message.attach(part)
-                        print(f">>> Attached file: {os.path.basename(attachment)}")
-                    except Exception as e:
-                        print(f">>> Error attaching file {attachment}: {e}")
+            # Attachments are read while the message is streamed, so drop unreadable ones up front
+            attachments = []
+            for attachment in email_data.get("attachments", []) or []:
+                if os.path.isfile(attachment) and os.access(attachment, os.R_OK):
+                    attachments.append(attachment)
+                    print(f">>> Attached file: {os.path.basename(attachment)}")
+                else:
+                    print(f">>> Error attaching file {attachment}: file is not readable")
 
             # Print email details
             print("\n" + "="*50)
@@ -286,7 +230,7 @@ class SMTPModel(TrafficModel):
             print(f">>> From: {sender}")
             print(f">>> To: {', '.join(selected_receivers)}")
             print(f">>> Subject: {email_data['subject']}")
-            print(f">>> Attachments: {len(email_data.get('attachments', []))}")
+            print(f">>> Attachments: {len(attachments)}")
             print(f">>> Body Preview: {email_data['text'][:100]}...")
             print("="*50 + "\n")
             
@@ -295,19 +239,31 @@ class SMTPModel(TrafficModel):
                 print(f">>> [SIMULATION] Email would be sent to {len(selected_receivers)} recipients")
                 return
                 
-            # Login and send
-            print(f">>> Logging in to email server as {sender}")
-            server.login(sender, password)
-            
             print(f">>> Preparing to send email to {len(selected_receivers)} recipients")
-            text = message.as_string()
             
-            # Send the email
+            # Send the email, encoding attachments as they are written to the connection
             print(f">>> Sending email: {email_data['subject']}")
-            server.sendmail(sender, selected_receivers, text)
+            sent = [0]
+
+            def message_chunks():
+                sent[0] = 0
+                for chunk in mime_stream.iter_message(sender, selected_receivers, email_data["subject"],
+                                                      email_data["text"], attachments):
+                    sent[0] += len(chunk)
+                    yield chunk
+
+            connection.sendmail_streamed(sender, selected_receivers, message_chunks)
             print(f">>> Email successfully sent: {email_data['subject']} to {len(selected_receivers)} recipients")
+            self._log_send(connection, selected_receivers, attachments, "ok", bytes=sent[0])
         except Exception as e:
             print(f">>> Error sending email: {e}")
+            if not simulate:
+                self._log_send(connection, receivers, email_data.get("attachments") or [], "error", error=str(e))
+
+    def _log_send(self, connection, receivers, attachments, outcome, **fields):
+        host, port, _ = SMTP_SERVERS.get(connection.service, SMTP_SERVERS["gmail"])
+        self.log_event("smtp_send", host=host, port=port, recipients=len(receivers),
+                       attachments=len(attachments), outcome=outcome, **fields)
 
 
 class IMAPModel(TrafficModel):
@@ -401,81 +357,16 @@ class IMAPModel(TrafficModel):
             # Process found emails
             max_emails = self.model_config.get("max_emails", 5)  # Limit number of emails processed
             print(f">>> Will process up to {max_emails} emails")
-            email_count = 0
-            
-            for num in selected_mails[0].split():
-                if email_count >= max_emails:
-                    break
-                    
-                print(f"\n>>> Fetching email {email_count+1}/{max_emails}...")
-                _, data = mail.fetch(num, '(RFC822)')
-                _, bytes_data = data[0]
-
-                email_message = email.message_from_bytes(bytes_data)
-                print("\n" + "="*50)
-                print(f">>> Email {email_count+1} Details:")
-                print(f">>> Subject: {email_message['subject']}")
-                print(f">>> To: {email_message['to']}")
-                print(f">>> From: {email_message['from']}")
-                print(f">>> Date: {email_message['date']}")
-                
-                # Track if email has attachments
-                has_attachments = False
-                
-                # Process email body
-                for part in email_message.walk():
-                    if part.get_content_type() == "text/plain" or part.get_content_type() == "text/html":
-                        message = part.get_payload(decode=True)
-                        if message:
-                            print(f">>> Message preview: {message.decode()[:100]}...")  # Show first 100 chars
-                            
-                            # Simulate reading time
-                            read_time = random.uniform(3, 10)
-                            print(f">>> Reading email for {read_time:.1f} seconds...")
-                            time.sleep(read_time)
-                        
-                    # Check for attachments
-                    if (part.get_content_maintype() != 'multipart' and 
-                        part.get('Content-Disposition') is not None):
-                        
-                        filename = part.get_filename()
-                        if filename:
-                            has_attachments = True
-                            print(f">>> Found attachment: {filename}")
-                            
-                            # Download attachments if enabled
-                            if self.model_config.get("download_attachments", False):
-                                # Use specified dir or temp dir
-                                attachments_dir = self.model_config.get("attachments_dir", self.temp_dir)
-                                attachment_path = os.path.join(attachments_dir, filename)
-                                
-                                print(f">>> Downloading attachment: {filename}...")
-                                download_time = random.uniform(1, 5)
-                                time.sleep(download_time)  # Simulate download time
-                                
-                                if not os.path.isfile(attachment_path):
-                                    with open(attachment_path, 'wb') as attached_file:
-                                        attached_file.write(part.get_payload(decode=True))
-                                    print(f">>> Downloaded attachment to: {attachment_path}")
-                
-                if not has_attachments:
-                    print(">>> No attachments found")
-                
-                # Mark as read if specified
-                if self.model_config.get("mark_as_read", False):
-                    print(">>> Marking email as read")
-                    mail.store(num, '+FLAGS', '\\Seen')
-                
-                email_count += 1
-                print("="*50)
-                
-                # Random delay between reading emails
-                if email_count < max_emails and email_count < len(selected_mails[0].split()):
-                    delay = random.uniform(2, 5)
-                    print(f"\n>>> Waiting {delay:.1f} seconds before checking next email...")
-                    time.sleep(delay)
+            message_numbers = selected_mails[0].split()[:max_emails]
+
+            if self.model_config.get("batch_fetch", True):
+                email_count = self._process_emails_batched(mail, message_numbers)
+            else:
+                email_count = self._process_emails_individually(mail, message_numbers)
             
             print(f"\n>>> Email checking completed. Processed {email_count} emails.")
+            self.log_event("imap_fetch", host=imap_server, port=imaplib.IMAP4_SSL_PORT, mailbox=mailbox,
+                           messages=email_count, outcome="ok")
             
             # Check for other folders if specified
             if "check_folders" in self.model_config and self.model_config["check_folders"]:
@@ -493,7 +384,7 @@ class IMAPModel(TrafficModel):
                                 print(f">>> Folder stats: {response[0].decode()}")
                                 
                             # Random delay between folder checks
-                            time.sleep(random.uniform(1, 3))
+                            clock.sleep(random.uniform(1, 3))
                         else:
                             print(f">>> Folder {folder} not found or cannot be selected")
                     except Exception as e:
@@ -505,6 +396,7 @@ class IMAPModel(TrafficModel):
             
         except Exception as e:
             print(f">>> Error in IMAP model: {e}")
+            self.log_event("imap_fetch", host=imap_server, port=imaplib.IMAP4_SSL_PORT, outcome="error", error=str(e))
         finally:
             if 'mail' in locals():
                 try:
@@ -513,6 +405,171 @@ class IMAPModel(TrafficModel):
                 except:
                     pass
     
+    def _process_emails_batched(self, mail, message_numbers) -> int:
+        """Fetch headers, a body preview and the MIME structure of every selected email in one command"""
+        preview_bytes = int(self.model_config.get("preview_bytes", 2048))
+        message_set = b",".join(message_numbers).decode()
+
+        print(f"\n>>> Fetching {len(message_numbers)} emails in one batch...")
+        status, data = mail.fetch(message_set, f'(BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{preview_bytes}> BODYSTRUCTURE)')
+        if status != "OK":
+            print(f">>> Batched fetch failed ({status}), fetching emails one at a time")
+            return self._process_emails_individually(mail, message_numbers)
+        messages = imap_fetch.parse_fetch_response(data)
+
+        processed = []
+        for num in message_numbers:
+            fetched = messages.get(num.decode())
+            if fetched is None:
+                print(f">>> Email {num.decode()} missing from batched fetch response, skipping")
+                continue
+
+            header = fetched.get("BODY[HEADER]", b"")
+            preview = next((value for key, value in fetched.items() if key.startswith("BODY[TEXT]")), b"")
+            email_message = email.message_from_bytes(header + preview)
+            print("\n" + "="*50)
+            print(f">>> Email {len(processed)+1} Details:")
+            print(f">>> Subject: {email_message['subject']}")
+            print(f">>> To: {email_message['to']}")
+            print(f">>> From: {email_message['from']}")
+            print(f">>> Date: {email_message['date']}")
+
+            # Only the first preview_bytes of the body were fetched, which is enough for a preview
+            for part in email_message.walk():
+                if part.get_content_type() == "text/plain" or part.get_content_type() == "text/html":
+                    message = part.get_payload(decode=True)
+                    if message:
+                        print(f">>> Message preview: {message.decode(errors='replace')[:100]}...")  # Show first 100 chars
+
+                        # Simulate reading time
+                        read_time = random.uniform(3, 10)
+                        print(f">>> Reading email for {read_time:.1f} seconds...")
+                        clock.sleep(read_time)
+                        break
+
+            # Attachments are listed from BODYSTRUCTURE and only fetched when they are downloaded
+            structure = imap_fetch.parse_bodystructure(fetched["meta"])
+            attachments = imap_fetch.find_attachments(structure) if structure else []
+            for section, filename, encoding, size in attachments:
+                print(f">>> Found attachment: {filename} ({size} bytes)")
+                if self.model_config.get("download_attachments", False):
+                    self._download_attachment(mail, num, section, filename, encoding)
+            if not attachments:
+                print(">>> No attachments found")
+
+            processed.append(num)
+            print("="*50)
+
+            # Random delay between reading emails
+            if len(processed) < len(message_numbers):
+                delay = random.uniform(2, 5)
+                print(f"\n>>> Waiting {delay:.1f} seconds before checking next email...")
+                clock.sleep(delay)
+
+        # Mark as read if specified, with a single STORE for the whole batch
+        if processed and self.model_config.get("mark_as_read", False):
+            print(f">>> Marking {len(processed)} emails as read")
+            mail.store(b",".join(processed).decode(), '+FLAGS', '\\Seen')
+
+        return len(processed)
+
+    def _download_attachment(self, mail, num, section: str, filename: str, encoding: str) -> None:
+        """Fetch a single body part and decode it straight to the attachments directory"""
+        # Use specified dir or temp dir
+        attachments_dir = self.model_config.get("attachments_dir", self.temp_dir)
+        attachment_path = os.path.join(attachments_dir, filename)
+
+        print(f">>> Downloading attachment: {filename}...")
+        download_time = random.uniform(1, 5)
+        clock.sleep(download_time)  # Simulate download time
+
+        if os.path.isfile(attachment_path):
+            return
+        status, data = mail.fetch(num, f'(BODY.PEEK[{section}])')
+        payload = imap_fetch.parse_fetch_response(data).get(num.decode(), {}).get(f"BODY[{section}]")
+        if status != "OK" or payload is None:
+            print(f">>> Could not fetch attachment {filename}")
+            return
+        with open(attachment_path, 'wb') as attached_file:
+            imap_fetch.write_decoded(payload, encoding, attached_file)
+        print(f">>> Downloaded attachment to: {attachment_path}")
+
+    def _process_emails_individually(self, mail, message_numbers) -> int:
+        """Fetch and read each selected email with its own RFC822 FETCH"""
+        max_emails = len(message_numbers)
+        email_count = 0
+
+        for num in message_numbers:
+            print(f"\n>>> Fetching email {email_count+1}/{max_emails}...")
+            _, data = mail.fetch(num, '(RFC822)')
+            _, bytes_data = data[0]
+
+            email_message = email.message_from_bytes(bytes_data)
+            print("\n" + "="*50)
+            print(f">>> Email {email_count+1} Details:")
+            print(f">>> Subject: {email_message['subject']}")
+            print(f">>> To: {email_message['to']}")
+            print(f">>> From: {email_message['from']}")
+            print(f">>> Date: {email_message['date']}")
+            
+            # Track if email has attachments
+            has_attachments = False
+            
+            # Process email body
+            for part in email_message.walk():
+                if part.get_content_type() == "text/plain" or part.get_content_type() == "text/html":
+                    message = part.get_payload(decode=True)
+                    if message:
+                        print(f">>> Message preview: {message.decode()[:100]}...")  # Show first 100 chars
+                        
+                        # Simulate reading time
+                        read_time = random.uniform(3, 10)
+                        print(f">>> Reading email for {read_time:.1f} seconds...")
+                        clock.sleep(read_time)
+                    
+                # Check for attachments
+                if (part.get_content_maintype() != 'multipart' and 
+                    part.get('Content-Disposition') is not None):
+                    
+                    filename = part.get_filename()
+                    if filename:
+                        has_attachments = True
+                        print(f">>> Found attachment: {filename}")
+                        
+                        # Download attachments if enabled
+                        if self.model_config.get("download_attachments", False):
+                            # Use specified dir or temp dir
+                            attachments_dir = self.model_config.get("attachments_dir", self.temp_dir)
+                            attachment_path = os.path.join(attachments_dir, filename)
+                            
+                            print(f">>> Downloading attachment: {filename}...")
+                            download_time = random.uniform(1, 5)
+                            clock.sleep(download_time)  # Simulate download time
+                            
+                            if not os.path.isfile(attachment_path):
+                                with open(attachment_path, 'wb') as attached_file:
+                                    attached_file.write(part.get_payload(decode=True))
+                                print(f">>> Downloaded attachment to: {attachment_path}")
+            
+            if not has_attachments:
+                print(">>> No attachments found")
+            
+            # Mark as read if specified
+            if self.model_config.get("mark_as_read", False):
+                print(">>> Marking email as read")
+                mail.store(num, '+FLAGS', '\\Seen')
+            
+            email_count += 1
+            print("="*50)
+            
+            # Random delay between reading emails
+            if email_count < max_emails:
+                delay = random.uniform(2, 5)
+                print(f"\n>>> Waiting {delay:.1f} seconds before checking next email...")
+                clock.sleep(delay)
+
+        return email_count
+
     def _simulate_email_checking(self):
         """Simulate checking emails without actually connecting to a server"""
         username = self.model_config["username"]
@@ -561,7 +618,7 @@ class IMAPModel(TrafficModel):
             # Simulate reading time
             read_time = random.uniform(3, 8)
             print(f">>> [SIMULATION] Reading email for {read_time:.1f} seconds...")
-            time.sleep(read_time)
+            clock.sleep(read_time)
             
             # Random chance of attachment
             if random.random() < 0.3:  # 30% chance
@@ -571,7 +628,7 @@ class IMAPModel(TrafficModel):
                 
                 if self.model_config.get("download_attachments", False):
                     print(f">>> [SIMULATION] Downloading attachment: {attachment}")
-                    time.sleep(random.uniform(1, 3))  # Simulate download time
+                    clock.sleep(random.uniform(1, 3))  # Simulate download time
             else:
                 print(">>> [SIMULATION] No attachments found")
                 
@@ -581,7 +638,7 @@ class IMAPModel(TrafficModel):
             if i < max_emails - 1:
                 delay = random.uniform(1, 4)
                 print(f"\n>>> [SIMULATION] Waiting {delay:.1f} seconds before next email...")
-                time.sleep(delay)
+                clock.sleep(delay)
                 
         print("\n>>> [SIMULATION] Email checking completed")
         
@@ -595,7 +652,7 @@ class IMAPModel(TrafficModel):
                 unread = random.randint(0, 5)
                 total = random.randint(unread, unread + 20)
                 print(f">>> [SIMULATION] Folder stats: {total} total, {unread} unread")
-                time.sleep(random.uniform(1, 2))
+                clock.sleep(random.uniform(1, 2))
                 
         print("\n>>> [SIMULATION] Logging out from email server")
                     
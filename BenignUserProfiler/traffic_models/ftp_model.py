@@ -4,10 +4,16 @@ import time
 import os
 import random
 import tempfile
-from ftplib import FTP_TLS, FTP, all_errors
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ftplib import all_errors, error_perm, error_reply
 from pathlib import Path
 from datetime import datetime
 from .traffic_model import TrafficModel
+from .ftp_pool import get_ftp_pool
+from .. import clock
+
+# ftplib defaults to 8 KiB blocks, which keeps transfers bound by per-call overhead
+DEFAULT_BLOCK_SIZE = 64 * 1024
 
 class FTPModel(TrafficModel):
     def __init__(self, ssl=False):
@@ -68,28 +74,15 @@ class FTPModel(TrafficModel):
         uploads = self.model_config.get("uploads", [])
         browse_dirs = self.model_config.get("browse", [])
         
-        # Connect to FTP server
-        ftp = None
+        # Borrow a logged-in session from the pool
+        connection = None
         try:
             print(f">>> Connecting to {self.protocol} server: {host}:{port}")
-            
-            # Choose connection type based on SSL setting
-            if self.__ssl:
-                ftp = FTP_TLS(host=host, timeout=30)
-                ftp.connect(host, port)
-            else:
-                ftp = FTP(host=host, timeout=30)
-                ftp.connect(host, port)
-                
-            print(f">>> Connected to {host}. Logging in as {username}...")
-            ftp.login(username, password)
-            
-            # Enable secure data connection for FTPS
-            if self.__ssl:
-                print(">>> Enabling secure data connection...")
-                ftp.prot_p()
+            connection = get_ftp_pool().acquire(host, port, username, password, self.__ssl)
+            ftp = connection.ftp
                 
             print(f">>> Successfully logged in as {username}")
+            self.log_event("ftp_login", host=host, port=port, user=username, outcome="ok")
             
             # Display welcome message
             welcome = ftp.getwelcome()
@@ -114,27 +107,23 @@ class FTPModel(TrafficModel):
             if uploads:
                 self._upload_files(ftp, uploads)
                 
-            # Close connection
-            print(f">>> Closing {self.protocol} connection...")
-            ftp.quit()
+            # Keep the session open for the next task
+            print(f">>> Returning {self.protocol} session to the pool...")
+            connection.release()
+            connection = None
             print(f">>> {self.protocol} session completed successfully")
             
         except all_errors as e:
+            self.log_event("ftp_session", host=host, port=port, user=username, outcome="error", error=str(e))
             print(f">>> Error in {self.protocol} connection/operations:")
             print(f">>> {type(e).__name__}: {str(e)}")
         except Exception as e:
             print(f">>> Unexpected error in {self.protocol} model:")
             print(f">>> {type(e).__name__}: {str(e)}")
         finally:
-            # Ensure FTP connection is closed
-            if ftp:
-                try:
-                    ftp.quit()
-                except:
-                    try:
-                        ftp.close()
-                    except:
-                        pass
+            # A session that was not returned to the pool may be in a bad state
+            if connection is not None:
+                connection.discard()
     
     def _browse_directories(self, ftp, browse_dirs):
         """Browse directories on FTP server"""
@@ -172,7 +161,7 @@ class FTPModel(TrafficModel):
                     pass
                     
                 # Random delay to simulate browsing
-                time.sleep(random.uniform(1, 3))
+                clock.sleep(random.uniform(1, 3))
                 
             except all_errors as e:
                 print(f">>> Error browsing directory {dir_path}: {e}")
@@ -181,129 +170,211 @@ class FTPModel(TrafficModel):
     def _download_files(self, ftp, downloads):
         """Download files from FTP server"""
         print(f"\n>>> Starting {self.protocol} downloads...")
-        
-        for download in downloads:
-            try:
-                # Extract parameters
-                remote_path = download["path"]
-                output_dir = Path(download.get("output_dir", self.temp_dir))
-                file_name = download["file_name"]
-                
-                # Create output directory if it doesn't exist
-                os.makedirs(output_dir, exist_ok=True)
-                
-                # Navigate to the specified directory
-                print(f">>> Changing to directory: {remote_path}")
-                ftp.cwd(remote_path)
-                
-                # Prepare local file path
-                output_file = output_dir / file_name
-                
-                # Get file size if possible
-                try:
-                    file_size = ftp.size(file_name)
-                    print(f">>> File size: {file_size} bytes")
-                except:
-                    print(">>> Could not determine file size")
-                    
-                # Download the file
-                print(f">>> Downloading: {file_name} to {output_file}")
-                start_time = time.time()
-                
-                with open(output_file, 'wb') as f:
-                    ftp.retrbinary(f"RETR {file_name}", f.write)
-                
-                # Calculate download statistics
-                end_time = time.time()
-                download_time = end_time - start_time
-                file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-                
-                print(f">>> Download completed in {download_time:.2f} seconds")
-                print(f">>> Downloaded {file_size_mb:.2f} MB")
-                
-                if download_time > 0:
-                    speed = file_size_mb / download_time
-                    print(f">>> Average download speed: {speed:.2f} MB/s")
-                    
-                # Wait if specified
-                if "wait_after" in download:
-                    wait_time = download["wait_after"]
-                    print(f">>> Waiting {wait_time} seconds before next operation...")
-                    time.sleep(wait_time)
-                else:
-                    # Small default delay
-                    time.sleep(random.uniform(1, 3))
-                    
-            except all_errors as e:
-                print(f">>> Error downloading {download.get('file_name')}: {e}")
-                continue
-            except Exception as e:
-                print(f">>> Unexpected error during download: {e}")
-                continue
-                
+        self._run_transfers(ftp, downloads, self._download_file, "ftp_download")
+
     def _upload_files(self, ftp, uploads):
         """Upload files to FTP server"""
         print(f"\n>>> Starting {self.protocol} uploads...")
-        
-        for upload in uploads:
+        self._run_transfers(ftp, uploads, self._upload_file, "ftp_upload")
+
+    def _run_transfers(self, ftp, transfers, transfer_file, action):
+        """Run transfers on the task's session, or spread them over pooled sessions in parallel.
+
+        A parallel transfer that fails outside `transfer_file`, e.g. because
+        no session could be opened for it, is logged as an `action` error.
+        """
+        parallel_transfers = max(1, int(self.model_config.get("parallel_transfers", 1)))
+        if parallel_transfers == 1 or len(transfers) == 1:
+            for transfer in transfers:
+                transfer_file(ftp, transfer)
+            return
+
+        workers = min(parallel_transfers, len(transfers))
+        print(f">>> Running {len(transfers)} transfers on {workers} parallel {self.protocol} sessions")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._transfer_on_pooled_session, transfer_file, transfer): transfer
+                       for transfer in transfers}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    transfer = futures[future]
+                    print(f">>> Error in parallel {self.protocol} transfer of {transfer.get('file_name')}: {e}")
+                    self.log_event(action, host=self.model_config["address"], port=self.model_config.get("port", 21),
+                                   file=transfer.get("file_name"), outcome="error", error=str(e))
+
+    def _transfer_on_pooled_session(self, transfer_file, transfer):
+        """Run one transfer on its own control and data connection"""
+        connection = get_ftp_pool().acquire(
+            self.model_config["address"],
+            self.model_config.get("port", 21),
+            self.model_config["username"],
+            self.model_config["password"],
+            self.__ssl
+        )
+        try:
+            transfer_file(connection.ftp, transfer)
+        except Exception:
+            connection.discard()
+            raise
+        connection.release()
+
+    def _block_size(self, transfer) -> int:
+        return int(transfer.get("block_size", self.model_config.get("block_size", DEFAULT_BLOCK_SIZE)))
+
+    def _download_file(self, ftp, download):
+        """Download one file, resuming a partial download left by an earlier task"""
+        try:
+            # Extract parameters
+            remote_path = download["path"]
+            output_dir = Path(download.get("output_dir", self.temp_dir))
+            file_name = download["file_name"]
+            
+            # Create output directory if it doesn't exist
+            os.makedirs(output_dir, exist_ok=True)
+            
+            # Navigate to the specified directory
+            print(f">>> Changing to directory: {remote_path}")
+            ftp.cwd(remote_path)
+            
+            # Prepare local file path; data lands in a .part file until the transfer completes
+            output_file = output_dir / file_name
+            partial_file = output_dir / (file_name + ".part")
+            
+            # Get file size if possible
+            file_size = None
             try:
-                # Extract parameters
-                remote_path = upload["path"]
-                input_dir = Path(upload.get("input_dir", self.temp_dir))
-                file_name = upload["file_name"]
-                
-                # If the file doesn't exist, create a temporary one for testing
-                input_file = input_dir / file_name
-                if not os.path.exists(input_file):
-                    print(f">>> File {input_file} not found, creating a test file")
-                    os.makedirs(input_dir, exist_ok=True)
-                    
-                    # Create a test file with timestamp and random content
-                    with open(input_file, 'w') as f:
-                        f.write(f"Test file created on {datetime.now()}\n")
-                        f.write(f"This is a test file for FTP upload testing.\n")
-                        # Add some random data to make the file bigger
-                        for i in range(100):
-                            f.write(f"Line {i}: {random.randint(1000, 9999)}\n")
-                
-                # Navigate to the upload directory
-                print(f">>> Changing to directory: {remote_path}")
-                ftp.cwd(remote_path)
-                
-                # Upload the file
-                print(f">>> Uploading: {input_file} to {remote_path}/{file_name}")
-                start_time = time.time()
-                
-                with open(input_file, 'rb') as f:
-                    ftp.storbinary(f"STOR {file_name}", f)
-                
-                # Calculate upload statistics
-                end_time = time.time()
-                upload_time = end_time - start_time
-                file_size_mb = os.path.getsize(input_file) / (1024 * 1024)
+                ftp.voidcmd("TYPE I")
+                file_size = ftp.size(file_name)
+                print(f">>> File size: {file_size} bytes")
+            except:
+                print(">>> Could not determine file size")
+
+            offset = 0
+            if download.get("resume", self.model_config.get("resume", True)) and partial_file.exists():
+                offset = partial_file.stat().st_size
+                if file_size is not None and offset >= file_size:
+                    offset = 0
+            
+            # Download the file
+            if offset:
+                print(f">>> Resuming download of {file_name} at byte {offset}")
+            else:
+                print(f">>> Downloading: {file_name} to {output_file}")
+            start_time = time.time()
+            
+            try:
+                with open(partial_file, 'ab' if offset else 'wb') as f:
+                    ftp.retrbinary(f"RETR {file_name}", f.write, blocksize=self._block_size(download),
+                                   rest=offset or None)
+            except (error_perm, error_reply) as e:
+                if not offset:
+                    raise
+                # The server rejected the offset (no REST support, or the .part is already
+                # whole and SIZE is unsupported); start over so later tasks do not retry it
+                print(f">>> Could not resume {file_name} at byte {offset} ({e}), downloading it again")
+                offset = 0
+                with open(partial_file, 'wb') as f:
+                    ftp.retrbinary(f"RETR {file_name}", f.write, blocksize=self._block_size(download))
+            os.replace(partial_file, output_file)
+            
+            # Calculate download statistics
+            end_time = time.time()
+            download_time = end_time - start_time
+            file_size_mb = (os.path.getsize(output_file) - offset) / (1024 * 1024)
+            self.log_event("ftp_download", host=self.model_config["address"], port=self.model_config.get("port", 21), file=file_name,
+                           bytes=os.path.getsize(output_file) - offset, offset=offset,
+                           duration=download_time, outcome="ok")
+            
+            print(f">>> Download completed in {download_time:.2f} seconds")
+            print(f">>> Downloaded {file_size_mb:.2f} MB")
+            
+            if download_time > 0:
+                speed = file_size_mb / download_time
+                print(f">>> Average download speed: {speed:.2f} MB/s")
+                
+            # Wait if specified
+            if "wait_after" in download:
+                wait_time = download["wait_after"]
+                print(f">>> Waiting {wait_time} seconds before next operation...")
+                clock.sleep(wait_time)
+            else:
+                # Small default delay
+                clock.sleep(random.uniform(1, 3))
                 
-                print(f">>> Upload completed in {upload_time:.2f} seconds")
-                print(f">>> Uploaded {file_size_mb:.2f} MB")
+        except all_errors as e:
+            print(f">>> Error downloading {download.get('file_name')}: {e}")
+            self.log_event("ftp_download", host=self.model_config["address"], port=self.model_config.get("port", 21), file=download.get("file_name"),
+                           outcome="error", error=str(e))
+        except Exception as e:
+            print(f">>> Unexpected error during download: {e}")
+            self.log_event("ftp_download", host=self.model_config["address"], port=self.model_config.get("port", 21), file=download.get("file_name"),
+                           outcome="error", error=str(e))
                 
-                if upload_time > 0:
-                    speed = file_size_mb / upload_time
-                    print(f">>> Average upload speed: {speed:.2f} MB/s")
+    def _upload_file(self, ftp, upload):
+        """Upload one file to FTP server"""
+        try:
+            # Extract parameters
+            remote_path = upload["path"]
+            input_dir = Path(upload.get("input_dir", self.temp_dir))
+            file_name = upload["file_name"]
+            
+            # If the file doesn't exist, create a temporary one for testing
+            input_file = input_dir / file_name
+            if not os.path.exists(input_file):
+                print(f">>> File {input_file} not found, creating a test file")
+                os.makedirs(input_dir, exist_ok=True)
+                
+                # Create a test file with timestamp and random content
+                with open(input_file, 'w') as f:
+                    f.write(f"Test file created on {datetime.now()}\n")
+                    f.write(f"This is a test file for FTP upload testing.\n")
+                    # Add some random data to make the file bigger
+                    for i in range(100):
+                        f.write(f"Line {i}: {random.randint(1000, 9999)}\n")
+            
+            # Navigate to the upload directory
+            print(f">>> Changing to directory: {remote_path}")
+            ftp.cwd(remote_path)
+            
+            # Upload the file
+            print(f">>> Uploading: {input_file} to {remote_path}/{file_name}")
+            start_time = time.time()
+            
+            with open(input_file, 'rb') as f:
+                ftp.storbinary(f"STOR {file_name}", f, blocksize=self._block_size(upload))
+            
+            # Calculate upload statistics
+            end_time = time.time()
+            upload_time = end_time - start_time
+            file_size_mb = os.path.getsize(input_file) / (1024 * 1024)
+            self.log_event("ftp_upload", host=self.model_config["address"], port=self.model_config.get("port", 21), file=file_name,
+                           bytes=os.path.getsize(input_file), duration=upload_time, outcome="ok")
+            
+            print(f">>> Upload completed in {upload_time:.2f} seconds")
+            print(f">>> Uploaded {file_size_mb:.2f} MB")
+            
+            if upload_time > 0:
+                speed = file_size_mb / upload_time
+                print(f">>> Average upload speed: {speed:.2f} MB/s")
+            
+            # Wait if specified
+            if "wait_after" in upload:
+                wait_time = upload["wait_after"]
+                print(f">>> Waiting {wait_time} seconds before next operation...")
+                clock.sleep(wait_time)
+            else:
+                # Small default delay
+                clock.sleep(random.uniform(1, 3))
                 
-                # Wait if specified
-                if "wait_after" in upload:
-                    wait_time = upload["wait_after"]
-                    print(f">>> Waiting {wait_time} seconds before next operation...")
-                    time.sleep(wait_time)
-                else:
-                    # Small default delay
-                    time.sleep(random.uniform(1, 3))
-                    
-            except all_errors as e:
-                print(f">>> Error uploading {upload.get('file_name')}: {e}")
-                continue
-            except Exception as e:
-                print(f">>> Unexpected error during upload: {e}")
-                continue
+        except all_errors as e:
+            print(f">>> Error uploading {upload.get('file_name')}: {e}")
+            self.log_event("ftp_upload", host=self.model_config["address"], port=self.model_config.get("port", 21), file=upload.get("file_name"),
+                           outcome="error", error=str(e))
+        except Exception as e:
+            print(f">>> Unexpected error during upload: {e}")
+            self.log_event("ftp_upload", host=self.model_config["address"], port=self.model_config.get("port", 21), file=upload.get("file_name"),
+                           outcome="error", error=str(e))
     
     def _simulate_ftp_operations(self):
         """Simulate FTP operations without actually connecting to a server"""
@@ -342,7 +413,7 @@ class FTPModel(TrafficModel):
                 # Simulate browsing delay
                 browse_time = random.uniform(1, 3)
                 print(f">>> [SIMULATION] Browsing for {browse_time:.1f} seconds...")
-                time.sleep(browse_time)
+                clock.sleep(browse_time)
         
         # Simulate downloads if configured
         if "downloads" in self.model_config:
@@ -367,7 +438,7 @@ class FTPModel(TrafficModel):
                 print(f">>> [SIMULATION] Estimated time: {download_time:.2f} seconds")
                 
                 # Simulate the download time
-                time.sleep(min(download_time, 5))  # Cap at 5 seconds for simulation
+                clock.sleep(min(download_time, 5))  # Cap at 5 seconds for simulation
                 
                 print(f">>> [SIMULATION] Download completed")
                 
@@ -375,7 +446,7 @@ class FTPModel(TrafficModel):
                 if "wait_after" in download:
                     wait_time = min(download["wait_after"], 3)  # Cap at 3 seconds for simulation
                     print(f">>> [SIMULATION] Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    clock.sleep(wait_time)
         
         # Simulate uploads if configured
         if "uploads" in self.model_config:
@@ -400,7 +471,7 @@ class FTPModel(TrafficModel):
                 print(f">>> [SIMULATION] Estimated time: {upload_time:.2f} seconds")
                 
                 # Simulate the upload time
-                time.sleep(min(upload_time, 5))  # Cap at 5 seconds for simulation
+                clock.sleep(min(upload_time, 5))  # Cap at 5 seconds for simulation
                 
                 print(f">>> [SIMULATION] Upload completed")
                 
@@ -408,7 +479,7 @@ class FTPModel(TrafficModel):
                 if "wait_after" in upload:
                     wait_time = min(upload["wait_after"], 3)  # Cap at 3 seconds for simulation
                     print(f">>> [SIMULATION] Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    clock.sleep(wait_time)
         
         print(f"\n>>> [SIMULATION] Closing {self.protocol} connection")
         print(f">>> [SIMULATION] {self.protocol} session completed successfully")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+from ftplib import FTP_TLS, FTP
+
+
+class PooledFTPConnection(object):
+    """Logged-in FTP/FTPS session borrowed from an FTPConnectionPool"""
+
+    def __init__(self, pool, key: tuple, ftp, home: str):
+        self.pool = pool
+        self.key = key
+        self.ftp = ftp
+        self.home = home
+
+    def release(self) -> None:
+        """Return the session to the pool for the next transfer or task"""
+        self.pool.release(self)
+
+    def discard(self) -> None:
+        """Close the session instead of returning it to the pool"""
+        self.pool.close_ftp(self.ftp)
+
+
+class FTPConnectionPool(object):
+    """Process-wide pool of logged-in FTP/FTPS sessions keyed by (host, port, username, ssl).
+
+    Idle sessions are checked with NOOP before being handed out and are put
+    back in their login directory, so a task only pays for the connect, USER/
+    PASS and, for FTPS, the AUTH TLS and PROT P exchange when the previous
+    session really is gone. At most `max_idle_per_key` sessions are kept per
+    key; sessions past the limit, or idle longer than `max_idle_time`, are
+    closed when a session is released.
+    """
+
+    def __init__(self, timeout: float = 30, max_idle_time: float = 240, max_idle_per_key: int = 2):
+        self.timeout = timeout
+        self.max_idle_time = max_idle_time
+        self.max_idle_per_key = max_idle_per_key
+        self.__idle = {}
+        self.__lock = threading.Lock()
+        self.__pid = os.getpid()
+
+    def acquire(self, host: str, port: int, username: str, password: str, ssl: bool = False) -> PooledFTPConnection:
+        self.__check_fork()
+        key = (host, port, username, ssl)
+        while True:
+            with self.__lock:
+                idle = self.__idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+
+            ftp, home, idle_since = entry
+            if time.monotonic() - idle_since > self.max_idle_time or not self.__reset(ftp, home):
+                self.close_ftp(ftp)
+                continue
+            print(f">>> Reusing {'FTPS' if ssl else 'FTP'} session to {host}:{port} as {username}")
+            return PooledFTPConnection(self, key, ftp, home)
+
+        ftp = self.connect(host, port, username, password, ssl)
+        try:
+            home = ftp.pwd()
+        except Exception:
+            home = "/"
+        return PooledFTPConnection(self, key, ftp, home)
+
+    def connect(self, host: str, port: int, username: str, password: str, ssl: bool = False):
+        """Open a new control connection to `host` and log in as `username`"""
+        ftp = FTP_TLS(timeout=self.timeout) if ssl else FTP(timeout=self.timeout)
+        try:
+            ftp.connect(host, port)
+            print(f">>> Connected to {host}. Logging in as {username}...")
+            ftp.login(username, password)
+
+            # Enable secure data connection for FTPS
+            if ssl:
+                print(">>> Enabling secure data connection...")
+                ftp.prot_p()
+        except Exception:
+            self.close_ftp(ftp)
+            raise
+        return ftp
+
+    def release(self, connection: PooledFTPConnection) -> None:
+        self.__check_fork()
+        now = time.monotonic()
+        with self.__lock:
+            idle = self.__idle.setdefault(connection.key, [])
+            idle.append((connection.ftp, connection.home, now))
+            # Keep the most recently used sessions; the server would drop stale ones anyway
+            expired = [entry for entry in idle if now - entry[2] > self.max_idle_time]
+            kept = [entry for entry in idle if now - entry[2] <= self.max_idle_time]
+            expired += kept[:-self.max_idle_per_key] if self.max_idle_per_key > 0 else kept
+            idle[:] = kept[-self.max_idle_per_key:] if self.max_idle_per_key > 0 else []
+        for ftp, _, _ in expired:
+            self.close_ftp(ftp)
+
+    def close_ftp(self, ftp) -> None:
+        try:
+            ftp.quit()
+        except Exception:
+            try:
+                ftp.close()
+            except Exception:
+                pass
+
+    def close_all(self) -> None:
+        with self.__lock:
+            idle, self.__idle = self.__idle, {}
+        for entries in idle.values():
+            for ftp, _, _ in entries:
+                self.close_ftp(ftp)
+
+    def __reset(self, ftp, home: str) -> bool:
+        """Check that an idle session is still usable and return it to its login directory"""
+        try:
+            ftp.voidcmd("NOOP")
+            ftp.cwd(home)
+            return True
+        except Exception:
+            return False
+
+    def __check_fork(self) -> None:
+        # Sockets inherited from the parent must not be shared with it
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__idle = {}
+            self.__lock = threading.Lock()
+
+
+_ftp_pool = None
+
+
+def get_ftp_pool() -> FTPConnectionPool:
+    global _ftp_pool
+    if _ftp_pool is None:
+        _ftp_pool = FTPConnectionPool()
+    return _ftp_pool
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, urldefrag
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from .. import clock, event_log
+
+# Header order Firefox sends for a top-level navigation. requests keeps the
+# insertion order of the session headers, so the wire order matches a browser.
+NAVIGATION_HEADERS = (
+    ("Accept", "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8"),
+    ("Accept-Language", "en-US,en;q=0.5"),
+    ("Accept-Encoding", "gzip, deflate, br"),
+    ("Connection", "keep-alive"),
+    ("Upgrade-Insecure-Requests", "1"),
+    ("Sec-Fetch-Dest", "document"),
+    ("Sec-Fetch-Mode", "navigate"),
+    ("Sec-Fetch-Site", "none"),
+    ("Sec-Fetch-User", "?1"),
+)
+
+# Subresource kind -> (Accept, Sec-Fetch-Dest)
+SUBRESOURCE_HEADERS = {
+    "image": ("image/avif,image/webp,*/*", "image"),
+    "script": ("*/*", "script"),
+    "style": ("text/css,*/*;q=0.1", "style"),
+    "font": ("application/font-woff2;q=1.0,application/font-woff;q=0.9,*/*;q=0.8", "font"),
+}
+
+
+def new_adapter(max_parallel: int = 6) -> HTTPAdapter:
+    """Connection pool for engines: keep-alive connections to 16 hosts, `max_parallel` per host"""
+    return HTTPAdapter(pool_connections=16, pool_maxsize=max_parallel)
+
+
+class HTTPBrowsingEngine(object):
+    """Browser-less page visitor that replays the request pattern of a real browser.
+
+    A page visit fetches the document, parses it with BeautifulSoup and then
+    loads its images, scripts and stylesheets concurrently over the session's
+    pooled keep-alive connections. Linked pages on the same site are followed
+    with a human-like think time in between, so many simulated users can run
+    from one host without a GUI.
+
+    One engine is one simulated user: it has its own cookies and browser
+    cache. Engines of the same module may share an `adapter`, so they reuse
+    its pooled connections.
+    """
+
+    def __init__(self, session: requests.Session, max_parallel: int = 6, timeout: float = 15, log_event=None,
+                 adapter: HTTPAdapter = None):
+        self.session = session
+        # Subresources are fetched on pool threads, so events are tagged by the caller
+        self.log_event = log_event or event_log.emit
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        # Browsers open about six connections per host
+        self.__owns_adapter = adapter is None
+        adapter = adapter or new_adapter(max_parallel)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        user_agent = self.session.headers.get("User-Agent")
+        self.session.headers.clear()
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        self.session.headers.update(NAVIGATION_HEADERS)
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.fetched_resources = set()
+
+    def browse(self, url: str, config: dict) -> bool:
+        """Visit `url` and wander through same-site links for the configured browse time"""
+        sublinks = config.get("visit_sublinks", {})
+        follow_links = sublinks.get("enabled", True)
+        max_depth = sublinks.get("depth", 2)
+        max_links = sublinks.get("max_links", 4)
+        browse_time = random.randint(config.get("min_browse_time", 300), config.get("max_browse_time", 900))
+        simulate = config.get("simulate", False)
+
+        print(f">>> Browsing {url} without a browser for approximately {browse_time} seconds")
+        start_time = clock.time()
+        queue = [(url, 0, None)]
+        pages = 0
+        while queue and clock.time() - start_time < browse_time:
+            page_url, depth, referer = queue.pop(0)
+            if simulate:
+                print(f">>> [Simulated] Visiting {page_url}")
+                links = []
+            else:
+                links = self.visit(page_url, referer)
+                if links is None:
+                    if pages == 0:
+                        return False
+                    continue
+            pages += 1
+
+            if follow_links and depth < max_depth and links:
+                for link in random.sample(links, min(max_links, len(links))):
+                    queue.append((link, depth + 1, page_url))
+
+            # Reading time before the next click
+            clock.sleep(random.uniform(5, 20))
+
+        print(f">>> Visited {pages} pages in {clock.time() - start_time:.1f} seconds")
+        return True
+
+    def visit(self, url: str, referer: str = None):
+        """Load a page and its subresources, returning the same-site links found on it"""
+        headers = {"Referer": referer, "Sec-Fetch-Site": "same-origin"} if referer else {}
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f">>> Error fetching {url}: {e}")
+            self.__log_request(url, "document", outcome="error", error=str(e))
+            return None
+        print(f">>> GET {url} -> {response.status_code} ({len(response.content)} bytes)")
+        self.__log_request(url, "document", response)
+        if "html" not in response.headers.get("Content-Type", ""):
+            return []
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        page_url = response.url
+        self.fetch_subresources(page_url, self.find_subresources(soup, page_url))
+        return self.find_links(soup, page_url)
+
+    def fetch_subresources(self, page_url: str, resources) -> None:
+        # The browser cache would serve resources shared between pages
+        with self.__lock:
+            resources = [(kind, url) for kind, url in resources if url not in self.fetched_resources]
+            self.fetched_resources.update(url for _, url in resources)
+        if not resources:
+            return
+        executor = self.__get_executor()
+        futures = [executor.submit(self.__fetch_subresource, page_url, kind, url) for kind, url in resources]
+        total = sum(future.result() for future in futures)
+        print(f">>> Loaded {len(resources)} subresources of {page_url} ({total} bytes)")
+
+    def find_subresources(self, soup: BeautifulSoup, page_url: str):
+        resources = []
+        for tag in soup.find_all("img", src=True):
+            resources.append(("image", tag["src"]))
+        for tag in soup.find_all("script", src=True):
+            resources.append(("script", tag["src"]))
+        for tag in soup.find_all("link", href=True):
+            rel = [value.lower() for value in tag.get("rel", [])]
+            if "stylesheet" in rel:
+                resources.append(("style", tag["href"]))
+            elif "icon" in rel:
+                resources.append(("image", tag["href"]))
+            elif "preload" in rel and tag.get("as") in SUBRESOURCE_HEADERS:
+                resources.append((tag["as"], tag["href"]))
+
+        seen = set()
+        result = []
+        for kind, src in resources:
+            url = urldefrag(urljoin(page_url, src.strip()))[0]
+            if urlparse(url).scheme in ("http", "https") and url not in seen:
+                seen.add(url)
+                result.append((kind, url))
+        return result
+
+    def find_links(self, soup: BeautifulSoup, page_url: str):
+        host = urlparse(page_url).netloc
+        links = []
+        for tag in soup.find_all("a", href=True):
+            url = urldefrag(urljoin(page_url, tag["href"].strip()))[0]
+            parsed = urlparse(url)
+            if parsed.scheme in ("http", "https") and parsed.netloc == host and url != page_url and url not in links:
+                links.append(url)
+        return links
+
+    def close(self) -> None:
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        # Closing the session would close every adapter mounted on it
+        if self.__owns_adapter:
+            self.session.close()
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.max_parallel)
+            return self.__executor
+
+    def __fetch_subresource(self, page_url: str, kind: str, url: str) -> int:
+        accept, dest = SUBRESOURCE_HEADERS.get(kind, ("*/*", "empty"))
+        same_origin = urlparse(url).netloc == urlparse(page_url).netloc
+        headers = {
+            "Accept": accept,
+            "Referer": page_url,
+            "Sec-Fetch-Dest": dest,
+            "Sec-Fetch-Mode": "no-cors",
+            "Sec-Fetch-Site": "same-origin" if same_origin else "cross-site",
+            "Upgrade-Insecure-Requests": None,
+            "Sec-Fetch-User": None,
+        }
+        # Parser discovery and layout stagger the requests of a real page load
+        clock.sleep(random.uniform(0, 0.05))
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.__log_request(url, kind, outcome="error", error=str(e))
+            return 0
+        self.__log_request(url, kind, response)
+        return len(response.content)
+
+    def __log_request(self, url: str, kind: str, response=None, **fields) -> None:
+        parsed = urlparse(url)
+        if response is not None:
+            fields["status"] = response.status_code
+            fields["bytes"] = len(response.content)
+            fields["outcome"] = "ok" if response.status_code < 400 else "error"
+        self.log_event("http_request", url=url, host=parsed.hostname,
+                       port=parsed.port or (443 if parsed.scheme == "https" else 80), kind=kind, **fields)
@@ -1,20 +1,66 @@
 #!/usr/bin/env python3
 
-import time
 import random
 import platform
 import subprocess
 import os
 import requests
 import tempfile
+import threading
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, urljoin
-from datetime import datetime
 from .traffic_model import TrafficModel
+from .http_engine import HTTPBrowsingEngine, new_adapter
 from ..web_modules import get_module
+from .. import clock
+
+# Site keyword -> start page when browsing without a browser
+HTTP_ENGINE_SITES = {
+    "youtube": "https://www.youtube.com",
+    "soundcloud": "https://soundcloud.com",
+    "google": "https://www.google.com",
+    "download": "https://unsplash.com",
+    "firefox_search": "https://www.google.com",
+}
+
+# Module name -> connection pool of its browser-less engines, rebuilt in each new process
+_adapters = {}
+_adapters_pid = None
+_adapters_lock = threading.Lock()
+
+
+def get_adapter(model_config) -> HTTPAdapter:
+    """This process' connection pool for the module of `model_config`.
+
+    Each task browses with its own engine and cookies, like a separate
+    user, but the tasks of a module reuse one pool of keep-alive connections.
+    """
+    global _adapters_pid
+    key = getattr(model_config, "name", None) or id(model_config)
+    with _adapters_lock:
+        if _adapters_pid != os.getpid():
+            _adapters.clear()
+            _adapters_pid = os.getpid()
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = new_adapter(model_config.get("max_parallel_requests", 6))
+            _adapters[key] = adapter
+        return adapter
+
+
+def close_adapters() -> None:
+    """Close the connection pools built in this process"""
+    with _adapters_lock:
+        if _adapters_pid != os.getpid():
+            return
+        adapters = list(_adapters.values())
+        _adapters.clear()
+    for adapter in adapters:
+        adapter.close()
 
 class HTTPModel(TrafficModel):
-    def __init__(self, browser_type=None, driver=None, headless=False):
+    def __init__(self, browser_type=None, driver=None, headless=False, webdriver=False):
         super().__init__()
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
@@ -28,6 +74,7 @@ class HTTPModel(TrafficModel):
         self.use_real_browser = False
         self.driver = None
         self.headless = headless
+        self.webdriver = webdriver
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': random.choice(self.user_agents),
@@ -41,38 +88,36 @@ class HTTPModel(TrafficModel):
         return "HTTP/S"
 
     def generate(self) -> None:
-        if not self._is_within_work_hours():
-            print(">>> Current time is outside work hours. Skipping task.")
-            return
-            
         try:    
-            if "website" in self.model_config:
+            if self.model_config.get("engine") == "http":
+                self._generate_without_browser()
+            elif "website" in self.model_config:
                 website = self.model_config["website"].lower()
                 
                 if website == "youtube":
-                    module = get_module("youtube", self.headless)
+                    module = get_module("youtube", self.headless, self.webdriver)
                     module.execute(self.model_config)
                 elif website == "download":
-                    module = get_module("download", self.headless)
+                    module = get_module("download", self.headless, self.webdriver)
                     module.execute(self.model_config)
                 elif website == "soundcloud":
-                    module = get_module("soundcloud", self.headless)
+                    module = get_module("soundcloud", self.headless, self.webdriver)
                     module.execute(self.model_config)
                 elif website == "google":
-                    module = get_module("web", self.headless)
-                    self.model_config["website"] = "https://www.google.com"
-                    module.execute(self.model_config)
+                    module = get_module("web", self.headless, self.webdriver)
+                    module.execute(dict(self.model_config, website="https://www.google.com"))
                 elif website == "firefox_search":
-                    module = get_module("firefox_search", self.headless)
+                    module = get_module("firefox_search", self.headless, self.webdriver)
                     module.execute(self.model_config)
                 elif website == "custom_service":
-                    module = get_module("custom_service", self.headless)
+                    module = get_module("custom_service", self.headless, self.webdriver)
                     module.execute(self.model_config)
                 else:
-                    module = get_module("web", self.headless)
+                    module = get_module("web", self.headless, self.webdriver)
                     module.execute(self.model_config)
             elif "websites" in self.model_config:
-                websites = self.model_config["websites"]
+                # The config is shared by every task of this model, so shuffle a copy
+                websites = list(self.model_config["websites"])
                 if self.model_config.get("randomize", False):
                     random.shuffle(websites)
                     
@@ -80,43 +125,77 @@ class HTTPModel(TrafficModel):
                     if isinstance(website, dict):
                         site_type = website.get("type", "").lower()
                         if site_type == "youtube":
-                            module = get_module("youtube", self.headless)
+                            module = get_module("youtube", self.headless, self.webdriver)
                             module.execute(self.model_config)
                         elif site_type == "download":
-                            module = get_module("download", self.headless)
+                            module = get_module("download", self.headless, self.webdriver)
                             module.execute(self.model_config)
                         elif site_type == "soundcloud":
-                            module = get_module("soundcloud", self.headless)
+                            module = get_module("soundcloud", self.headless, self.webdriver)
                             module.execute(self.model_config)
                         elif site_type == "google":
-                            module = get_module("web", self.headless)
-                            self.model_config["website"] = "https://www.google.com"
-                            module.execute(self.model_config)
+                            module = get_module("web", self.headless, self.webdriver)
+                            module.execute(dict(self.model_config, website="https://www.google.com"))
                         elif site_type == "firefox_search":
-                            module = get_module("firefox_search", self.headless)
+                            module = get_module("firefox_search", self.headless, self.webdriver)
                             module.execute(self.model_config)
                         elif site_type == "custom_service":
-                            module = get_module("custom_service", self.headless)
+                            module = get_module("custom_service", self.headless, self.webdriver)
                             module.execute(self.model_config)
                         else:
-                            module = get_module("web", self.headless)
-                            self.model_config["website"] = website.get("url")
-                            module.execute(self.model_config)
+                            module = get_module("web", self.headless, self.webdriver)
+                            module.execute(dict(self.model_config, website=website.get("url")))
                     else:
-                        module = get_module("web", self.headless)
-                        self.model_config["website"] = website
-                        module.execute(self.model_config)
+                        module = get_module("web", self.headless, self.webdriver)
+                        module.execute(dict(self.model_config, website=website))
                     
                     rest_time = random.randint(5, 10)
                     print(f">>> Taking a break for {rest_time} minutes before next website")
-                    time.sleep(rest_time * 60)
+                    clock.sleep(rest_time * 60)
             elif "link" in self.model_config:
-                module = get_module("web", self.headless)
-                self.model_config["website"] = self.model_config["link"]
-                module.execute(self.model_config)
+                module = get_module("web", self.headless, self.webdriver)
+                module.execute(dict(self.model_config, website=self.model_config["link"]))
         except Exception as e:
             print(f">>> Error in HTTP model execution: {e}")
 
+    def _generate_without_browser(self) -> None:
+        # The model's session keeps its own headers; the engine gets a fresh one
+        session = requests.Session()
+        session.headers["User-Agent"] = self.session.headers.get("User-Agent")
+        engine = HTTPBrowsingEngine(session, self.model_config.get("max_parallel_requests", 6),
+                                    timeout=self.model_config.get("timeout", 15), log_event=self.log_event,
+                                    adapter=get_adapter(self.model_config))
+        try:
+            self._browse_without_browser(engine)
+        finally:
+            engine.close()
+
+    def _browse_without_browser(self, engine: HTTPBrowsingEngine) -> None:
+
+        if "website" in self.model_config:
+            websites = [self.model_config["website"]]
+        elif "websites" in self.model_config:
+            websites = list(self.model_config["websites"])
+            if self.model_config.get("randomize", False):
+                random.shuffle(websites)
+        else:
+            websites = [self.model_config["link"]]
+
+        for index, website in enumerate(websites):
+            if isinstance(website, dict):
+                url = website.get("url") or HTTP_ENGINE_SITES.get(website.get("type", "").lower())
+            else:
+                url = HTTP_ENGINE_SITES.get(website.lower(), website)
+            if not url or urlparse(url).scheme not in ("http", "https"):
+                print(f">>> Skipping {website}: it needs a real browser")
+                continue
+            engine.browse(url, self.model_config)
+
+            if index < len(websites) - 1:
+                rest_time = random.randint(5, 10)
+                print(f">>> Taking a break for {rest_time} minutes before next website")
+                clock.sleep(rest_time * 60)
+
     def verify(self) -> bool:
         if not (("website" in self.model_config) or 
                 ("websites" in self.model_config) or 
@@ -124,22 +203,3 @@ class HTTPModel(TrafficModel):
             print(">>> Error in HTTP/S model: No website to visit specified in the config!")
             return False
         return True
-        
-    def _is_within_work_hours(self):
-        if "work_hours" not in self.model_config:
-            return True
-            
-        now = datetime.now().time()
-        start_time_str = self.model_config["work_hours"].get("start", "09:00")
-        end_time_str = self.model_config["work_hours"].get("end", "17:00")
-        
-        try:
-            start_time = datetime.strptime(start_time_str, "%H:%M").time()
-            end_time = datetime.strptime(end_time_str, "%H:%M").time()
-            
-            if start_time <= now <= end_time:
-                return True
-            return False
-        except Exception as e:
-            print(f">>> Error parsing work hours: {e}")
-            return True
\ No newline at end of file
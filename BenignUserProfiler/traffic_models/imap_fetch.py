@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import binascii
+import quopri
+import re
+from email.header import decode_header, make_header
+
+_MESSAGE_START = re.compile(rb'^\s*(\d+) \(')
+_LITERAL_ITEM = re.compile(rb'(BODY\[[^\]]*\](?:<\d+>)?) \{\d+\}$')
+_TOKEN = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}\r\n|([^\s()"]+))', re.S)
+
+# Largest slice of an attachment decoded at once when writing it to disk
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+def parse_fetch_response(data) -> dict:
+    """Group an imaplib FETCH response for a message set by message number.
+
+    Returns {message_number: {"BODY[HEADER]": bytes, "BODY[TEXT]<0>": bytes,
+    ..., "meta": bytes}} where "meta" holds the non-literal data items such
+    as BODYSTRUCTURE and FLAGS.
+    """
+    messages = {}
+    current = None
+    for item in data:
+        if isinstance(item, tuple):
+            head, literal = item
+        else:
+            head, literal = item, None
+        if not isinstance(head, bytes):
+            continue
+
+        match = _MESSAGE_START.match(head)
+        if match:
+            current = messages.setdefault(match.group(1).decode(), {"meta": b""})
+        if current is None:
+            continue
+
+        if literal is not None:
+            name = _LITERAL_ITEM.search(head)
+            if name:
+                current[name.group(1).decode().upper()] = literal
+                head = head[:name.start()]
+        current["meta"] += b" " + head
+    return messages
+
+
+def parse_bodystructure(meta: bytes):
+    """Parse the BODYSTRUCTURE data item out of FETCH meta data into nested lists"""
+    index = meta.upper().find(b"BODYSTRUCTURE")
+    if index < 0:
+        return None
+    value, _ = _parse_list(meta, index + len(b"BODYSTRUCTURE"))
+    return value
+
+
+def _parse_list(data: bytes, position: int):
+    match = _TOKEN.match(data, position)
+    if not match or match.group(1) is None:
+        return None, position
+    position = match.end()
+    items = []
+    while True:
+        match = _TOKEN.match(data, position)
+        if not match:
+            return items, len(data)
+        if match.group(1) is not None:
+            value, position = _parse_list(data, position)
+            items.append(value)
+            continue
+        position = match.end()
+        if match.group(2) is not None:
+            return items, position
+        if match.group(3) is not None:
+            items.append(re.sub(rb'\\(.)', rb'\1', match.group(3)).decode(errors="replace"))
+        elif match.group(4) is not None:
+            length = int(match.group(4))
+            items.append(data[position:position + length].decode(errors="replace"))
+            position += length
+        else:
+            atom = match.group(5).decode(errors="replace")
+            items.append(None if atom.upper() == "NIL" else atom)
+
+
+def find_attachments(structure, section: str = ""):
+    """List (section, filename, encoding, size) for every attachment in a parsed BODYSTRUCTURE"""
+    if not isinstance(structure, list) or not structure:
+        return []
+
+    # Multipart: child bodies first, then the subtype string
+    if isinstance(structure[0], list):
+        attachments = []
+        for number, child in enumerate((part for part in structure if isinstance(part, list)), 1):
+            child_section = f"{section}.{number}" if section else str(number)
+            attachments.extend(find_attachments(child, child_section))
+        return attachments
+
+    body_type = (structure[0] or "").lower()
+    body_subtype = (structure[1] or "").lower() if len(structure) > 1 else ""
+    if body_type == "text":
+        disposition_index = 9
+    elif body_type == "message" and body_subtype == "rfc822":
+        disposition_index = 11
+    else:
+        disposition_index = 8
+
+    filename = None
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    if isinstance(disposition, list) and len(disposition) > 1:
+        filename = _param(disposition[1], "filename")
+    if filename is None and len(structure) > 2:
+        filename = _param(structure[2], "name")
+    is_attachment = isinstance(disposition, list) and (disposition[0] or "").lower() == "attachment"
+    if not filename and not is_attachment:
+        return []
+
+    encoding = (structure[5] or "7bit").lower() if len(structure) > 5 else "7bit"
+    size = int(structure[6]) if len(structure) > 6 and str(structure[6]).isdigit() else 0
+    return [(section or "1", _decode_filename(filename or f"attachment_{section or '1'}"), encoding, size)]
+
+
+def _param(params, name: str):
+    if not isinstance(params, list):
+        return None
+    for key, value in zip(params[::2], params[1::2]):
+        if isinstance(key, str) and key.lower() == name:
+            return value
+    return None
+
+
+def _decode_filename(filename: str) -> str:
+    try:
+        filename = str(make_header(decode_header(filename)))
+    except Exception:
+        pass
+    # Never let a remote filename escape the attachments directory
+    return filename.replace("/", "_").replace("\\", "_")
+
+
+def write_decoded(payload: bytes, encoding: str, output_file) -> int:
+    """Decode a transfer-encoded body part into `output_file` slice by slice, returning bytes written"""
+    written = 0
+    if encoding == "base64":
+        remainder = b""
+        view = memoryview(payload)
+        for offset in range(0, len(view), DECODE_CHUNK_SIZE):
+            chunk = remainder + bytes(view[offset:offset + DECODE_CHUNK_SIZE]).translate(None, b"\r\n\t ")
+            usable = len(chunk) - len(chunk) % 4
+            remainder = chunk[usable:]
+            decoded = binascii.a2b_base64(chunk[:usable])
+            output_file.write(decoded)
+            written += len(decoded)
+        if remainder:
+            decoded = binascii.a2b_base64(remainder + b"=" * (-len(remainder) % 4))
+            output_file.write(decoded)
+            written += len(decoded)
+    elif encoding == "quoted-printable":
+        decoded = quopri.decodestring(payload)
+        output_file.write(decoded)
+        written = len(decoded)
+    else:
+        output_file.write(payload)
+        written = len(payload)
+    return written
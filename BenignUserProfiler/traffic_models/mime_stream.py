@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import base64
+import email.policy
+import mimetypes
+import os
+import secrets
+from email.header import Header
+from email.mime.text import MIMEText
+
+# Source bytes per base64 block; a multiple of 57 so every block fills whole 76 column lines
+ENCODE_CHUNK_SIZE = 57 * 1024
+
+
+def _header(name: str, value: str) -> bytes:
+    try:
+        value.encode("ascii")
+    except UnicodeEncodeError:
+        value = Header(value, "utf-8").encode()
+    return f"{name}: {value}\r\n".encode("ascii")
+
+
+def _make_boundary() -> str:
+    # Same shape as the email package's boundaries; 128 random bits make a clash with the body negligible
+    return "=" * 15 + secrets.token_hex(16) + "=="
+
+
+def _dot_stuff(data: bytes) -> bytes:
+    # SMTP DATA ends at a line holding a single dot, so escape lines starting with one
+    data = data.replace(b"\r\n.", b"\r\n..")
+    if data.startswith(b"."):
+        data = b"." + data
+    return data
+
+
+def iter_message(sender: str, receivers, subject: str, text: str, attachments=()):
+    """Yield a multipart/mixed message as dot-stuffed CRLF byte chunks for an SMTP DATA stream.
+
+    Attachments are read and base64 encoded ENCODE_CHUNK_SIZE bytes at a
+    time, so memory use does not grow with their size. Every chunk ends on
+    a line boundary and the last one ends with CRLF.
+    """
+    boundary = _make_boundary()
+    head = b"".join([
+        _header("Subject", subject),
+        _header("From", sender),
+        _header("To", ", ".join(receivers)),
+        b"MIME-Version: 1.0\r\n",
+        f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n'.encode("ascii"),
+        b"\r\n",
+    ])
+    yield _dot_stuff(head)
+
+    text_part = MIMEText(text).as_bytes(policy=email.policy.SMTP)
+    yield _dot_stuff(f"--{boundary}\r\n".encode("ascii") + text_part.rstrip(b"\r\n") + b"\r\n")
+
+    for attachment in attachments:
+        name = os.path.basename(attachment)
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        with open(attachment, "rb") as attached_file:
+            yield _dot_stuff(b"".join([
+                f"--{boundary}\r\n".encode("ascii"),
+                _header("Content-Type", f'{content_type}; name="{name}"'),
+                b"MIME-Version: 1.0\r\n",
+                b"Content-Transfer-Encoding: base64\r\n",
+                _header("Content-Disposition", f'attachment; filename="{name}"'),
+                b"\r\n",
+            ]))
+            while True:
+                block = attached_file.read(ENCODE_CHUNK_SIZE)
+                if not block:
+                    break
+                # base64 lines never start with a dot, so no stuffing is needed here
+                yield base64.encodebytes(block).replace(b"\n", b"\r\n")
+
+    yield f"--{boundary}--\r\n".encode("ascii")
@@ -1,48 +1,60 @@
 #!/usr/bin/env python3
 
-from datetime import datetime
+import importlib
 from .traffic_model import TrafficModel
-from .http_model import HTTPModel
-from .ssh_model import SSHModel
-from .cmd_model import CMDModel
-from .email_model import SMTPModel, IMAPModel
-from .ftp_model import FTPModel
+
+# Model type -> (module, class). Modules are imported on first use so a
+# profile only pays for the protocol stacks (paramiko, requests, bs4, ...)
+# it actually schedules.
+MODEL_REGISTRY = {
+    "HTTP": ("http_model", "HTTPModel"),
+    "HTTPS": ("http_model", "HTTPModel"),
+    "SSH": ("ssh_model", "SSHModel"),
+    "CMD": ("cmd_model", "CMDModel"),
+    "SMTP": ("email_model", "SMTPModel"),
+    "IMAP": ("email_model", "IMAPModel"),
+    "FTP": ("ftp_model", "FTPModel"),
+    "SFTP": ("ftp_model", "FTPModel"),
+}
+
+_model_classes = {}
+
+
+def get_model_class(model_type: str):
+    """Resolve the model class registered for `model_type`, importing its module on first use"""
+    model_type = model_type.upper()
+    if model_type not in _model_classes:
+        module_name, class_name = MODEL_REGISTRY[model_type]
+        module = importlib.import_module(f".{module_name}", __package__)
+        _model_classes[model_type] = getattr(module, class_name)
+    return _model_classes[model_type]
 
 
 class ModelFactory(object):
-    def __init__(self, headless: bool):
+    def __init__(self, headless: bool, webdriver: bool = False):
         self.headless = headless
+        self.webdriver = webdriver
 
-    def create_model(self, model_config: dict) -> TrafficModel:
-        model_type = model_config["type"].upper()
+    def create_model(self, model_config) -> TrafficModel:
+        """Create the model of a compiled ModuleConfig"""
+        model_type = model_config.type
         model: TrafficModel
+
+        model_class = get_model_class(model_type)
         
         if model_type == "HTTP" or model_type == "HTTPS":
             # Initialize HTTP model with real browser
-            model = HTTPModel(headless=self.headless)
-                
-        elif model_type == "SSH":
-            model = SSHModel()
-        elif model_type == "CMD":
-            model = CMDModel()
-        elif model_type == "SMTP":
+            model = model_class(headless=self.headless, webdriver=self.webdriver)
+        elif model_type == "SMTP" or model_type == "IMAP":
             # Check email service type for specialized handling
             if "service" in model_config:
-                model = SMTPModel(model_config["service"])
-            else:
-                model = SMTPModel()
-        elif model_type == "IMAP":
-            if "service" in model_config:
-                model = IMAPModel(model_config["service"])
+                model = model_class(model_config["service"])
             else:
-                model = IMAPModel()
-        elif model_type == "FTP":
-            model = FTPModel()
+                model = model_class()
         elif model_type == "SFTP":
-            model = FTPModel(True)
+            model = model_class(True)
         else:
-            print(f">>> Error occurred in creating models, unknown type '{model_config['type']}'!")
-            return None
+            model = model_class()
             
         # Configure the model
         model.model_config = model_config
@@ -50,13 +62,10 @@ class ModelFactory(object):
             print(f">>> Error occurred in {model} model! Ignoring this model.")
             return None
 
-        # Set scheduling parameters if provided
-        if "start_time" in model_config:
-            model.start_time = datetime.strptime(model_config["start_time"],
-                                               model_config["start_time_format"])
-        if "frequency" in model_config:
-            model.frequency = model_config["frequency"]
-        if "time_interval" in model_config:
-            model.time_interval = model_config["time_interval"]
+        # Scheduling parameters were parsed when the config was compiled
+        if model_config.start_time is not None:
+            model.start_time = model_config.start_time
+        model.frequency = model_config.frequency
+        model.time_interval = model_config.time_interval
             
-        return model
\ No newline at end of file
+        return model
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+import os
+import smtplib
+import threading
+import time
+
+# Service -> (host, port, use implicit SSL)
+SMTP_SERVERS = {
+    "gmail": ("smtp.gmail.com", 465, True),
+    "outlook": ("smtp-mail.outlook.com", 587, False),
+    "hotmail": ("smtp-mail.outlook.com", 587, False),
+    "yahoo": ("smtp.mail.yahoo.com", 465, True),
+}
+
+
+def send_streamed(server, from_address, to_addresses, chunks) -> dict:
+    """smtplib.SMTP.sendmail for a message given as an iterable of ready-to-send byte chunks"""
+    server.ehlo_or_helo_if_needed()
+    code, response = server.mail(from_address)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, response, from_address)
+
+    refused = {}
+    for address in to_addresses:
+        code, response = server.rcpt(address)
+        if code not in (250, 251):
+            refused[address] = (code, response)
+    if len(refused) == len(to_addresses):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, response = server.docmd("DATA")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+    try:
+        for chunk in chunks:
+            server.send(chunk)
+        server.send(b".\r\n")
+        code, response = server.getreply()
+    except BaseException:
+        # The session is stuck inside DATA, where the next MAIL FROM would be read as
+        # message text; close it so the pool drops it instead of reusing it
+        server.close()
+        raise
+    if code != 250:
+        raise smtplib.SMTPDataError(code, response)
+    return refused
+
+
+class PooledSMTPConnection(object):
+    """Authenticated SMTP connection borrowed from an SMTPConnectionPool"""
+
+    def __init__(self, pool, service: str, sender: str, password: str, server, timeout: float = None):
+        self.pool = pool
+        self.service = service
+        self.sender = sender
+        self.password = password
+        self.server = server
+        self.timeout = timeout
+
+    def sendmail(self, from_address, to_addresses, message):
+        """Send a message, reconnecting once if the server dropped the session"""
+        try:
+            return self.server.sendmail(from_address, to_addresses, message)
+        except smtplib.SMTPServerDisconnected:
+            print(f">>> SMTP connection to {self.service} was closed, reconnecting")
+            self.reconnect()
+            return self.server.sendmail(from_address, to_addresses, message)
+
+    def sendmail_streamed(self, from_address, to_addresses, message_chunks):
+        """Send a message produced chunk by chunk by `message_chunks()`.
+
+        The chunks must already be dot-stuffed and end with CRLF. They are
+        written to the DATA stream as they are produced, so the full message
+        is never held in memory.
+        """
+        try:
+            return send_streamed(self.server, from_address, to_addresses, message_chunks())
+        except smtplib.SMTPServerDisconnected:
+            print(f">>> SMTP connection to {self.service} was closed, reconnecting")
+            self.reconnect()
+            return send_streamed(self.server, from_address, to_addresses, message_chunks())
+
+    def reconnect(self) -> None:
+        self.pool.close_server(self.server)
+        self.server = self.pool.connect(self.service, self.sender, self.password, self.timeout)
+
+    def release(self) -> None:
+        """Return the connection to the pool for the next task"""
+        self.pool.release(self)
+
+    def discard(self) -> None:
+        """Close the connection instead of returning it to the pool"""
+        self.pool.close_server(self.server)
+
+
+class SMTPConnectionPool(object):
+    """Process-wide pool of logged-in SMTP connections keyed by (service, sender).
+
+    Idle connections are kept alive with NOOP commands from a daemon thread
+    and are checked again before being handed out, so a task only pays for
+    the TLS handshake and AUTH when the previous session really is gone.
+    Every socket operation times out after `timeout` seconds, so a half-open
+    connection cannot block a task or the keepalive thread.
+    """
+
+    def __init__(self, keepalive_interval: float = 60, max_idle_time: float = 900, timeout: float = 30):
+        self.keepalive_interval = keepalive_interval
+        self.max_idle_time = max_idle_time
+        self.timeout = timeout
+        self.__idle = {}
+        self.__lock = threading.Lock()
+        self.__keepalive_thread = None
+        self.__pid = os.getpid()
+
+    def acquire(self, service: str, sender: str, password: str, timeout: float = None) -> PooledSMTPConnection:
+        self.__check_fork()
+        key = (service, sender)
+        while True:
+            with self.__lock:
+                idle = self.__idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+
+            server, idle_since = entry
+            if time.monotonic() - idle_since > self.max_idle_time or not self.__is_alive(server):
+                self.close_server(server)
+                continue
+            print(f">>> Reusing {service} SMTP connection for {sender}")
+            return PooledSMTPConnection(self, service, sender, password, server, timeout)
+
+        server = self.connect(service, sender, password, timeout)
+        return PooledSMTPConnection(self, service, sender, password, server, timeout)
+
+    def connect(self, service: str, sender: str, password: str, timeout: float = None):
+        """Open a new connection for `service` and log in as `sender`"""
+        # Default to Gmail
+        host, port, use_ssl = SMTP_SERVERS.get(service, SMTP_SERVERS["gmail"])
+        timeout = timeout or self.timeout
+        if use_ssl:
+            server = smtplib.SMTP_SSL(host, port, timeout=timeout)
+        else:
+            server = smtplib.SMTP(host, port, timeout=timeout)
+            try:
+                server.starttls()
+            except Exception:
+                self.close_server(server)
+                raise
+        print(f">>> Connected to {service} SMTP server on port {port}")
+
+        print(f">>> Logging in to email server as {sender}")
+        try:
+            server.login(sender, password)
+        except Exception:
+            self.close_server(server)
+            raise
+        return server
+
+    def release(self, connection: PooledSMTPConnection) -> None:
+        self.__check_fork()
+        with self.__lock:
+            self.__idle.setdefault((connection.service, connection.sender), []).append(
+                (connection.server, time.monotonic()))
+            if self.__keepalive_thread is None:
+                self.__keepalive_thread = threading.Thread(target=self.__keepalive_loop, daemon=True)
+                self.__keepalive_thread.start()
+
+    def close_server(self, server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close_all(self) -> None:
+        with self.__lock:
+            idle, self.__idle = self.__idle, {}
+        for entries in idle.values():
+            for server, _ in entries:
+                self.close_server(server)
+
+    def __is_alive(self, server) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def __keepalive_loop(self) -> None:
+        while True:
+            time.sleep(self.keepalive_interval)
+            with self.__lock:
+                entries = [(key, entry) for key, idle in self.__idle.items() for entry in idle]
+                self.__idle = {}
+
+            now = time.monotonic()
+            for key, (server, idle_since) in entries:
+                if now - idle_since > self.max_idle_time or not self.__is_alive(server):
+                    self.close_server(server)
+                    continue
+                with self.__lock:
+                    self.__idle.setdefault(key, []).append((server, idle_since))
+
+    def __check_fork(self) -> None:
+        # Sockets inherited from the parent must not be shared with it
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__idle = {}
+            self.__lock = threading.Lock()
+            self.__keepalive_thread = None
+
+
+_smtp_pool = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPConnectionPool()
+    return _smtp_pool
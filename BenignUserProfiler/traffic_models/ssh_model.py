@@ -4,8 +4,10 @@ from datetime import datetime
 import time
 import random
 import os
-import paramiko
+from concurrent.futures import ThreadPoolExecutor
 from .traffic_model import TrafficModel
+from .ssh_pool import get_ssh_pool
+from .. import clock
 
 
 class SSHModel(TrafficModel):
@@ -50,37 +52,22 @@ class SSHModel(TrafficModel):
             self._simulate_ssh_operations()
             return
             
-        # Connect to SSH server
-        ssh = None
+        # Borrow an authenticated connection from the pool
+        connection = None
         try:
             print(f">>> Connecting to SSH server: {host}:{port}")
             print(f">>> Username: {username}")
             
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Connect using either private key or password
-            if password is None and private_key is not None:
-                print(f">>> Using private key authentication: {private_key}")
-                private_key_file = paramiko.RSAKey.from_private_key_file(private_key)
-                ssh.connect(
-                    hostname=host, 
-                    port=port, 
-                    username=username, 
-                    pkey=private_key_file,
-                    timeout=timeout
-                )
-            else:
-                print(f">>> Using password authentication")
-                ssh.connect(
-                    hostname=host, 
-                    port=port, 
-                    username=username, 
-                    password=password,
-                    timeout=timeout
-                )
+            connection = get_ssh_pool().acquire(
+                host, port, username,
+                password=password,
+                private_key=private_key,
+                timeout=timeout
+            )
+            ssh = connection.client
                 
             print(f">>> Successfully connected to {host}")
+            self.log_event("ssh_connect", host=host, port=port, user=username, outcome="ok")
             
             # Try to get system information
             try:
@@ -96,102 +83,130 @@ class SSHModel(TrafficModel):
                 print("\n>>> Performing SCP file transfers")
                 self._perform_scp_operations(ssh, host, port, username, password)
             
-            # Execute each command
-            for i, command in enumerate(commands):
-                cmd_str = command.get("str") or command.get("command")
-                show_output = command.get("show_output", True)
-                
-                if not cmd_str:
-                    print(">>> Error: Missing command string")
-                    continue
-                
-                print(f"\n>>> Executing command [{i+1}/{len(commands)}]: {cmd_str}")
-                
-                try:
-                    # Record start time for performance measurement
-                    start_time = time.time()
-                    
-                    # Execute the command
-                    stdin, stdout, stderr = ssh.exec_command(cmd_str)
-                    
-                    # Wait for command to complete
-                    exit_status = stdout.channel.recv_exit_status()
-                    
-                    # Calculate execution time
-                    end_time = time.time()
-                    execution_time = end_time - start_time
-                    
-                    # Get command output
-                    output = stdout.read().decode()
-                    error = stderr.read().decode()
-                    
-                    # Print status and execution time
-                    if exit_status == 0:
-                        print(f">>> Command completed successfully in {execution_time:.2f} seconds")
-                    else:
-                        print(f">>> Command failed with exit status {exit_status} in {execution_time:.2f} seconds")
-                    
-                    # Show command output if requested
-                    if show_output:
-                        if output:
-                            print(">>> Command output:")
-                            # Limit output to avoid excessive console spam
-                            output_lines = output.split("\n")
-                            if len(output_lines) > 20:
-                                print("\n".join(output_lines[:10]))
-                                print(f"... ({len(output_lines) - 20} lines hidden) ...")
-                                print("\n".join(output_lines[-10:]))
-                            else:
-                                print(output)
-                        else:
-                            print(">>> No output from command")
-                            
-                        # Show errors if any
-                        if error:
-                            print(">>> Command errors:")
-                            print(error)
-                    else:
-                        print(">>> Output hidden (show_output=False)")
-                    
-                    # Wait after command if specified
-                    if "wait_after" in command:
-                        wait_time = command["wait_after"]
-                        print(f">>> Waiting {wait_time} seconds before next command...")
-                        time.sleep(wait_time)
-                    else:
-                        # Small default delay
-                        time.sleep(random.uniform(0.5, 2))
-                        
-                except Exception as e:
-                    print(f">>> Error executing command: {cmd_str}")
-                    print(f">>> {type(e).__name__}: {str(e)}")
+            # Execute each command, running consecutive "parallel" commands on concurrent channels
+            for batch in self._command_batches(commands):
+                if len(batch) == 1:
+                    i, command = batch[0]
+                    self._execute_command(ssh, i, len(commands), command)
+                    self._wait_after([command])
                     continue
+
+                print(f"\n>>> Executing {len(batch)} commands in parallel")
+                with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+                    for i, command in batch:
+                        executor.submit(self._execute_command, ssh, i, len(commands), command)
+                self._wait_after([command for _, command in batch])
             
             # Clean up SCP files if any were created
             if self.scp_files and self.model_config.get("cleanup_scp_files", True):
                 print("\n>>> Cleaning up SCP test files")
                 self._cleanup_scp_files(ssh)
             
-            # Close connection
-            print("\n>>> Closing SSH connection...")
-            ssh.close()
+            # Keep the transport open for the next task
+            print("\n>>> Returning SSH connection to the pool...")
+            connection.release()
+            connection = None
             print(">>> SSH session completed successfully")
             
         except Exception as e:
             print(f">>> Error in SSH connection/operations:")
+            self.log_event("ssh_session", host=host, port=port, user=username, outcome="error", error=str(e))
             print(f">>> {type(e).__name__}: {str(e)}")
             # If this was a connection error, try with different port or settings
             if "connect" in str(e).lower() and self.model_config.get("retry_on_failure", True):
                 print(">>> Connection failed, will retry with alternative settings...")
-                time.sleep(2)
+                clock.sleep(2)
                 self._retry_with_alternative_settings()
         finally:
-            # Ensure SSH connection is closed
-            if ssh:
-                try:
-                    ssh.close()
-                except:
-                    pass
+            # A connection that was not returned to the pool may be in a bad state
+            if connection is not None:
+                connection.discard()
+
+    def _command_batches(self, commands):
+        """Group commands into batches so consecutive "parallel" commands run together"""
+        batches = []
+        for i, command in enumerate(commands):
+            if command.get("parallel", False) and batches and batches[-1][-1][1].get("parallel", False):
+                batches[-1].append((i, command))
+            else:
+                batches.append([(i, command)])
+        return batches
+
+    def _wait_after(self, commands) -> None:
+        wait_times = [command["wait_after"] for command in commands if "wait_after" in command]
+        if wait_times:
+            wait_time = max(wait_times)
+            print(f">>> Waiting {wait_time} seconds before next command...")
+            clock.sleep(wait_time)
+        else:
+            # Small default delay
+            clock.sleep(random.uniform(0.5, 2))
+
+    def _execute_command(self, ssh, i: int, total: int, command: dict) -> None:
+        """Run one command on its own channel and print its result in a single block"""
+        cmd_str = command.get("str") or command.get("command")
+        show_output = command.get("show_output", True)
+        
+        if not cmd_str:
+            print(">>> Error: Missing command string")
+            return
+        
+        lines = [f"\n>>> Executing command [{i+1}/{total}]: {cmd_str}"]
+        try:
+            # Record start time for performance measurement
+            start_time = time.time()
+            
+            # Execute the command
+            stdin, stdout, stderr = ssh.exec_command(cmd_str)
+            
+            # Wait for command to complete
+            exit_status = stdout.channel.recv_exit_status()
+            
+            # Calculate execution time
+            end_time = time.time()
+            execution_time = end_time - start_time
+            
+            # Get command output
+            output = stdout.read().decode()
+            error = stderr.read().decode()
+            self.log_event("ssh_command", host=self.model_config["address"], port=self.model_config.get("port", 22),
+                           command=cmd_str, bytes=len(output) + len(error), duration=execution_time,
+                           outcome="ok" if exit_status == 0 else "error", exit_status=exit_status)
+            
+            # Print status and execution time
+            if exit_status == 0:
+                lines.append(f">>> Command completed successfully in {execution_time:.2f} seconds")
+            else:
+                lines.append(f">>> Command failed with exit status {exit_status} in {execution_time:.2f} seconds")
+            
+            # Show command output if requested
+            if show_output:
+                if output:
+                    lines.append(">>> Command output:")
+                    # Limit output to avoid excessive console spam
+                    output_lines = output.split("\n")
+                    if len(output_lines) > 20:
+                        lines.append("\n".join(output_lines[:10]))
+                        lines.append(f"... ({len(output_lines) - 20} lines hidden) ...")
+                        lines.append("\n".join(output_lines[-10:]))
+                    else:
+                        lines.append(output)
+                else:
+                    lines.append(">>> No output from command")
+                    
+                # Show errors if any
+                if error:
+                    lines.append(">>> Command errors:")
+                    lines.append(error)
+            else:
+                lines.append(">>> Output hidden (show_output=False)")
+                
+        except Exception as e:
+            self.log_event("ssh_command", host=self.model_config["address"], port=self.model_config.get("port", 22),
+                           command=cmd_str, outcome="error", error=str(e))
+            lines.append(f">>> Error executing command: {cmd_str}")
+            lines.append(f">>> {type(e).__name__}: {str(e)}")
+        print("\n".join(lines))
     
     def _simulate_ssh_operations(self):
         """Simulate SSH operations without actually connecting to a server"""
@@ -232,7 +247,7 @@ class SSHModel(TrafficModel):
             
             # Simulate execution time
             execution_time = random.uniform(0.1, 2.0)
-            time.sleep(min(execution_time, 1.0))  # Don't wait too long in simulation
+            clock.sleep(min(execution_time, 1.0))  # Don't wait too long in simulation
             
             print(f">>> [SIMULATION] Command completed in {execution_time:.2f} seconds")
             
@@ -257,9 +272,9 @@ class SSHModel(TrafficModel):
             if "wait_after" in command:
                 wait_time = min(command["wait_after"], 2)  # Cap wait time for simulation
                 print(f">>> [SIMULATION] Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time)
             else:
-                time.sleep(random.uniform(0.2, 0.5))
+                clock.sleep(random.uniform(0.2, 0.5))
         
         print("\n>>> [SIMULATION] Closing SSH connection")
         print(">>> [SIMULATION] SSH session completed successfully")
@@ -353,6 +368,9 @@ class SSHModel(TrafficModel):
             temp_dir = "/tmp/scp_test_files"
             ssh.exec_command(f"mkdir -p {temp_dir}")
             
+            # One SFTP channel is shared by every fallback upload
+            sftp = None
+
             # Number of files to transfer
             num_transfers = random.randint(3, 7)
             print(f">>> Will perform {num_transfers} SCP file transfers")
@@ -402,9 +420,9 @@ class SSHModel(TrafficModel):
                 except ImportError:
                     # Fallback to using sftp subsystem
                     try:
-                        sftp = ssh.open_sftp()
+                        if sftp is None:
+                            sftp = ssh.open_sftp()
                         sftp.put(local_file, remote_file)
-                        sftp.close()
                         print(f">>> Successfully uploaded file using SFTP subsystem")
                     except Exception as e:
                         print(f">>> Error uploading file: {e}")
@@ -417,8 +435,12 @@ class SSHModel(TrafficModel):
                     pass
                 
                 # Small delay between transfers
-                time.sleep(random.uniform(1, 3))
+                clock.sleep(random.uniform(1, 3))
             
+            if sftp is not None:
+                sftp.close()
+                sftp = None
+
             # Verify the transfers
             stdin, stdout, stderr = ssh.exec_command(f"ls -la {temp_dir}")
             output = stdout.read().decode()
@@ -441,7 +463,7 @@ class SSHModel(TrafficModel):
             try:
                 print(f">>> Removing {file_path}")
                 ssh.exec_command(f"rm -f {file_path}")
-                time.sleep(0.5)
+                clock.sleep(0.5)
             except Exception as e:
                 print(f">>> Error removing file {file_path}: {e}")
         
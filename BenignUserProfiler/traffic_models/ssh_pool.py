@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+import paramiko
+
+
+class PooledSSHConnection(object):
+    """Authenticated SSH client borrowed from an SSHConnectionPool.
+
+    Every exec_command/open_sftp call opens a new channel on the same
+    transport, so several of them can run at once from different threads.
+    """
+
+    def __init__(self, pool, key: tuple, client):
+        self.pool = pool
+        self.key = key
+        self.client = client
+
+    def exec_command(self, command: str, timeout=None):
+        return self.client.exec_command(command, timeout=timeout)
+
+    def open_sftp(self):
+        return self.client.open_sftp()
+
+    def release(self) -> None:
+        """Return the connection to the pool for the next task"""
+        self.pool.release(self)
+
+    def discard(self) -> None:
+        """Close the connection instead of returning it to the pool"""
+        self.pool.close_client(self.client)
+
+
+class SSHConnectionPool(object):
+    """Process-wide pool of authenticated SSH transports keyed by (host, port, username).
+
+    Transports send SSH keepalives while idle and are checked again before
+    being handed out, so a repeated task only pays for the key exchange and
+    authentication when the previous session really is gone. Parsed private
+    keys are cached by path for the life of the process.
+    """
+
+    def __init__(self, keepalive_interval: int = 30, max_idle_time: float = 900):
+        self.keepalive_interval = keepalive_interval
+        self.max_idle_time = max_idle_time
+        self.__idle = {}
+        self.__keys = {}
+        self.__lock = threading.Lock()
+        self.__pid = os.getpid()
+
+    def acquire(self, host: str, port: int, username: str, password=None, private_key=None,
+                timeout: float = 30) -> PooledSSHConnection:
+        self.__check_fork()
+        key = (host, port, username)
+        self.__close_expired()
+        while True:
+            with self.__lock:
+                idle = self.__idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+
+            client, _ = entry
+            if not self.__is_alive(client):
+                self.close_client(client)
+                continue
+            print(f">>> Reusing SSH connection to {host}:{port} as {username}")
+            return PooledSSHConnection(self, key, client)
+
+        client = self.connect(host, port, username, password, private_key, timeout)
+        return PooledSSHConnection(self, key, client)
+
+    def connect(self, host: str, port: int, username: str, password=None, private_key=None,
+                timeout: float = 30):
+        """Open a new SSH client to `host` and authenticate as `username`"""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        # Connect using either private key or password
+        try:
+            if password is None and private_key is not None:
+                print(f">>> Using private key authentication: {private_key}")
+                client.connect(hostname=host, port=port, username=username,
+                               pkey=self.load_private_key(private_key), timeout=timeout)
+            else:
+                print(">>> Using password authentication")
+                client.connect(hostname=host, port=port, username=username,
+                               password=password, timeout=timeout)
+        except Exception:
+            self.close_client(client)
+            raise
+
+        transport = client.get_transport()
+        if transport is not None and self.keepalive_interval:
+            transport.set_keepalive(self.keepalive_interval)
+        return client
+
+    def load_private_key(self, path: str):
+        """Parse an RSA private key file once and reuse it for every later connection"""
+        with self.__lock:
+            private_key = self.__keys.get(path)
+        if private_key is None:
+            private_key = paramiko.RSAKey.from_private_key_file(path)
+            with self.__lock:
+                self.__keys[path] = private_key
+        return private_key
+
+    def release(self, connection: PooledSSHConnection) -> None:
+        self.__check_fork()
+        if not self.__is_alive(connection.client):
+            self.close_client(connection.client)
+            return
+        with self.__lock:
+            self.__idle.setdefault(connection.key, []).append((connection.client, time.monotonic()))
+
+    def close_client(self, client) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def close_all(self) -> None:
+        with self.__lock:
+            idle, self.__idle = self.__idle, {}
+        for entries in idle.values():
+            for client, _ in entries:
+                self.close_client(client)
+
+    def __is_alive(self, client) -> bool:
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def __close_expired(self) -> None:
+        now = time.monotonic()
+        expired = []
+        with self.__lock:
+            for key, idle in self.__idle.items():
+                expired.extend(client for client, idle_since in idle if now - idle_since > self.max_idle_time)
+                idle[:] = [entry for entry in idle if now - entry[1] <= self.max_idle_time]
+        for client in expired:
+            self.close_client(client)
+
+    def __check_fork(self) -> None:
+        # Transports inherited from the parent must not be shared with it
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__idle = {}
+            self.__lock = threading.Lock()
+
+
+_ssh_pool = None
+
+
+def get_ssh_pool() -> SSHConnectionPool:
+    global _ssh_pool
+    if _ssh_pool is None:
+        _ssh_pool = SSHConnectionPool()
+    return _ssh_pool
@@ -3,14 +3,17 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 import random
+from .. import clock, event_log
 
 class TrafficModel(ABC):
     def __init__(self):
         # Default values
-        self.start_time = datetime.now()
+        self.start_time = clock.now()
         self.frequency = 1
         self.time_interval = 0
         self.model_config = {}
+        # Assigned by the dispatcher before generate() runs
+        self.task_id = None
 
     @abstractmethod
     def generate(self) -> None:
@@ -27,17 +30,28 @@ class TrafficModel(ABC):
         """Get a string representation of this model"""
         pass
 
+    def log_event(self, action: str, **fields) -> None:
+        """Record an action of this task in the event log"""
+        fields.setdefault("task_id", self.task_id)
+        fields.setdefault("model", str(self))
+        event_log.emit(action, **fields)
+
     def get_start_time(self):
         """Get the scheduled start time for this model"""
         return self.start_time
     
-    def set_start_time(self, frequency: int):
-        """Set the start time for this model based on frequency and time interval"""
+    def get_interval(self):
+        """Get the time interval in seconds between two runs of this model"""
         # If time_interval is a list [min, max], use a random value in that range
         if isinstance(self.time_interval, list) and len(self.time_interval) == 2:
-            interval = random.randint(self.time_interval[0], self.time_interval[1])
-        else:
-            interval = self.time_interval
-            
+            return random.randint(self.time_interval[0], self.time_interval[1])
+        return self.time_interval
+
+    def get_start_time_for(self, frequency: int):
+        """Get the start time of the run at index `frequency` based on the time interval"""
         # Add the interval multiplied by frequency to the start time
-        self.start_time = self.start_time + timedelta(seconds=frequency * interval)
\ No newline at end of file
+        return self.start_time + timedelta(seconds=frequency * self.get_interval())
+
+    def set_start_time(self, frequency: int):
+        """Set the start time for this model based on frequency and time interval"""
+        self.start_time = self.get_start_time_for(frequency)
\ No newline at end of file
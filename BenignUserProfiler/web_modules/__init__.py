@@ -1,23 +1,89 @@
 #!/usr/bin/env python3
 
+import importlib
+import os
+import threading
+import weakref
 from .base_browser import BaseBrowserModule
-from .soundcloud import SoundcloudModule
-from .image_download import ImageDownloadModule
-from .youtube import YoutubeModule
-from .web_browse import WebBrowseModule
-from .custom_network_service import CustomServiceModule
-from .firefox_search import FirefoxSearchModule
-
-def get_module(module_type, headless=False):
-    modules = {
-        "soundcloud": SoundcloudModule,
-        "download": ImageDownloadModule,
-        "youtube": YoutubeModule,
-        "web": WebBrowseModule,
-        "custom_service": CustomServiceModule,
-        "firefox_search": FirefoxSearchModule
-    }
-    
-    if module_type.lower() in modules:
-        return modules[module_type.lower()](headless=headless)
-    return WebBrowseModule(headless=headless)
\ No newline at end of file
+
+# Module type -> (module, class). Browser modules are imported on first use
+# so worker processes never load stacks (requests, bs4, paramiko) they don't run.
+MODULE_REGISTRY = {
+    "soundcloud": ("soundcloud", "SoundcloudModule"),
+    "download": ("image_download", "ImageDownloadModule"),
+    "youtube": ("youtube", "YoutubeModule"),
+    "web": ("web_browse", "WebBrowseModule"),
+    "custom_service": ("custom_network_service", "CustomServiceModule"),
+    "firefox_search": ("firefox_search", "FirefoxSearchModule")
+}
+
+_module_classes = {}
+
+# Each thread's (module class, headless, webdriver) -> instance, dropped when the thread exits
+_thread_state = threading.local()
+
+
+class _ThreadModules(object):
+    """Module instances of one thread in one process"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.instances = {}
+        # A retired worker thread hands its modules' browser sessions back to the pool
+        weakref.finalize(self, _release_modules, self.instances)
+
+
+def _release_modules(instances) -> None:
+    for module in instances.values():
+        try:
+            module.reset_session()
+        except Exception:
+            pass
+
+
+def _get_thread_modules() -> dict:
+    modules = getattr(_thread_state, "modules", None)
+    if modules is None or modules.pid != os.getpid():
+        if modules is not None:
+            # Sessions inherited from the parent process belong to its browser pool
+            modules.instances.clear()
+        modules = _ThreadModules()
+        _thread_state.modules = modules
+    return modules.instances
+
+
+def get_module_class(module_type):
+    module_type = module_type.lower()
+    if module_type not in MODULE_REGISTRY:
+        module_type = "web"
+    if module_type not in _module_classes:
+        module_name, class_name = MODULE_REGISTRY[module_type]
+        module = importlib.import_module(f".{module_name}", __package__)
+        _module_classes[module_type] = getattr(module, class_name)
+    return _module_classes[module_type]
+
+
+def get_module(module_type, headless=False, webdriver=False):
+    """Return this worker's instance of a browser module, reset for a new session.
+
+    Instances are built once per (type, options) in each worker thread and
+    process, so the hot browsing loop does not repeat module initialisation.
+    They are kept in thread-local storage, so they go away with their thread.
+    """
+    instances = _get_thread_modules()
+    module_class = get_module_class(module_type)
+    key = (module_class, headless, webdriver)
+    module = instances.get(key)
+    if module is None:
+        module = module_class(headless=headless, webdriver=webdriver)
+        instances[key] = module
+    else:
+        module.reset_session()
+    return module
+
+
+def __getattr__(name):
+    for module_type, (_, class_name) in MODULE_REGISTRY.items():
+        if class_name == name:
+            return get_module_class(module_type)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
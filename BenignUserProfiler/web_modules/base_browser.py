@@ -1,41 +1,77 @@
 #!/usr/bin/env python3
 
+import importlib.util
 import platform
 import subprocess
-import time
 import random
 import os
 import sys
 from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from .browser_pool import get_browser_pool
+from .input_driver import XdotoolBatch, xdotool_path
+from .. import clock, event_log
 
 # Add debug flag for detailed logging
 DEBUG = os.environ.get("PYTHONDEVMODE", "0") == "1"
 VERBOSE = os.environ.get("BUP_VERBOSE", "0") == "1"
 
-class BaseBrowserModule(ABC):
-    def __init__(self, headless=False):
-        self.headless = headless
-        self.os_type = platform.system()
+_platform_probe = None
+
+
+def _probe_platform():
+    """Detect the OS and selenium availability once per process"""
+    global _platform_probe
+    if _platform_probe is None:
+        os_type = platform.system()
         
         # Detect Windows environment more precisely
-        if self.os_type == "Windows" or "win" in sys.platform.lower():
-            self.os_type = "Windows"
+        if os_type == "Windows" or "win" in sys.platform.lower():
+            os_type = "Windows"
         
         # Print system info for debugging
-        print(f">>> OS detected: {self.os_type}")
+        print(f">>> OS detected: {os_type}")
         print(f">>> Platform: {platform.platform()}")
         print(f">>> Python: {sys.version}")
         
         # Check if selenium is available (for fallback)
-        try:
-            import selenium
-            self.has_selenium = True
+        has_selenium = importlib.util.find_spec("selenium") is not None
+        if has_selenium:
             print(">>> Selenium is available")
-        except ImportError:
-            self.has_selenium = False
+        else:
             print(">>> Selenium is not available, using fallback methods")
+        _platform_probe = (os_type, has_selenium)
+    return _platform_probe
+
+
+class BaseBrowserModule(ABC):
+    def __init__(self, headless=False, webdriver=False):
+        self.headless = headless
+        self.webdriver = webdriver
+        self.browser_session = None
+        self.driver = None
+        self.os_type, self.has_selenium = _probe_platform()
+
+    def reset_session(self):
+        """Drop per-session state so a cached instance can serve the next task"""
+        if self.browser_session is not None:
+            get_browser_pool().release(self.browser_session)
+            self.browser_session = None
+        self.driver = None
     
     def browser_command(self, url, additional_args=None):
+        opened = self._open_url(url, additional_args)
+        parsed = urlparse(url)
+        event_log.emit("browser_navigate", url=url, host=parsed.hostname,
+                       port=parsed.port or (443 if parsed.scheme == "https" else 80),
+                       driver="webdriver" if self.browser_session is not None else "process",
+                       outcome="ok" if opened else "error")
+        return opened
+
+    def _open_url(self, url, additional_args=None):
+        if self.webdriver and self._webdriver_open(url):
+            return True
+
         try:
             print(f">>> Opening {url} in Firefox browser")
             if self.os_type == "Linux":
@@ -51,16 +87,10 @@ class BaseBrowserModule(ABC):
                                stderr=subprocess.DEVNULL)
                 
                 # Wait for window to open
-                time.sleep(2)
+                clock.sleep(2)
                 
                 # Try to maximize the window using xdotool if available
-                try:
-                    subprocess.run(["xdotool", "search", "--onlyvisible", "--class", "Firefox", "windowactivate", "key", "alt+F10"], 
-                                check=False,
-                                stdout=subprocess.DEVNULL, 
-                                stderr=subprocess.DEVNULL)
-                except:
-                    pass
+                XdotoolBatch().activate_window("Firefox").key("alt+F10").flush()
                                
             elif self.os_type == "Darwin":  # macOS
                 subprocess.Popen(["open", "-a", "Firefox", url])
@@ -73,7 +103,7 @@ class BaseBrowserModule(ABC):
                 subprocess.Popen(cmd, shell=True)
                 
                 # Wait for window to open
-                time.sleep(3)
+                clock.sleep(3)
                 
                 # Maximize window using PowerShell
                 ps_script = '''
@@ -130,26 +160,47 @@ class BaseBrowserModule(ABC):
                 print(f">>> Unsupported platform: {self.os_type}")
                 return False
                 
-            time.sleep(2)
+            clock.sleep(2)
             return True
         except Exception as e:
             print(f">>> Error launching browser: {e}")
             return False
+
+    def _webdriver_open(self, url):
+        """Navigate the pooled WebDriver session to `url` instead of launching a browser process"""
+        if self.browser_session is None:
+            self.browser_session = get_browser_pool().acquire(self.headless)
+            if self.browser_session is None:
+                # Fall back to process launches for the rest of this module's life
+                self.webdriver = False
+                return False
+            self.driver = self.browser_session.driver
+
+        try:
+            print(f">>> Opening {url} in WebDriver session")
+            self.browser_session.open(url)
+            return True
+        except Exception as e:
+            print(f">>> Error navigating WebDriver session: {e}")
+            self.browser_session.quit()
+            self.browser_session = None
+            self.driver = None
+            return False
     
     def keyboard_input(self, text):
+        if self.driver is not None and self._driver_send_keys(text, "Return"):
+            return True
+
         try:
             if self.os_type == "Linux":
-                try:
-                    subprocess.run(["which", "xdotool"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    time.sleep(1)
-                    
-                    subprocess.run(["xdotool", "type", text])
-                    
-                    subprocess.run(["xdotool", "key", "Return"])
-                    return True
-                except subprocess.CalledProcessError:
+                if not xdotool_path():
                     print(">>> xdotool not installed, can't simulate keyboard input")
                     return False
+                clock.sleep(1)
+                
+                with XdotoolBatch() as batch:
+                    batch.type(text).key("Return")
+                return True
                     
             elif self.os_type == "Windows":
                 # For Windows, using a more direct approach and escaping special characters
@@ -219,7 +270,7 @@ class BaseBrowserModule(ABC):
                     # Note: This is just a fallback check, actual implementation would need a driver instance
                     if hasattr(self, 'driver') and self.driver is not None:
                         actions = ActionChains(self.driver)
-                        actions.move_to_element_with_offset(self.driver.find_element_by_tag_name('body'), x, y)
+                        actions.move_to_element_with_offset(self.driver.find_element("tag name", "body"), x, y)
                         actions.click()
                         actions.perform()
                         print(">>> Clicked using Selenium")
@@ -230,26 +281,12 @@ class BaseBrowserModule(ABC):
             
             if self.os_type == "Linux":
                 print(">>> Using xdotool for clicking")
-                try:
-                    # First try simpler approach
-                    subprocess.run(["xdotool", "mousemove", str(x), str(y), "click", "1"], 
-                                check=False,
-                                stdout=subprocess.DEVNULL)
-                    print(">>> Linux click successful")
-                    return True
-                except Exception as e:
-                    print(f">>> xdotool click failed: {e}")
-                    # Try alternative approach
-                    try:
-                        # Move mouse first
-                        subprocess.run(["xdotool", "mousemove", str(x), str(y)], check=False)
-                        time.sleep(0.2)
-                        # Then click
-                        subprocess.run(["xdotool", "click", "1"], check=False)
-                        return True
-                    except Exception as e2:
-                        print(f">>> Alternative xdotool approach failed: {e2}")
-                        return False
+                with XdotoolBatch() as batch:
+                    batch.mousemove(x, y).click(1)
+                if not xdotool_path():
+                    return False
+                print(">>> Linux click successful")
+                return True
                         
             elif self.os_type == "Windows":
                 print(">>> Using Win32 API for clicking")
@@ -370,10 +407,8 @@ class BaseBrowserModule(ABC):
     def right_click(self, x, y):
         try:
             if self.os_type == "Linux":
-                subprocess.run(["xdotool", "mousemove", str(x), str(y), "click", "3"], 
-                            check=False,
-                            stdout=subprocess.DEVNULL, 
-                            stderr=subprocess.DEVNULL)
+                with XdotoolBatch() as batch:
+                    batch.mousemove(x, y).click(3)
             elif self.os_type == "Windows":
                 ps_script = f'''
                 Add-Type -AssemblyName System.Windows.Forms
@@ -404,6 +439,10 @@ class BaseBrowserModule(ABC):
     def press_key(self, key):
         try:
             print(f">>> Pressing key: {key}")
+
+            # Send keys straight to the page when a WebDriver session is active
+            if self.driver is not None and self._driver_send_keys("", key):
+                return True
             
             # Try to use pyautogui first (most reliable cross-platform method)
             try:
@@ -441,15 +480,9 @@ class BaseBrowserModule(ABC):
             
             if self.os_type == "Linux":
                 # Linux xdotool method
-                try:
-                    subprocess.run(["xdotool", "key", key], 
-                                check=False,
-                                stdout=subprocess.DEVNULL)
+                if XdotoolBatch().key(key).flush():
                     print(f">>> Pressed key {key} using xdotool")
                     return True
-                except Exception as e:
-                    print(f">>> xdotool key press failed: {e}")
-                    # Fall back to other methods
             
             elif self.os_type == "Windows":
                 # Map common key names to SendKeys format
@@ -565,6 +598,15 @@ class BaseBrowserModule(ABC):
     
     def scroll_down(self, count=1):
         print(f">>> Attempting to scroll down {count} times")
+
+        if self.driver is not None:
+            try:
+                for _ in range(count):
+                    self.driver.execute_script("window.scrollBy(0, window.innerHeight);")
+                    clock.sleep(random.uniform(2, 5))
+                return True
+            except Exception as e:
+                print(f">>> WebDriver scroll failed: {e}")
         
         # Try to use pyautogui first if available (cross-platform solution)
         try:
@@ -573,41 +615,30 @@ class BaseBrowserModule(ABC):
             for _ in range(count):
                 # First try page down key
                 pyautogui.press('pagedown')
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 # Then also scroll with mouse wheel
                 pyautogui.scroll(-100)  # Negative value scrolls down
-                time.sleep(random.uniform(1, 3))
+                clock.sleep(random.uniform(1, 3))
             return True
         except ImportError:
             print(">>> PyAutoGUI not available, using native methods")
+
+        # On Linux every scroll step, and the waits between them, run in a single xdotool process
+        if self.os_type == "Linux" and xdotool_path():
+            print(">>> Using xdotool for Linux scrolling")
+            with XdotoolBatch() as batch:
+                for _ in range(count):
+                    # First Page_Down, then several small mouse wheel scrolls (this often works better)
+                    batch.key("Page_Down").sleep(0.5).click(5, repeat=5, delay=0.1)
+                    # Wait between scrolls
+                    batch.sleep(random.uniform(2, 5))
+            return True
         
         for i in range(count):
             print(f">>> Scroll attempt {i+1}/{count}")
             
             if self.os_type == "Linux":
-                try:
-                    print(">>> Using xdotool for Linux scrolling")
-                    # First try Page_Down key
-                    subprocess.run(["xdotool", "key", "Page_Down"], 
-                                check=False,
-                                stdout=subprocess.DEVNULL)
-                    time.sleep(0.5)
-                    
-                    # Also try scrolling with mouse wheel (this often works better)
-                    for _ in range(5):  # Multiple small scrolls often work better
-                        subprocess.run(["xdotool", "click", "5"], 
-                                    check=False,
-                                    stdout=subprocess.DEVNULL)
-                        time.sleep(0.1)
-                except Exception as e:
-                    print(f">>> Linux scroll failed: {e}")
-                    # Try fallback method - send Down key multiple times
-                    try:
-                        for _ in range(10):
-                            subprocess.run(["xdotool", "key", "Down"], check=False)
-                            time.sleep(0.1)
-                    except:
-                        pass
+                print(">>> xdotool not installed, can't scroll")
             
             elif self.os_type == "Windows":
                 print(">>> Using PowerShell/Win32 API for Windows scrolling")
@@ -727,20 +758,57 @@ class BaseBrowserModule(ABC):
                 print(f">>> Unsupported OS for scrolling: {self.os_type}")
             
             # Wait between scrolls
-            time.sleep(random.uniform(2, 5))
+            clock.sleep(random.uniform(2, 5))
         
         return True
     
+    def _driver_send_keys(self, text, key=None):
+        """Type `text` and then press `key` (xdotool key name) in the WebDriver session"""
+        try:
+            from selenium.webdriver.common.action_chains import ActionChains
+            from selenium.webdriver.common.keys import Keys
+
+            if key == "alt+Left":
+                self.driver.back()
+                return True
+            if key == "F5":
+                self.driver.refresh()
+                return True
+
+            key_mapping = {
+                "Return": Keys.ENTER, "Escape": Keys.ESCAPE, "Page_Down": Keys.PAGE_DOWN,
+                "Page_Up": Keys.PAGE_UP, "Right": Keys.ARROW_RIGHT, "Left": Keys.ARROW_LEFT,
+                "Up": Keys.ARROW_UP, "Down": Keys.ARROW_DOWN, "space": Keys.SPACE,
+                "Home": Keys.HOME, "End": Keys.END, "Delete": Keys.DELETE, "Tab": Keys.TAB
+            }
+            actions = ActionChains(self.driver)
+            if text:
+                actions.send_keys(text)
+            if key and key.startswith("ctrl+"):
+                actions.key_down(Keys.CONTROL).send_keys(key[5:]).key_up(Keys.CONTROL)
+            elif key:
+                actions.send_keys(key_mapping.get(key, key))
+            actions.perform()
+            return True
+        except Exception as e:
+            print(f">>> WebDriver key input failed: {e}")
+            return False
+    
     def close_browser(self):
+        # Pooled browsers stay open for the next task
+        if self.browser_session is not None:
+            get_browser_pool().release(self.browser_session)
+            self.browser_session = None
+            self.driver = None
+            print(">>> Released browser session")
+            return
+
         try:
             if self.os_type == "Linux":
                 try:
                     # First try to close gracefully with Alt+F4
-                    subprocess.run(["xdotool", "key", "alt+F4"], 
-                                check=False,
-                                stdout=subprocess.DEVNULL, 
-                                stderr=subprocess.DEVNULL)
-                    time.sleep(1)
+                    XdotoolBatch().key("alt+F4").flush()
+                    clock.sleep(1)
                     
                     # Then force kill any remaining Firefox processes
                     subprocess.run(["killall", "-9", "firefox"], 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from multiprocessing import util
+
+# Recycle a browser after this many page loads or this much memory growth
+DEFAULT_MAX_PAGES = 50
+DEFAULT_MAX_RSS_GROWTH = 512 * 1024 * 1024
+
+
+class BrowserSession(object):
+    """Persistent Firefox instance driven over WebDriver (geckodriver/Marionette)"""
+
+    def __init__(self, driver, headless: bool):
+        self.driver = driver
+        self.headless = headless
+        self.page_count = 0
+        self.baseline_rss = self.rss()
+
+    def open(self, url: str) -> None:
+        """Navigate the current window to `url`"""
+        self.driver.get(url)
+        self.page_count += 1
+
+    def rss(self):
+        """Resident memory of the browser process tree, or None if psutil is unavailable"""
+        try:
+            import psutil
+            process = psutil.Process(self.driver.service.process.pid)
+            return sum(child.memory_info().rss for child in [process] + process.children(recursive=True))
+        except Exception:
+            return None
+
+    def reset(self) -> None:
+        """Close extra windows and blank the remaining one before the session is reused"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.get("about:blank")
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool(object):
+    """Process-wide pool of WebDriver browser sessions shared by all web modules.
+
+    A task borrows a session on its first navigation and returns it from
+    close_browser(), so each worker keeps one long-lived browser instead of
+    launching a Firefox process per URL. Sessions are recycled after
+    `max_pages` page loads or once their memory grew by `max_rss_growth` bytes.
+    """
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES, max_rss_growth: int = DEFAULT_MAX_RSS_GROWTH):
+        self.max_pages = max_pages
+        self.max_rss_growth = max_rss_growth
+        self.__idle = []
+        self.__lock = threading.Lock()
+        self.__pid = None
+
+    def acquire(self, headless: bool = False):
+        """Borrow a browser session, or return None if WebDriver cannot be started"""
+        self.__check_process()
+        with self.__lock:
+            for index, session in enumerate(self.__idle):
+                if session.headless == headless:
+                    del self.__idle[index]
+                    break
+            else:
+                session = None
+
+        if session is not None:
+            try:
+                session.reset()
+                print(">>> Reusing WebDriver browser session")
+                return session
+            except Exception as e:
+                print(f">>> Pooled browser session is no longer usable: {e}")
+                session.quit()
+
+        return self.launch(headless)
+
+    def launch(self, headless: bool = False):
+        try:
+            from selenium import webdriver
+        except ImportError:
+            print(">>> Selenium is not available, falling back to launching Firefox processes")
+            return None
+
+        print(f">>> Starting {'headless ' if headless else ''}Firefox WebDriver session")
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("-headless")
+        try:
+            driver = webdriver.Firefox(options=options)
+        except Exception as e:
+            print(f">>> Could not start Firefox WebDriver: {e}")
+            return None
+        if not headless:
+            try:
+                driver.maximize_window()
+            except Exception:
+                pass
+        return BrowserSession(driver, headless)
+
+    def release(self, session: BrowserSession) -> None:
+        if self.__should_recycle(session):
+            print(f">>> Recycling browser session after {session.page_count} pages")
+            session.quit()
+            return
+        with self.__lock:
+            self.__idle.append(session)
+
+    def close_all(self) -> None:
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for session in idle:
+            session.quit()
+
+    def __should_recycle(self, session: BrowserSession) -> bool:
+        if session.page_count >= self.max_pages:
+            return True
+        if session.baseline_rss is not None:
+            rss = session.rss()
+            if rss is None or rss - session.baseline_rss > self.max_rss_growth:
+                return True
+        return False
+
+    def __check_process(self) -> None:
+        # Browsers belong to the process that launched them; quit them when it exits
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__idle = []
+            self.__lock = threading.Lock()
+            util.Finalize(self, self.close_all, exitpriority=10)
+
+
+_browser_pool = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserPool()
+    return _browser_pool
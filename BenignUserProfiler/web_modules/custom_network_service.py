@@ -4,7 +4,6 @@ import time
 import random
 import os
 import tempfile
-import requests
 import paramiko
 import subprocess
 from pathlib import Path
@@ -12,14 +11,21 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from .base_browser import BaseBrowserModule
+from .. import clock
+from ..http_client import get_http_client
 
 class CustomServiceModule(BaseBrowserModule):
-    def __init__(self, headless=False):
-        super().__init__(headless)
+    def __init__(self, headless=False, webdriver=False):
+        super().__init__(headless, webdriver)
         self.temp_dir = tempfile.mkdtemp()
         self.generated_files = []
         self.downloaded_files = []
 
+    def reset_session(self):
+        super().reset_session()
+        self.generated_files = []
+        self.downloaded_files = []
+
     def execute(self, config):
         try:
             # Extract configuration parameters
@@ -41,14 +47,14 @@ class CustomServiceModule(BaseBrowserModule):
                 return False
             
             print(">>> Successfully opened main page, scrolling...")
-            time.sleep(random.uniform(3, 5))
+            clock.sleep(random.uniform(3, 5))
             
             # Scroll the page multiple times
             scroll_count = random.randint(3, 6)
             for i in range(scroll_count):
                 print(f">>> Scrolling down ({i+1}/{scroll_count})")
                 self.scroll_down(1)
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
             
             # 3. Visit the guide route using browser command
             guide_url = urljoin(base_url, "/guide")
@@ -62,14 +68,14 @@ class CustomServiceModule(BaseBrowserModule):
                 return False
             
             print(">>> Successfully opened guide page, scrolling...")
-            time.sleep(random.uniform(3, 5))
+            clock.sleep(random.uniform(3, 5))
             
             # Scroll the userguide page
             scroll_count = random.randint(4, 7)
             for i in range(scroll_count):
                 print(f">>> Scrolling down guide page ({i+1}/{scroll_count})")
                 self.scroll_down(1)
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
             
             # 4. Upload a TXT file to the API
             print("\n" + "="*50)
@@ -81,7 +87,7 @@ class CustomServiceModule(BaseBrowserModule):
             else:
                 print(">>> API UPLOAD FAILED")
             print("="*50 + "\n")
-            time.sleep(random.uniform(3, 5))
+            clock.sleep(random.uniform(3, 5))
             
             # 5. Visit the main page again using browser command
             print(f">>> Visiting main page again: {base_url}")
@@ -92,7 +98,7 @@ class CustomServiceModule(BaseBrowserModule):
                 return False
             
             print(">>> Successfully returned to main page")
-            time.sleep(random.uniform(3, 5))
+            clock.sleep(random.uniform(3, 5))
             
             # 6. Download the report file using browser command
             report_url = urljoin(base_url, "/report")
@@ -107,7 +113,7 @@ class CustomServiceModule(BaseBrowserModule):
             print(">>> Report download should be initiated automatically")
             download_time = random.uniform(2, 5)
             print(f">>> Waiting {download_time:.1f} seconds for download to complete...")
-            time.sleep(download_time)
+            clock.sleep(download_time)
             
             # 7. Visit files page using browser command
             files_url = urljoin(base_url, "/files")
@@ -120,20 +126,20 @@ class CustomServiceModule(BaseBrowserModule):
                 return False
             
             print(">>> Successfully opened files page")
-            time.sleep(random.uniform(3, 5))
+            clock.sleep(random.uniform(3, 5))
             
             # Scroll to see the file table
             scroll_count = random.randint(2, 4)
             for i in range(scroll_count):
                 print(f">>> Scrolling files page ({i+1}/{scroll_count})")
                 self.scroll_down(1)
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
             
             # Actually parse the HTML to find the download links with BeautifulSoup
             print(">>> Parsing HTML to find download links")
             try:
                 # Get the page content
-                response = requests.get(files_url)
+                response = get_http_client().get(files_url)
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
                 # Find all <a> tags with class="download-link"
@@ -186,10 +192,10 @@ class CustomServiceModule(BaseBrowserModule):
                 print(f">>> Download initiated for {file_name}")
                 download_time = random.uniform(2, 6)
                 print(f">>> Waiting {download_time:.1f} seconds for download...")
-                time.sleep(download_time)
+                clock.sleep(download_time)
                 
                 # Wait between downloads for realistic timing
-                time.sleep(random.uniform(5, 10))
+                clock.sleep(random.uniform(5, 10))
             
             # 8. Upload a random file to SCP server
             print("\n" + "="*50)
@@ -281,7 +287,7 @@ class CustomServiceModule(BaseBrowserModule):
                 
                 # Perform the upload - explicitly using POST method
                 start_time = time.time()
-                response = requests.post(
+                response = get_http_client().post(
                     url=upload_url,
                     files=files,
                     headers=headers,
@@ -310,7 +316,7 @@ class CustomServiceModule(BaseBrowserModule):
                     print(">>> Trying alternative parameter name 'file'")
                     with open(file_to_upload, 'rb') as f2:
                         alt_files = {'file': (os.path.basename(file_to_upload), f2, 'text/plain')}
-                        alt_response = requests.post(upload_url, files=alt_files, headers=headers)
+                        alt_response = get_http_client().post(upload_url, files=alt_files, headers=headers)
                         
                         if alt_response.status_code == 200 or alt_response.status_code == 201:
                             print(f">>> Alternate upload successful, status code: {alt_response.status_code}")
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
-import time
 import random
 from .base_browser import BaseBrowserModule
+from .. import clock
 
 class FirefoxSearchModule(BaseBrowserModule):
-    def __init__(self, headless=False):
-        super().__init__(headless)
+    def __init__(self, headless=False, webdriver=False):
+        super().__init__(headless, webdriver)
     
     def execute(self, config):
         # Extract configuration parameters
@@ -22,7 +22,7 @@ class FirefoxSearchModule(BaseBrowserModule):
             return False
         
         # Wait for browser to open
-        time.sleep(random.uniform(3, 5))
+        clock.sleep(random.uniform(3, 5))
         
         # Click on Firefox address/search bar - try several possible positions
         # These positions target the top of the browser window where the Firefox search bar is
@@ -46,7 +46,7 @@ class FirefoxSearchModule(BaseBrowserModule):
                 pyautogui.click(scaled_x, scaled_y)
             except ImportError:
                 self.click(pos[0], pos[1])
-            time.sleep(1.0)  # Longer wait to ensure focus
+            clock.sleep(1.0)  # Longer wait to ensure focus
         
         # Type the search term
         print(f">>> Typing search term in Firefox bar: {search_term}")
@@ -54,34 +54,34 @@ class FirefoxSearchModule(BaseBrowserModule):
             import pyautogui
             # Clear the search bar first
             pyautogui.hotkey('ctrl', 'a')  # Select all text
-            time.sleep(0.5)
+            clock.sleep(0.5)
             pyautogui.press('delete')      # Delete selected text
-            time.sleep(0.5)
+            clock.sleep(0.5)
             
             # Type search term
             pyautogui.write(search_term)
-            time.sleep(0.5)
+            clock.sleep(0.5)
             pyautogui.press('enter')
         except ImportError:
             # Fallback to keyboard_input method
             self.press_key("ctrl+a")  # Select all text
-            time.sleep(0.5)
+            clock.sleep(0.5)
             self.press_key("Delete")  # Delete selected text
-            time.sleep(0.5)
+            clock.sleep(0.5)
             
             # Type search term using base_browser methods
             self.keyboard_input(search_term)
         
         # Wait for search results to load
         print(">>> Waiting for search results to load")
-        time.sleep(random.uniform(3, 6))
+        clock.sleep(random.uniform(3, 6))
         
         # Scroll through search results
         scroll_count = random.randint(2, 5)
         for i in range(scroll_count):
             print(f">>> Scrolling through search results ({i+1}/{scroll_count})")
             self.scroll_down(1)
-            time.sleep(random.uniform(2, 4))
+            clock.sleep(random.uniform(2, 4))
         
         # Click on a search result
         if config.get("click_results", True):
@@ -105,7 +105,7 @@ class FirefoxSearchModule(BaseBrowserModule):
                 # Wait for page to load
                 load_time = random.uniform(4, 8)
                 print(f">>> Waiting {load_time:.1f} seconds for page to load")
-                time.sleep(load_time)
+                clock.sleep(load_time)
                 
                 # Browse the result page briefly
                 result_browse_time = random.uniform(10, 30)
@@ -115,12 +115,12 @@ class FirefoxSearchModule(BaseBrowserModule):
                 result_scrolls = random.randint(1, 4)
                 for j in range(result_scrolls):
                     self.scroll_down(1)
-                    time.sleep(random.uniform(2, 5))
+                    clock.sleep(random.uniform(2, 5))
                 
                 # Go back to search results
                 print(">>> Going back to search results")
                 self.press_key("alt+Left")
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
         
         # Close browser when done
         print(">>> Closing browser")
@@ -3,9 +3,16 @@
 import time
 import random
 import os
-import requests
+import hashlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from .base_browser import BaseBrowserModule
+from .input_driver import XdotoolBatch
+from .. import clock, event_log
+from ..http_client import get_http_client
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
 
 class ImageDownloadModule(BaseBrowserModule):
     def execute(self, config):
@@ -31,6 +38,7 @@ class ImageDownloadModule(BaseBrowserModule):
         os.makedirs(output_dir, exist_ok=True)
         
         # Try direct API-based approach first (no browser needed)
+        http = get_http_client()
         try:
             print(f">>> Attempting direct download of {search_term} image from {source}")
             
@@ -41,7 +49,7 @@ class ImageDownloadModule(BaseBrowserModule):
                 # Using demo client ID (limited to 50 requests/hour)
                 headers = {"Authorization": "Client-ID 8bJR5zKvpU6oZ5L6z5bM-qRcpDL88JvugPJ-87x3Mjg"}
                 
-                response = requests.get(api_url, headers=headers)
+                response = http.get(api_url, headers=headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data["results"]:
@@ -50,17 +58,17 @@ class ImageDownloadModule(BaseBrowserModule):
                         image_url = image["urls"]["regular"]
                         
                         # Download the image
-                        img_response = requests.get(image_url, stream=True)
-                        if img_response.status_code == 200:
-                            filename = f"unsplash_{int(time.time())}.jpg"
-                            file_path = os.path.join(output_dir, filename)
+                        with http.get(image_url, stream=True) as img_response:
+                            if img_response.status_code == 200:
+                                filename = f"unsplash_{int(time.time())}.jpg"
+                                file_path = os.path.join(output_dir, filename)
                             
-                            with open(file_path, 'wb') as f:
-                                for chunk in img_response.iter_content(1024):
-                                    f.write(chunk)
+                                with open(file_path, 'wb') as f:
+                                    for chunk in img_response.iter_content(1024):
+                                        f.write(chunk)
                             
-                            print(f">>> Successfully downloaded image to {file_path}")
-                            return True
+                                print(f">>> Successfully downloaded image to {file_path}")
+                                return True
             
             elif "pexels.com" in source:
                 # Use Pexels API to search for images
@@ -68,7 +76,7 @@ class ImageDownloadModule(BaseBrowserModule):
                 # Using demo API key (limited to 200 requests/hour)
                 headers = {"Authorization": "563492ad6f91700001000001b76a00743e3a43918c9dbd7a12d95a71"}
                 
-                response = requests.get(api_url, headers=headers)
+                response = http.get(api_url, headers=headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data["photos"]:
@@ -77,23 +85,23 @@ class ImageDownloadModule(BaseBrowserModule):
                         image_url = photo["src"]["medium"]
                         
                         # Download the image
-                        img_response = requests.get(image_url, stream=True)
-                        if img_response.status_code == 200:
-                            filename = f"pexels_{int(time.time())}.jpg"
-                            file_path = os.path.join(output_dir, filename)
+                        with http.get(image_url, stream=True) as img_response:
+                            if img_response.status_code == 200:
+                                filename = f"pexels_{int(time.time())}.jpg"
+                                file_path = os.path.join(output_dir, filename)
                             
-                            with open(file_path, 'wb') as f:
-                                for chunk in img_response.iter_content(1024):
-                                    f.write(chunk)
+                                with open(file_path, 'wb') as f:
+                                    for chunk in img_response.iter_content(1024):
+                                        f.write(chunk)
                             
-                            print(f">>> Successfully downloaded image to {file_path}")
-                            return True
+                                print(f">>> Successfully downloaded image to {file_path}")
+                                return True
             
             elif "pixabay.com" in source:
                 # Use Pixabay API to search for images
                 api_url = f"https://pixabay.com/api/?key=34249090-a56e0bf4b095a0e31ee5627ea&q={search_term}&image_type=photo&per_page=10"
                 
-                response = requests.get(api_url)
+                response = http.get(api_url)
                 if response.status_code == 200:
                     data = response.json()
                     if data["hits"]:
@@ -102,17 +110,17 @@ class ImageDownloadModule(BaseBrowserModule):
                         image_url = image["webformatURL"]
                         
                         # Download the image
-                        img_response = requests.get(image_url, stream=True)
-                        if img_response.status_code == 200:
-                            filename = f"pixabay_{int(time.time())}.jpg"
-                            file_path = os.path.join(output_dir, filename)
+                        with http.get(image_url, stream=True) as img_response:
+                            if img_response.status_code == 200:
+                                filename = f"pixabay_{int(time.time())}.jpg"
+                                file_path = os.path.join(output_dir, filename)
                             
-                            with open(file_path, 'wb') as f:
-                                for chunk in img_response.iter_content(1024):
-                                    f.write(chunk)
+                                with open(file_path, 'wb') as f:
+                                    for chunk in img_response.iter_content(1024):
+                                        f.write(chunk)
                             
-                            print(f">>> Successfully downloaded image to {file_path}")
-                            return True
+                                print(f">>> Successfully downloaded image to {file_path}")
+                                return True
             
             print(">>> Direct download failed, falling back to browser method")
         except Exception as e:
@@ -139,7 +147,7 @@ class ImageDownloadModule(BaseBrowserModule):
         print(f">>> Searching for: {search_term}")
         
         # Wait for page to load
-        time.sleep(random.uniform(3, 6))
+        clock.sleep(random.uniform(3, 6))
         
         # Scroll through results
         scroll_count = random.randint(2, 5)
@@ -159,46 +167,37 @@ class ImageDownloadModule(BaseBrowserModule):
         self.click(pos[0], pos[1])
         
         # Wait for image detail page to load
-        time.sleep(random.uniform(3, 8))
+        clock.sleep(random.uniform(3, 8))
         print(">>> Looking at details for a selected image")
-        time.sleep(random.uniform(5, 10))
+        clock.sleep(random.uniform(5, 10))
         
         # Download the image using right-click and keyboard
         print(">>> Attempting to download the image using right-click")
         # Right-click on the image (center of screen)
         self.right_click(500, 500)
-        time.sleep(1)
+        clock.sleep(1)
         
         # Press down arrow twice
         print(">>> Pressing down arrow key twice")
         self.press_key("Down")
-        time.sleep(0.2)
+        clock.sleep(0.2)
         self.press_key("Down")
-        time.sleep(0.2)
+        clock.sleep(0.2)
         
         # Press Enter to select "Save Image As"
         self.press_key("Return")
-        time.sleep(2)
+        clock.sleep(2)
         
         # Generate a unique filename
         filename = f"image_{int(time.time())}.jpg"
         file_path = os.path.join(output_dir, filename)
         
         # Type the filename in the save dialog
-        time.sleep(1)
+        clock.sleep(1)
         if self.os_type == "Linux":
-            # Type the path
-            subprocess.run(["xdotool", "type", file_path], 
-                         check=False,
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL)
-            time.sleep(1)
-            
-            # Press Enter to save
-            subprocess.run(["xdotool", "key", "Return"], 
-                         check=False,
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL)
+            # Type the path, then press Enter to save
+            with XdotoolBatch() as batch:
+                batch.type(file_path).sleep(1).key("Return")
         elif self.os_type == "Windows":
             ps_script = f'''
             Add-Type -AssemblyName System.Windows.Forms
@@ -214,7 +213,7 @@ class ImageDownloadModule(BaseBrowserModule):
         # Wait for download to complete
         download_time = random.uniform(2, 5)
         print(f">>> Waiting {download_time:.1f} seconds for download to complete")
-        time.sleep(download_time)
+        clock.sleep(download_time)
         
         print(f">>> Image saved to: {file_path}")
         
@@ -234,7 +233,11 @@ class ImageDownloadModule(BaseBrowserModule):
         os.makedirs(output_dir, exist_ok=True)
         
         print(f">>> Found {len(download_urls)} URLs to download")
+        if config.get("bulk_download", False):
+            return self._bulk_download(config, download_urls, output_dir)
+
         successful_downloads = 0
+        http = get_http_client()
         
         for i, url in enumerate(download_urls):
             try:
@@ -264,43 +267,135 @@ class ImageDownloadModule(BaseBrowserModule):
                 file_path = os.path.join(output_dir, filename)
                 
                 # Download the file with progress updates
-                response = requests.get(url, stream=True)
-                if response.status_code == 200:
-                    total_size = int(response.headers.get('content-length', 0))
-                    downloaded = 0
+                with http.get(url, stream=True) as response:
+                    if response.status_code == 200:
+                        total_size = int(response.headers.get('content-length', 0))
+                        downloaded = 0
+                        next_report = 524288
                     
-                    with open(file_path, 'wb') as f:
-                        start_time = time.time()
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
+                        with open(file_path, 'wb') as f:
+                            start_time = time.time()
+                            for chunk in response.iter_content(chunk_size=8192):
+                                if chunk:
+                                    f.write(chunk)
+                                    downloaded += len(chunk)
                                 
-                                # Show progress periodically
-                                if total_size > 0 and downloaded % 524288 == 0:  # Show every 512KB
-                                    percent = (downloaded / total_size) * 100
-                                    elapsed = time.time() - start_time
-                                    if elapsed > 0:
-                                        speed = downloaded / (1024 * elapsed)
-                                        print(f">>> Progress: {percent:.1f}% ({downloaded/1024/1024:.1f} MB) - {speed:.1f} KB/s")
+                                    # Show progress periodically
+                                    if total_size > 0 and downloaded >= next_report:  # Show every 512KB
+                                        next_report += 524288
+                                        percent = (downloaded / total_size) * 100
+                                        elapsed = time.time() - start_time
+                                        if elapsed > 0:
+                                            speed = downloaded / (1024 * elapsed)
+                                            print(f">>> Progress: {percent:.1f}% ({downloaded/1024/1024:.1f} MB) - {speed:.1f} KB/s")
                     
-                    download_time = time.time() - start_time
-                    print(f">>> Successfully downloaded {filename} ({os.path.getsize(file_path)/1024/1024:.2f} MB in {download_time:.1f} seconds)")
-                    successful_downloads += 1
+                        download_time = time.time() - start_time
+                        print(f">>> Successfully downloaded {filename} ({os.path.getsize(file_path)/1024/1024:.2f} MB in {download_time:.1f} seconds)")
+                        self._log_download(url, "ok", bytes=downloaded, duration=download_time)
+                        successful_downloads += 1
                     
-                    # Simulate examining the downloaded file
-                    time.sleep(random.uniform(1, 3))
-                else:
-                    print(f">>> Failed to download: HTTP {response.status_code}")
+                        # Simulate examining the downloaded file
+                        clock.sleep(random.uniform(1, 3))
+                    else:
+                        print(f">>> Failed to download: HTTP {response.status_code}")
+                        self._log_download(url, "error", status=response.status_code)
                 
                 # Wait between downloads
                 if i < len(download_urls) - 1:
                     wait_time = random.uniform(2, 5)
                     print(f">>> Waiting {wait_time:.1f} seconds before next download...")
-                    time.sleep(wait_time)
+                    clock.sleep(wait_time)
                     
             except Exception as e:
                 print(f">>> Error downloading {url}: {e}")
         
         print(f">>> Media download complete. Successfully downloaded {successful_downloads}/{len(download_urls)} files to {output_dir}")
-        return True
\ No newline at end of file
+        return True
+
+    def _bulk_download(self, config, download_urls, output_dir):
+        """Download all URLs at once from a bounded worker pool, resuming partial files"""
+        workers = min(max(1, int(config.get("download_workers", 4))), len(download_urls))
+        print(f">>> Bulk downloading {len(download_urls)} files with {workers} workers")
+        start_time = time.time()
+        task = event_log.current_task()
+
+        def download(url):
+            # Pool threads do not inherit the task's event context
+            if task is None:
+                return self._download_file(url, output_dir, config)
+            with event_log.task_context(*task):
+                return self._download_file(url, output_dir, config)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(download, download_urls))
+
+        total = sum(size for size in results if size is not None)
+        elapsed = max(time.time() - start_time, 1e-6)
+        successful_downloads = sum(1 for size in results if size is not None)
+        print(f">>> Bulk download complete. {successful_downloads}/{len(download_urls)} files, "
+              f"{total/1024/1024:.2f} MB in {elapsed:.1f} seconds ({total/1024/elapsed:.1f} KB/s)")
+        return successful_downloads > 0
+
+    def _download_file(self, url, output_dir, config):
+        """Stream one URL to disk, continuing a previous .part file with an HTTP Range request.
+
+        Returns the number of bytes received, or None if the download failed.
+        """
+        chunk_size = int(config.get("chunk_size", DEFAULT_CHUNK_SIZE))
+        # Bytes per second for this download; a [min, max] range picks a rate per file
+        max_rate = config.get("max_rate_kbps")
+        if isinstance(max_rate, (list, tuple)):
+            max_rate = random.uniform(max_rate[0], max_rate[1])
+        max_rate = max_rate * 1024 if max_rate else None
+
+        # A stable name lets a later task find the partial file again
+        name = os.path.basename(urlparse(url).path) or "download.bin"
+        file_path = os.path.join(output_dir, f"{hashlib.sha1(url.encode()).hexdigest()[:8]}_{name}")
+        partial_path = file_path + ".part"
+        offset = 0
+        if config.get("resume", True) and os.path.exists(partial_path):
+            offset = os.path.getsize(partial_path)
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with get_http_client().get(url, headers=headers, stream=True) as response:
+                if response.status_code == 416 and offset:
+                    # The partial file already holds the whole body
+                    os.replace(partial_path, file_path)
+                    print(f">>> {name} was already complete")
+                    return 0
+                if response.status_code not in (200, 206):
+                    print(f">>> Failed to download {url}: HTTP {response.status_code}")
+                    self._log_download(url, "error", status=response.status_code)
+                    return None
+                if response.status_code == 200 and offset:
+                    print(f">>> Server ignored the range request, restarting {name}")
+                    offset = 0
+                elif offset:
+                    print(f">>> Resuming {name} at {offset/1024/1024:.1f} MB")
+
+                received = 0
+                start_time = time.time()
+                with open(partial_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        received += len(chunk)
+                        if max_rate:
+                            # Bandwidth is real, so shape against the wall clock
+                            ahead = received / max_rate - (time.time() - start_time)
+                            if ahead > 0:
+                                time.sleep(ahead)
+            os.replace(partial_path, file_path)
+        except Exception as e:
+            print(f">>> Error downloading {url}: {e}")
+            self._log_download(url, "error", error=str(e))
+            return None
+
+        print(f">>> Downloaded {name} ({received/1024/1024:.2f} MB in {time.time() - start_time:.1f} seconds)")
+        self._log_download(url, "ok", bytes=received, offset=offset, duration=time.time() - start_time)
+        return received
+
+    def _log_download(self, url, outcome, **fields):
+        parsed = urlparse(url)
+        event_log.emit("http_download", url=url, host=parsed.hostname,
+                       port=parsed.port or (443 if parsed.scheme == "https" else 80), outcome=outcome, **fields)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import shutil
+import subprocess
+from .. import clock
+
+# xdotool stops parsing a `type` command's text only at the end of argv, so
+# nothing can be chained after it in the same process
+_CHAIN_BREAKING_COMMANDS = {"type"}
+
+_xdotool_path = None
+
+
+def xdotool_path():
+    """Location of the xdotool binary, looked up once per process ('' if missing)"""
+    global _xdotool_path
+    if _xdotool_path is None:
+        _xdotool_path = shutil.which("xdotool") or ""
+    return _xdotool_path
+
+
+class XdotoolBatch(object):
+    """Queue of xdotool commands that runs as one chained xdotool process.
+
+    Waits between events become xdotool `sleep` commands, converted to real
+    seconds so they follow the virtual clock. Use it as a context manager to
+    flush on exit:
+
+        with XdotoolBatch() as batch:
+            batch.key("Page_Down").sleep(0.5).click(5, repeat=5, delay=0.1)
+
+    A persistent `xdotool -` process per worker would not help: script mode
+    reads stdin up to EOF before it runs the first command, so input written
+    to a long-lived pipe would only be replayed when the pipe is closed.
+    """
+
+    def __init__(self):
+        self.__chains = [[]]
+
+    def activate_window(self, window_class):
+        """Focus the first visible window of `window_class`; later keys go to it"""
+        return self.__add("search", "--onlyvisible", "--class", window_class, "windowactivate")
+
+    def key(self, *keys):
+        return self.__add("key", *keys)
+
+    def type(self, text):
+        return self.__add("type", text)
+
+    def mousemove(self, x, y):
+        return self.__add("mousemove", str(int(x)), str(int(y)))
+
+    def click(self, button=1, repeat=1, delay=None):
+        args = [str(button)]
+        if repeat > 1:
+            args = ["--repeat", str(repeat)]
+            if delay is not None:
+                args += ["--delay", str(int(clock.to_real_seconds(delay) * 1000))]
+            args.append(str(button))
+        return self.__add("click", *args)
+
+    def sleep(self, seconds):
+        real_seconds = clock.to_real_seconds(seconds)
+        if real_seconds > 0:
+            self.__add("sleep", f"{real_seconds:.3f}")
+        return self
+
+    def flush(self) -> bool:
+        """Run the queued commands, one xdotool process per chain"""
+        chains, self.__chains = [chain for chain in self.__chains if chain], [[]]
+        if not chains:
+            return True
+        if not xdotool_path():
+            print(">>> xdotool not installed, can't simulate input")
+            return False
+
+        for chain in chains:
+            subprocess.run([xdotool_path()] + chain,
+                           check=False,
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+        return True
+
+    def __add(self, command, *args):
+        self.__chains[-1].extend((command,) + args)
+        if command in _CHAIN_BREAKING_COMMANDS:
+            self.__chains.append([])
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
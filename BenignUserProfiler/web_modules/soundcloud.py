@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
-import time
 import random
-import subprocess
 import os
 from .base_browser import BaseBrowserModule
+from .input_driver import XdotoolBatch
+from .. import clock
 
 class SoundcloudModule(BaseBrowserModule):
     def execute(self, config):
@@ -15,7 +15,7 @@ class SoundcloudModule(BaseBrowserModule):
             return False
             
         print(f">>> Browsing SoundCloud: {soundcloud_url}")
-        time.sleep(random.uniform(5, 10))
+        clock.sleep(random.uniform(5, 10))
         
         if "soundcloud_searches" in config:
             search_term = random.choice(config["soundcloud_searches"])
@@ -34,11 +34,11 @@ class SoundcloudModule(BaseBrowserModule):
                 print(">>> Using interactive search method")
                 # Navigate to main page
                 self.browser_command(soundcloud_url)
-                time.sleep(random.uniform(3, 5))
+                clock.sleep(random.uniform(3, 5))
                 
                 # Try to find and click on the search box
                 # Wait for page to fully load
-                time.sleep(random.uniform(3, 5))
+                clock.sleep(random.uniform(3, 5))
                 
                 try:
                     import pyautogui
@@ -60,13 +60,13 @@ class SoundcloudModule(BaseBrowserModule):
                     for pos in search_positions:
                         print(f">>> Clicking SoundCloud search box at {pos}")
                         pyautogui.click(pos[0], pos[1])
-                        time.sleep(1.0)  # Longer wait to ensure focus
+                        clock.sleep(1.0)  # Longer wait to ensure focus
                         
                         # Type the search term
                         pyautogui.write(search_term)
-                        time.sleep(0.5)
+                        clock.sleep(0.5)
                         pyautogui.press('enter')
-                        time.sleep(1.0)
+                        clock.sleep(1.0)
                 except ImportError:
                     # Fallback to multiple clicks
                     # Using positions further down in the page to target SoundCloud's search
@@ -76,17 +76,17 @@ class SoundcloudModule(BaseBrowserModule):
                     for pos in search_positions:
                         print(f">>> Clicking SoundCloud search box at {pos}")
                         self.click(pos[0], pos[1])
-                        time.sleep(1.0)  # Longer wait to ensure focus
+                        clock.sleep(1.0)  # Longer wait to ensure focus
                         
                         # Type the search term using base_browser methods
                         for char in search_term:
                             self.press_key(char)
-                            time.sleep(0.05)
+                            clock.sleep(0.05)
                         self.press_key("Return")
-                        time.sleep(1.0)
+                        clock.sleep(1.0)
             
             # Wait for search results to load
-            time.sleep(random.uniform(5, 10))
+            clock.sleep(random.uniform(5, 10))
             
             print(">>> Selecting a track from search results")
             
@@ -126,15 +126,15 @@ class SoundcloudModule(BaseBrowserModule):
                     click_x = max(0, min(screen_width, x + offset[0]))
                     click_y = max(0, min(screen_height, y + offset[1]))
                     pyautogui.click(click_x, click_y)
-                    time.sleep(0.3)
+                    clock.sleep(0.3)
             except ImportError:
                 # Fallback to simple click at fixed positions
                 self.click(random.randint(400, 800), random.randint(300, 600))
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 self.click(random.randint(400, 800), random.randint(300, 600))
             
             # Wait for track page to load
-            time.sleep(5)
+            clock.sleep(5)
             
             # Multiple methods to ensure music plays
             print(">>> Using multiple methods to start music playback")
@@ -149,7 +149,7 @@ class SoundcloudModule(BaseBrowserModule):
                 center_x, center_y = screen_width // 2, screen_height // 2
                 print(f">>> Clicking center of screen ({center_x}, {center_y})")
                 pyautogui.click(center_x, center_y)
-                time.sleep(1)
+                clock.sleep(1)
                 
                 # Then try clicking on likely play button positions
                 play_positions = [
@@ -169,26 +169,26 @@ class SoundcloudModule(BaseBrowserModule):
                         click_x = max(0, min(screen_width, pos[0] + offset[0]))
                         click_y = max(0, min(screen_height, pos[1] + offset[1]))
                         pyautogui.click(click_x, click_y)
-                        time.sleep(0.2)
+                        clock.sleep(0.2)
                 
             except ImportError:
                 # Fallback to multiple clicks at different positions
                 for pos in [(800, 400), (500, 300), (300, 400), (700, 300)]:
                     print(f">>> Clicking position {pos}")
                     self.click(pos[0], pos[1])
-                    time.sleep(1)
+                    clock.sleep(1)
             
             # Method 2: Press space key multiple times
             for _ in range(3):
                 print(">>> Pressing space key to play/pause")
                 self.press_key("space")
-                time.sleep(0.5)
+                clock.sleep(0.5)
             
             # Method 3: Press J and K keys (common media player shortcuts)
             print(">>> Trying media player shortcuts")
             for key in ["j", "k", "l"]:
                 self.press_key(key)
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 
             # Method 4: Try to click on the waveform
             try:
@@ -203,13 +203,13 @@ class SoundcloudModule(BaseBrowserModule):
                     x = int(screen_width * x_ratio)
                     print(f">>> Clicking on waveform at ({x}, {waveform_y})")
                     pyautogui.click(x, waveform_y)
-                    time.sleep(0.5)
+                    clock.sleep(0.5)
             except ImportError:
                 pass
             
             # Wait a bit to let music start
             print(">>> Track should be playing now")
-            time.sleep(5)
+            clock.sleep(5)
             
             # Get listening time (30 minutes by default)
             listen_time = random.randint(
@@ -245,21 +245,21 @@ class SoundcloudModule(BaseBrowserModule):
                             click_x = max(0, min(screen_width, pos[0] + offset[0]))
                             click_y = max(0, min(screen_height, pos[1] + offset[1]))
                             pyautogui.click(click_x, click_y)
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                 except ImportError:
                     # Use legacy approach
                     for pos in [(400, 300), (300, 350), (500, 300)]:
                         self.click(pos[0], pos[1])
-                        time.sleep(0.5)
+                        clock.sleep(0.5)
                 
                 # Press space key (universal play/pause)
                 print(">>> Pressing space to play/pause")
                 self.press_key("space")
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 
                 # Sometimes pressing 'L' restarts playback
                 self.press_key("l")
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 
                 # Try using platform-specific methods as a last resort
                 try:
@@ -267,11 +267,8 @@ class SoundcloudModule(BaseBrowserModule):
                     
                     if platform == "linux":
                         # On Linux, try xdotool key space
-                        try:
-                            subprocess.run(["xdotool", "key", "space"], timeout=1)
+                        if XdotoolBatch().key("space").flush():
                             print(">>> Used xdotool to press space")
-                        except (subprocess.SubprocessError, FileNotFoundError):
-                            pass
                     elif platform == "windows":
                         # On Windows, pyautogui is already being used above
                         pass
@@ -281,7 +278,7 @@ class SoundcloudModule(BaseBrowserModule):
             # Set up periodic checks
             intervals = min(15, max(3, listen_time // 120))  # More intervals
             interval_time = listen_time / intervals
-            last_playback_check = time.time()
+            last_playback_check = clock.time()
             playback_check_interval = 180  # Check every 3 minutes
             
             # Initial playback check to ensure it's playing from the start
@@ -291,10 +288,10 @@ class SoundcloudModule(BaseBrowserModule):
             for i in range(intervals):
                 # Sleep for shorter intervals
                 current_sleep = min(interval_time, playback_check_interval)
-                time.sleep(current_sleep)
+                clock.sleep(current_sleep)
                 
                 # Check if we need to retry playback
-                current_time = time.time()
+                current_time = clock.time()
                 if current_time - last_playback_check >= playback_check_interval:
                     ensure_playback()
                     last_playback_check = current_time
@@ -330,21 +327,21 @@ class SoundcloudModule(BaseBrowserModule):
                         # Press right arrow key multiple times
                         for _ in range(random.randint(1, 3)):
                             self.press_key("Right")
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                         print(">>> Skipped forward in track")
                     
                     elif interaction_type == "skip_backward":
                         # Press left arrow key multiple times
                         for _ in range(random.randint(1, 3)):
                             self.press_key("Left")
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                         print(">>> Skipped backward in track")
                     
                     elif interaction_type == "play_pause":
                         # Space is universal for play/pause
                         self.press_key("space")
                         print(">>> Paused track")
-                        time.sleep(random.uniform(1.0, 2.0))
+                        clock.sleep(random.uniform(1.0, 2.0))
                         self.press_key("space")
                         print(">>> Resumed track")
                     
@@ -352,21 +349,21 @@ class SoundcloudModule(BaseBrowserModule):
                         # Up arrow for volume up
                         for _ in range(random.randint(1, 3)):
                             self.press_key("Up")
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                         print(">>> Increased volume")
                     
                     elif interaction_type == "volume_down":
                         # Down arrow for volume down
                         for _ in range(random.randint(1, 3)):
                             self.press_key("Down")
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                         print(">>> Decreased volume")
                     
                     elif interaction_type == "mute":
                         # M key often mutes
                         self.press_key("m")
                         print(">>> Muted track")
-                        time.sleep(random.uniform(1.0, 2.0))
+                        clock.sleep(random.uniform(1.0, 2.0))
                         self.press_key("m")
                         print(">>> Unmuted track")
                 
@@ -375,7 +372,7 @@ class SoundcloudModule(BaseBrowserModule):
                     scroll_amount = random.randint(1, 3)
                     self.scroll_down(scroll_amount)
                     print(f">>> Scrolled down {scroll_amount} times to see more tracks")
-                    time.sleep(random.uniform(1.0, 3.0))
+                    clock.sleep(random.uniform(1.0, 3.0))
                     
                     # Maybe click on another track
                     if random.random() < 0.3:  # 30% chance to click another track
@@ -392,15 +389,15 @@ class SoundcloudModule(BaseBrowserModule):
                                 click_x = max(0, min(screen_width, x_pos + offset[0]))
                                 click_y = max(0, min(screen_height, y_pos + offset[1]))
                                 pyautogui.click(click_x, click_y)
-                                time.sleep(0.2)
+                                clock.sleep(0.2)
                             
                             # Ensure playback of the new track
-                            time.sleep(2)
+                            clock.sleep(2)
                             ensure_playback()
                         except ImportError:
                             # Fallback to standard click
                             self.click(random.randint(300, 700), random.randint(400, 600))
-                            time.sleep(2)
+                            clock.sleep(2)
         
         # Close browser when done
         self.close_browser()
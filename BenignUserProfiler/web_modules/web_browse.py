@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 
-import time
 import random
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 from .base_browser import BaseBrowserModule
+from .. import clock
 
 class WebBrowseModule(BaseBrowserModule):
-    def __init__(self, headless=False):
-        super().__init__(headless)
+    def __init__(self, headless=False, webdriver=False):
+        super().__init__(headless, webdriver)
         self.visited_urls = set()
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
@@ -18,6 +18,10 @@ class WebBrowseModule(BaseBrowserModule):
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/114.0",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/113.0"
         ]
+
+    def reset_session(self):
+        super().reset_session()
+        self.visited_urls = set()
     
     def execute(self, config):
         url = config.get("website") or config.get("link")
@@ -36,7 +40,7 @@ class WebBrowseModule(BaseBrowserModule):
         print(f">>> Browsing website: {url}")
         
         # Initial page load
-        time.sleep(random.uniform(2, 5))
+        clock.sleep(random.uniform(2, 5))
         
         # Determine how long to browse (30 minutes by default)
         browse_time = random.randint(
@@ -44,7 +48,7 @@ class WebBrowseModule(BaseBrowserModule):
             config.get("max_browse_time", 1800)  # 30 min in seconds
         )
         
-        start_time = time.time()
+        start_time = clock.time()
         elapsed_time = 0
         
         print(f">>> Will browse for approximately {browse_time} seconds")
@@ -89,14 +93,14 @@ class WebBrowseModule(BaseBrowserModule):
                 # Wait for page to respond to click
                 click_wait = random.uniform(3, 8)
                 elapsed_time += click_wait
-                time.sleep(click_wait)
+                clock.sleep(click_wait)
                 
                 # Check if the page changed (simulate by random chance)
                 if random.random() < 0.6:  # 60% chance we clicked a link
                     print(">>> Page appears to have changed, waiting for load")
                     load_wait = random.uniform(2, 5)
                     elapsed_time += load_wait
-                    time.sleep(load_wait)
+                    clock.sleep(load_wait)
                     
                     # Simulate adding a new URL to our history
                     current_url = f"{url}/page_{random.randint(1, 100)}"
@@ -120,14 +124,14 @@ class WebBrowseModule(BaseBrowserModule):
                     # Wait for page to load
                     load_wait = random.uniform(5, 10)
                     elapsed_time += load_wait
-                    time.sleep(load_wait)
+                    clock.sleep(load_wait)
             
             elif action == "go_back" and len(visited_urls_in_session) > 1:
                 print(">>> Going back to previous page")
                 self.press_key("alt+Left")
                 back_wait = random.uniform(2, 5)
                 elapsed_time += back_wait
-                time.sleep(back_wait)
+                clock.sleep(back_wait)
                 
                 # Update our simulated history
                 if len(visited_urls_in_session) > 1:
@@ -140,12 +144,12 @@ class WebBrowseModule(BaseBrowserModule):
                 self.press_key("F5")
                 refresh_wait = random.uniform(3, 7)
                 elapsed_time += refresh_wait
-                time.sleep(refresh_wait)
+                clock.sleep(refresh_wait)
             
             # Random wait between actions
             wait_time = random.uniform(5, 15)
             elapsed_time += wait_time
-            time.sleep(wait_time)
+            clock.sleep(wait_time)
             
             # Show browsing statistics periodically
             if random.random() < 0.2:  # 20% chance
@@ -154,7 +158,7 @@ class WebBrowseModule(BaseBrowserModule):
                 if remaining > 0:
                     print(f">>> Approximately {remaining:.1f} seconds remaining in browsing session")
             
-            elapsed_time = time.time() - start_time
+            elapsed_time = clock.time() - start_time
         
         print(f">>> Finished browsing after {elapsed_time:.1f} seconds")
         
@@ -168,7 +172,7 @@ class WebBrowseModule(BaseBrowserModule):
             return self._fallback_browse("https://www.google.com")
             
         print(">>> Accessing Google search")
-        time.sleep(random.uniform(2, 4))
+        clock.sleep(random.uniform(2, 4))
         
         # Get a random search term from config
         search_term = random.choice(config["search_terms"])
@@ -176,7 +180,7 @@ class WebBrowseModule(BaseBrowserModule):
         
         # Google search box already has focus by default, just type directly
         # Wait a bit to ensure page is fully loaded and search box has focus
-        time.sleep(random.uniform(1, 2))
+        clock.sleep(random.uniform(1, 2))
         
         # Type the search term directly - no need to click, as Google focuses on the input by default
         print(">>> Typing directly into Google's search box (should have focus by default)")
@@ -185,22 +189,22 @@ class WebBrowseModule(BaseBrowserModule):
             # Type character by character with random delays for realism
             for char in search_term:
                 pyautogui.write(char)
-                time.sleep(random.uniform(0.05, 0.2))  # Random delay between keystrokes
-            time.sleep(0.5)
+                clock.sleep(random.uniform(0.05, 0.2))  # Random delay between keystrokes
+            clock.sleep(0.5)
             pyautogui.press('enter')
         except ImportError:
             # Fallback to keyboard_input method
             self.keyboard_input(search_term)
         
         # Wait for search results
-        time.sleep(random.uniform(3, 6))
+        clock.sleep(random.uniform(3, 6))
         
         # Scroll through results
         scroll_count = random.randint(1, 4)
         for i in range(scroll_count):
             print(f">>> Scrolling through search results ({i+1}/{scroll_count})")
             self.scroll_down(1)
-            time.sleep(random.uniform(2, 5))
+            clock.sleep(random.uniform(2, 5))
         
         # Click on a result if configured
         if config.get("click_results", True):
@@ -220,7 +224,7 @@ class WebBrowseModule(BaseBrowserModule):
                 print(f">>> Clicked on result {i+1}")
                 
                 # Wait for page to load
-                time.sleep(random.uniform(3, 6))
+                clock.sleep(random.uniform(3, 6))
                 
                 # Browse the result page briefly
                 result_browse_time = random.uniform(10, 30)
@@ -230,12 +234,12 @@ class WebBrowseModule(BaseBrowserModule):
                 result_scrolls = random.randint(1, 3)
                 for j in range(result_scrolls):
                     self.scroll_down(1)
-                    time.sleep(random.uniform(2, 5))
+                    clock.sleep(random.uniform(2, 5))
                 
                 # Go back to search results
                 self.press_key("alt+Left")
                 print(">>> Returning to search results")
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
         
         # Close browser when done
         self.close_browser()
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
-import time
 import random
 from .base_browser import BaseBrowserModule
+from .. import clock
 
 class YoutubeModule(BaseBrowserModule):
     def execute(self, config):
@@ -15,7 +15,7 @@ class YoutubeModule(BaseBrowserModule):
         print(f">>> Browsing YouTube: {youtube_url}")
         
         # Wait for page to load
-        time.sleep(random.uniform(5, 10))
+        clock.sleep(random.uniform(5, 10))
         
         # Check if we have search terms
         if "youtube_searches" in config:
@@ -43,7 +43,7 @@ class YoutubeModule(BaseBrowserModule):
                 ]
                 
                 # Wait longer for page to fully load
-                time.sleep(random.uniform(2, 4))
+                clock.sleep(random.uniform(2, 4))
                 
                 # Try clicking on YouTube's search box
                 print(">>> Clicking on YouTube's search box (avoiding browser search bar)")
@@ -58,7 +58,7 @@ class YoutubeModule(BaseBrowserModule):
                         pyautogui.click(scaled_x, scaled_y)
                     except ImportError:
                         self.click(pos[0], pos[1])
-                    time.sleep(1.0)  # Longer wait to ensure focus
+                    clock.sleep(1.0)  # Longer wait to ensure focus
                 
                 # Type the search term
                 print(f">>> Typing search term: {search_term}")
@@ -68,10 +68,10 @@ class YoutubeModule(BaseBrowserModule):
                         pyautogui.write(char, interval=0.1)
                     except ImportError:
                         self.keyboard_input(char)
-                    time.sleep(0.05)
+                    clock.sleep(0.05)
                 
                 # Press Enter to search
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 print(">>> Pressing Enter to search")
                 try:
                     import pyautogui
@@ -80,10 +80,10 @@ class YoutubeModule(BaseBrowserModule):
                     self.press_key("Return")
                 
                 # Wait for search results to load
-                time.sleep(5)
+                clock.sleep(5)
             
             # Wait for search results to load
-            time.sleep(random.uniform(5, 10))
+            clock.sleep(random.uniform(5, 10))
             
             # Click on a video from search results
             print(">>> Selecting a video from search results")
@@ -130,7 +130,7 @@ class YoutubeModule(BaseBrowserModule):
                 
             # Try multiple clicks to ensure we hit the video
             for i in range(2):
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 try:
                     import pyautogui
                     # Random offset for second click
@@ -141,7 +141,7 @@ class YoutubeModule(BaseBrowserModule):
                     self.click(selected_pos[0], selected_pos[1])
             
             # Wait for video to load and start playing
-            time.sleep(random.uniform(5, 10))
+            clock.sleep(random.uniform(5, 10))
             
             # Determine how long to watch (30 minutes by default)
             watch_time = random.randint(
@@ -159,7 +159,7 @@ class YoutubeModule(BaseBrowserModule):
                 direct_url = config["youtube_video"]
                 print(f">>> Using direct YouTube URL: {direct_url}")
                 self.browser_command(direct_url)
-                time.sleep(5)  # Wait for page to load
+                clock.sleep(5)  # Wait for page to load
             
             # Create a function to try multiple play methods in succession
             def try_play_methods():
@@ -188,21 +188,21 @@ class YoutubeModule(BaseBrowserModule):
                     except ImportError:
                         # Fallback to base click method
                         self.click(pos[0], pos[1])
-                    time.sleep(0.5)
+                    clock.sleep(0.5)
                 
                 # Method 2: Press multiple different keys that might trigger play
                 play_keys = ["space", "k", "p", "Return"]
                 for key in play_keys:
                     print(f">>> Pressing '{key}' key to play video")
                     self.press_key(key)
-                    time.sleep(0.5)
+                    clock.sleep(0.5)
                 
                 # Method 3: Try F to enter/exit fullscreen (sometimes helps)
                 print(">>> Pressing 'f' key to toggle fullscreen")
                 self.press_key("f")
-                time.sleep(1)
+                clock.sleep(1)
                 self.press_key("f")  # Press again to exit fullscreen
-                time.sleep(1)
+                clock.sleep(1)
                 
                 # Method 4: Click large play button if it appears
                 big_play_positions = [
@@ -216,27 +216,27 @@ class YoutubeModule(BaseBrowserModule):
                         pyautogui.click(pos[0], pos[1])
                     except ImportError:
                         pass
-                    time.sleep(0.5)
+                    clock.sleep(0.5)
             
             # Try playback methods at the beginning
             try_play_methods()
-            time.sleep(3)  # Wait to see if video starts
+            clock.sleep(3)  # Wait to see if video starts
             
             # Simulate periodic interactions while watching
             intervals = min(10, max(2, watch_time // 30))
             interval_time = watch_time / intervals
             
             # Every 5 minutes, try the play methods again to ensure video keeps playing
-            last_play_check = time.time()
+            last_play_check = clock.time()
             play_check_interval = 300  # 5 minutes
             
             for i in range(intervals):
                 # Sleep for the current interval
                 current_sleep = min(interval_time, play_check_interval)
-                time.sleep(current_sleep)
+                clock.sleep(current_sleep)
                 
                 # Check if we need to try play methods again
-                current_time = time.time()
+                current_time = clock.time()
                 if current_time - last_play_check >= play_check_interval:
                     print(">>> Periodic playback check - ensuring video is still playing")
                     try_play_methods()
@@ -273,7 +273,7 @@ class YoutubeModule(BaseBrowserModule):
                         key = random.choice(["space", "k"])
                         self.press_key(key)
                         print(f">>> Pressed {key} key to pause video")
-                        time.sleep(1.5)  # Brief pause
+                        clock.sleep(1.5)  # Brief pause
                         self.press_key(key)  # Resume
                         print(f">>> Pressed {key} key to resume video")
                         
@@ -286,11 +286,11 @@ class YoutubeModule(BaseBrowserModule):
                         # Up/down arrows for volume
                         for _ in range(random.randint(1, 3)):
                             self.press_key("Up")
-                            time.sleep(0.2)
-                        time.sleep(0.5)
+                            clock.sleep(0.2)
+                        clock.sleep(0.5)
                         for _ in range(random.randint(1, 2)):
                             self.press_key("Down")
-                            time.sleep(0.2)
+                            clock.sleep(0.2)
                         print(">>> Adjusted volume with arrow keys")
                         
                     elif interaction_type == "skip":
@@ -299,30 +299,30 @@ class YoutubeModule(BaseBrowserModule):
                         if direction == "forward":
                             for _ in range(random.randint(1, 5)):
                                 self.press_key("Right")
-                                time.sleep(0.2)
+                                clock.sleep(0.2)
                             print(">>> Skipped forward in video")
                         else:
                             for _ in range(random.randint(1, 3)):
                                 self.press_key("Left")
-                                time.sleep(0.2)
+                                clock.sleep(0.2)
                             print(">>> Skipped backward in video")
                             
                     elif interaction_type == "fullscreen":
                         # F key for fullscreen
                         self.press_key("f")
                         print(">>> Toggled fullscreen mode")
-                        time.sleep(3)
+                        clock.sleep(3)
                         self.press_key("f")  # Toggle back
                         print(">>> Exited fullscreen mode")
                         
                     elif interaction_type == "quality":
                         # First press settings key (.)
                         self.press_key(".")
-                        time.sleep(1)
+                        clock.sleep(1)
                         # Press up/down to navigate menu
                         for _ in range(random.randint(1, 4)):
                             self.press_key("Down")
-                            time.sleep(0.3)
+                            clock.sleep(0.3)
                         # Press escape to exit settings
                         self.press_key("Escape")
                         print(">>> Adjusted video quality settings")
@@ -331,7 +331,7 @@ class YoutubeModule(BaseBrowserModule):
                         # M key to mute/unmute
                         self.press_key("m")
                         print(">>> Muted video")
-                        time.sleep(2)
+                        clock.sleep(2)
                         self.press_key("m")
                         print(">>> Unmuted video")
                 
@@ -339,11 +339,11 @@ class YoutubeModule(BaseBrowserModule):
                 if i % 3 == 0 and random.random() < 0.5:
                     self.scroll_down(random.randint(1, 3))
                     print(">>> Scrolled down to view comments")
-                    time.sleep(2)
+                    clock.sleep(2)
                     # Scroll back up
                     for _ in range(random.randint(1, 3)):
                         self.press_key("Home")
-                        time.sleep(0.5)
+                        clock.sleep(0.5)
                     print(">>> Scrolled back to video")
             
         # Close browser when done
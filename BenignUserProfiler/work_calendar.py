@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import json
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value, "%H:%M").time()
+
+
+class WorkCalendar(object):
+    """When a profile is at work: work hours, weekdays, holidays, breaks and timezone.
+
+    Everything is parsed once, when the calendar is compiled, into the
+    day's open windows, a weekday set and a holiday set, so checking a slot
+    is a few comparisons. Times of day are in the calendar's timezone;
+    datetimes going in and out are naive local time, like the run's clock.
+    """
+
+    def __init__(self, work_hours=None, weekdays=None, holidays=(), breaks=(), timezone=None):
+        start, end = work_hours or (time.min, time.max)
+        # Open windows of a working day, with the breaks cut out
+        windows = [(start, end)]
+        for break_start, break_end in sorted(breaks):
+            cut = []
+            for window_start, window_end in windows:
+                if break_end <= window_start or break_start >= window_end:
+                    cut.append((window_start, window_end))
+                    continue
+                if window_start < break_start:
+                    cut.append((window_start, break_start))
+                if break_end < window_end:
+                    cut.append((break_end, window_end))
+            windows = cut
+        self.windows = tuple(windows)
+        self.weekdays = frozenset(range(7) if weekdays is None else weekdays)
+        self.holidays = frozenset(holidays)
+        self.timezone = timezone
+
+    @classmethod
+    def from_config(cls, model_config: dict):
+        """Compile the calendar of a model config, or None if the model may run at any time.
+
+        "work_hours" is {"start": "09:00", "end": "17:00"}; "calendar" may add
+        "weekdays" (e.g. ["mon", "fri"]), "holidays" (["2024-12-25"]),
+        "lunch_break" ({"start": "12:00", "end": "13:00"}) and "timezone".
+        """
+        work_hours = model_config.get("work_hours")
+        config = model_config.get("calendar") or {}
+        if not work_hours and not config:
+            return None
+
+        if work_hours:
+            work_hours = (_parse_time(work_hours.get("start", "09:00")), _parse_time(work_hours.get("end", "17:00")))
+        weekdays = config.get("weekdays")
+        if weekdays is not None:
+            weekdays = [WEEKDAYS.index(day.lower()[:3]) for day in weekdays]
+        holidays = [date.fromisoformat(day) for day in config.get("holidays", [])]
+        breaks = []
+        if "lunch_break" in config:
+            lunch_break = config["lunch_break"]
+            breaks.append((_parse_time(lunch_break.get("start", "12:00")), _parse_time(lunch_break.get("end", "13:00"))))
+        timezone = ZoneInfo(config["timezone"]) if config.get("timezone") else None
+        return cls(work_hours, weekdays, holidays, breaks, timezone)
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    def is_open(self, moment: datetime) -> bool:
+        """Whether the naive local time `moment` falls inside the working hours"""
+        if self.timezone is not None:
+            moment = moment.astimezone(self.timezone)
+        if not self.is_working_day(moment.date()):
+            return False
+        now = moment.time().replace(tzinfo=None)
+        return any(start <= now <= end for start, end in self.windows)
+
+    def today(self, moment: datetime) -> date:
+        """The calendar's date at the naive local time `moment`"""
+        if self.timezone is not None:
+            return moment.astimezone(self.timezone).date()
+        return moment.date()
+
+    def to_local(self, day: date, time_of_day: time) -> datetime:
+        """The naive local datetime at which it is `time_of_day` on `day` in the calendar's timezone"""
+        moment = datetime.combine(day, time_of_day)
+        if self.timezone is not None:
+            moment = moment.replace(tzinfo=self.timezone).astimezone().replace(tzinfo=None)
+        return moment
+
+
+_calendars = {}
+
+
+def get_calendar(model_config: dict):
+    """The compiled calendar of `model_config`; models with the same settings share one"""
+    key = json.dumps([model_config.get("work_hours"), model_config.get("calendar")], sort_keys=True)
+    if key not in _calendars:
+        _calendars[key] = WorkCalendar.from_config(model_config)
+    return _calendars[key]
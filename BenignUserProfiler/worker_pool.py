@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import datetime
+import time
+from multiprocessing import BoundedSemaphore, Process, Value, cpu_count
+from . import clock, event_log, metrics
+from .scheduler import TaskTable
+from .task_queue import SharedTaskQueue
+from .task_runner import run_task
+from .traffic_models import close_http_engines
+
+
+class WorkerPool(object):
+    """Process pool that grows while tasks run late and retires workers that stay idle"""
+
+    def __init__(self, initial_workers: int, max_workers=None, idle_timeout: float = 300,
+                 late_threshold: float = 5, poll_interval: float = 1):
+        self.initial_workers = max(1, initial_workers)
+        if max_workers is None:
+            max_workers = max(self.initial_workers, cpu_count())
+        self.max_workers = max(self.initial_workers, max_workers)
+        self.idle_timeout = idle_timeout
+        self.late_threshold = late_threshold
+        self.poll_interval = poll_interval
+        self.__concurrency_caps = {}
+        self.__live_workers = Value('i', 0)
+        # Set while the parent may still add tasks to the queue
+        self.__feeding = Value('b', 0)
+
+    def set_concurrency_cap(self, module_name: str, limit: int) -> None:
+        """Allow at most `limit` tasks of the config module `module_name` to run at the same time across all workers"""
+        self.__concurrency_caps[module_name] = max(1, int(limit))
+
+    def run(self, task_queue: SharedTaskQueue, task_table: TaskTable, feed=None) -> None:
+        """Run every task in the queue, resizing the pool as the schedule demands.
+
+        `task_table` resolves the queued descriptors in the workers. `feed`
+        is called on every poll to add newly expanded tasks to the queue and
+        returns False once no more tasks will come.
+        """
+        self.__feeding.value = feed is not None
+        semaphores = {module_name: BoundedSemaphore(limit) for module_name, limit in self.__concurrency_caps.items()}
+        for module_name, limit in self.__concurrency_caps.items():
+            print(f">>> At most {limit} concurrent {module_name} tasks")
+
+        processes = []
+        worker_number = 0
+        for _ in range(self.initial_workers):
+            processes.append(self.__spawn(worker_number, task_queue, task_table, semaphores))
+            worker_number += 1
+
+        registry = metrics.get_metrics()
+        while True:
+            if self.__feeding.value and not feed():
+                self.__feeding.value = False
+            processes = [process for process in processes if process.is_alive()]
+            if registry is not None:
+                registry.set_global("workers", len(processes))
+                registry.set_global("pending_tasks", len(task_queue))
+            head = task_queue.peek()
+            if head is None:
+                if not self.__feeding.value:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            lateness = clock.time() - head[1]
+            if not processes or (lateness > self.late_threshold and len(processes) < self.max_workers):
+                if processes:
+                    print(f">>> Tasks are {lateness:.1f} seconds behind schedule, adding worker {worker_number}")
+                processes.append(self.__spawn(worker_number, task_queue, task_table, semaphores))
+                worker_number += 1
+
+            time.sleep(self.poll_interval)
+
+        for process in processes:
+            process.join()
+        if registry is not None:
+            registry.set_global("workers", 0)
+            registry.set_global("pending_tasks", 0)
+
+    def __spawn(self, worker_number: int, task_queue: SharedTaskQueue, task_table: TaskTable, semaphores) -> Process:
+        with self.__live_workers.get_lock():
+            self.__live_workers.value += 1
+        process = Process(
+            target=self._worker_process,
+            args=(worker_number, task_queue, task_table, semaphores, metrics.get_metrics())
+        )
+        process.start()
+        return process
+
+    def __retire(self) -> bool:
+        """Give up this worker's slot unless it is the last one alive"""
+        with self.__live_workers.get_lock():
+            if self.__live_workers.value <= 1:
+                return False
+            self.__live_workers.value -= 1
+            return True
+
+    def _worker_process(self, thread_number: int, task_queue: SharedTaskQueue, task_table: TaskTable, semaphores,
+                        registry=None) -> None:
+        """Worker process that claims tasks once they are due"""
+        metrics.set_metrics(registry)
+        idle_since = clock.time()
+        retired = False
+        try:
+            while True:
+                now = clock.time()
+                descriptor = task_queue.claim_due(now)
+                if descriptor is None:
+                    head = task_queue.peek()
+                    if head is None and not self.__feeding.value:
+                        return
+
+                    idle_time = now - idle_since
+                    if idle_time >= self.idle_timeout and self.__retire():
+                        retired = True
+                        print(f">>> Thread {thread_number}: Idle for {datetime.timedelta(seconds=idle_time)}, exiting")
+                        return
+
+                    if head is None:
+                        # The parent is still expanding recurring tasks
+                        time.sleep(self.poll_interval)
+                        continue
+
+                    # Sleep until the next task is due or the idle timeout expires
+                    clock.sleep(max(0.05, min(head[1] - now, self.idle_timeout - idle_time)))
+                    continue
+
+                task = task_table.get_task(*descriptor)
+                print(f">>> Thread {thread_number}: Processing task: {str(task)}")
+
+                # Execute task, waiting for a free slot if its module is capped
+                semaphore = semaphores.get(task.get_module_name())
+                if semaphore is None:
+                    run_task(descriptor[0], task, f"Thread {thread_number}: ")
+                else:
+                    with semaphore:
+                        run_task(descriptor[0], task, f"Thread {thread_number}: ")
+
+                idle_since = clock.time()
+        finally:
+            if not retired:
+                with self.__live_workers.get_lock():
+                    self.__live_workers.value -= 1
+            close_http_engines()
+            # Worker processes exit without running atexit handlers
+            event_log.close_event_log()
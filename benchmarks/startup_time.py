@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure how long BenignUserProfiler takes to import and build a model of each type.
+
+Each measurement runs in a fresh interpreter so earlier imports don't hide
+the cost of later ones. Usage:
+
+    python benchmarks/startup_time.py [--runs N] [TYPE ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Minimal configs that pass each model's verify()
+SAMPLE_CONFIGS = {
+    "CMD": {"type": "CMD", "commands": ["true"]},
+    "FTP": {"type": "FTP", "address": "localhost", "username": "user", "password": "pass", "simulate": True},
+    "SSH": {"type": "SSH", "address": "localhost", "username": "user", "password": "pass", "simulate": True},
+    "SMTP": {"type": "SMTP", "sender": "a@example.com", "password": "pass", "receivers": ["b@example.com"],
+             "generate_content": True},
+    "IMAP": {"type": "IMAP", "username": "a@example.com", "password": "pass"},
+    "HTTP": {"type": "HTTP", "website": "https://www.example.com"},
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+from BenignUserProfiler.config_model import ModuleConfig
+from BenignUserProfiler.traffic_models.model_factory import ModelFactory
+model = ModelFactory(headless=True).create_model(ModuleConfig("probe", {config!r}))
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in ("paramiko", "requests", "bs4", "smtplib", "imaplib", "ftplib") if name in sys.modules)
+print(elapsed, ",".join(heavy) or "-", model is not None)
+"""
+
+
+def measure(model_type: str, runs: int):
+    timings = []
+    heavy = "-"
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(config=SAMPLE_CONFIGS[model_type])],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        elapsed, heavy, _ = result.stdout.split()
+        timings.append(float(elapsed))
+    return timings, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per model type. default=5")
+    parser.add_argument("types", nargs="*", default=list(SAMPLE_CONFIGS), help="Model types to measure")
+    args = parser.parse_args()
+
+    print(f"{'type':<6} {'median':>10} {'max':>10}  heavy modules loaded")
+    for model_type in (t.upper() for t in args.types):
+        timings, detail = measure(model_type, args.runs)
+        if timings is None:
+            print(f"{model_type:<6} {'failed':>10} {'':>10}  {detail}")
+            continue
+        print(f"{model_type:<6} {statistics.median(timings) * 1000:>8.1f}ms {max(timings) * 1000:>8.1f}ms  {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,5 +25,6 @@ setup(
             "BenignUserProfiler": "BenignUserProfiler",
             "BenignUserProfiler.traffic_models": "BenignUserProfiler/traffic_models",
         },
+        package_data={"BenignUserProfiler": ["corpus.txt"]},
         entry_points=entry_points,
 )